@@ -1,85 +1,162 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection, Line3DCollection
-
-# ──────────── Cargar datos ────────────
-df = pd.read_csv("log_Campaña.csv", encoding='latin1')
-df["Yaw_deg"] = pd.to_numeric(df["Yaw_deg"], errors="coerce")
-df["Pitch_deg"] = pd.to_numeric(df["Pitch_deg"], errors="coerce")
-df["Roll_deg"] = pd.to_numeric(df["Roll_deg"], errors="coerce")
-df = df.dropna(subset=["Yaw_deg", "Pitch_deg", "Roll_deg"]).reset_index(drop=True)
-
-# Convertir a radianes
-yaw = np.deg2rad(df["Yaw_deg"].values)
-pitch = np.deg2rad(df["Pitch_deg"].values)
-roll = np.deg2rad(df["Roll_deg"].values)
-
-# ──────────── Modelo del dron ────────────
-body = np.array([[-0.3, -0.2, -0.1],
-                 [-0.3,  0.2, -0.1],
-                 [ 0.3,  0.2, -0.1],
-                 [ 0.3, -0.2, -0.1],
-                 [-0.3, -0.2,  0.1],
-                 [-0.3,  0.2,  0.1],
-                 [ 0.3,  0.2,  0.1],
-                 [ 0.3, -0.2,  0.1]])
-
-faces = [[0,1,2,3], [4,5,6,7], [0,1,5,4],
-         [2,3,7,6], [1,2,6,5], [0,3,7,4]]
-
-arms = [
-    [[0, 0, 0], [ 0.6,  0.0, 0]],
-    [[0, 0, 0], [-0.6,  0.0, 0]],
-    [[0, 0, 0], [ 0.0,  0.6, 0]],
-    [[0, 0, 0], [ 0.0, -0.6, 0]],
-]
-
-# ──────────── Función de rotación ────────────
-def rotation_matrix(yaw, pitch, roll):
-    cz, sz = np.cos(yaw), np.sin(yaw)
-    cy, sy = np.cos(pitch), np.sin(pitch)
-    cx, sx = np.cos(roll), np.sin(roll)
-
-    Rz = np.array([[cz, -sz, 0],
-                   [sz,  cz, 0],
-                   [ 0,   0, 1]])
-    Ry = np.array([[cy,  0, sy],
-                   [ 0,  1,  0],
-                   [-sy, 0, cy]])
-    Rx = np.array([[1,  0,   0],
-                   [0, cx, -sx],
-                   [0, sx,  cx]])
-    return Rz @ Ry @ Rx
-
-# ──────────── Inicializar figura ────────────
-fig = plt.figure(figsize=(7, 7))
-ax = fig.add_subplot(111, projection='3d')
-ax.set_xlim([-1, 1])
-ax.set_ylim([-1, 1])
-ax.set_zlim([-1, 1])
-ax.set_box_aspect([1, 1, 1])
-ax.set_title("Animación de orientación del dron")
-
-# Inicializar cuerpo y brazos
-cuerpo = Poly3DCollection([], facecolors='deepskyblue', edgecolors='black', alpha=0.8)
-brazos = Line3DCollection([[[0, 0, 0], [0, 0, 0]]], colors='black', linewidths=2)
-ax.add_collection3d(cuerpo)
-ax.add_collection3d(brazos)
-
-# ──────────── Función de animación ────────────
-def actualizar(i):
-    R = rotation_matrix(yaw[i], pitch[i], roll[i])
-    body_rot = body @ R.T
-    arms_rot = [np.dot(arm, R.T) for arm in arms]
-
-    cuerpo.set_verts([body_rot[face] for face in faces])
-    brazos.set_segments(arms_rot if arms_rot else [[[0, 0, 0], [0, 0, 0]]])
-
-    ax.set_title(f"Frame {i+1}/{len(yaw)}")
-    return cuerpo, brazos
-
-# ──────────── Ejecutar animación ────────────
-ani = FuncAnimation(fig, actualizar, frames=len(yaw), interval=100, blit=False)
-plt.show()
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import numpy as np
+import matplotlib
+from concurrent.futures import ProcessPoolExecutor
+from indice_campaña import cargar as cargar_indice
+
+# ──────────── Modelo del dron ────────────
+body = np.array([[-0.3, -0.2, -0.1],
+                 [-0.3,  0.2, -0.1],
+                 [ 0.3,  0.2, -0.1],
+                 [ 0.3, -0.2, -0.1],
+                 [-0.3, -0.2,  0.1],
+                 [-0.3,  0.2,  0.1],
+                 [ 0.3,  0.2,  0.1],
+                 [ 0.3, -0.2,  0.1]])
+
+faces = [[0,1,2,3], [4,5,6,7], [0,1,5,4],
+         [2,3,7,6], [1,2,6,5], [0,3,7,4]]
+
+arms = np.array([
+    [[0, 0, 0], [ 0.6,  0.0, 0]],
+    [[0, 0, 0], [-0.6,  0.0, 0]],
+    [[0, 0, 0], [ 0.0,  0.6, 0]],
+    [[0, 0, 0], [ 0.0, -0.6, 0]],
+], dtype=float)
+
+# ──────────── Rotaciones (todas de una vez) ────────────
+def rotation_matrices(yaw, pitch, roll):
+    """Matrices Rz @ Ry @ Rx de todos los frames, (N, 3, 3)."""
+    cz, sz = np.cos(yaw), np.sin(yaw)
+    cy, sy = np.cos(pitch), np.sin(pitch)
+    cx, sx = np.cos(roll), np.sin(roll)
+    o, l = np.zeros_like(yaw), np.ones_like(yaw)
+
+    Rz = np.stack([cz, -sz, o,  sz, cz, o,  o, o, l], axis=-1).reshape(-1, 3, 3)
+    Ry = np.stack([cy, o, sy,  o, l, o,  -sy, o, cy], axis=-1).reshape(-1, 3, 3)
+    Rx = np.stack([l, o, o,  o, cx, -sx,  o, sx, cx], axis=-1).reshape(-1, 3, 3)
+    return np.einsum("nij,njk,nkl->nil", Rz, Ry, Rx, optimize=True)
+
+def geometria(yaw, pitch, roll):
+    """Caras del cuerpo (N, 6, 4, 3) y brazos (N, 4, 2, 3) ya rotados."""
+    R = rotation_matrices(yaw, pitch, roll)
+    body_rot = np.einsum("vj,nij->nvi", body, R)
+    arms_rot = np.einsum("asj,nij->nasi", arms, R)
+    return body_rot[:, faces], arms_rot
+
+# ──────────── Figura ────────────
+def crear_figura():
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection, Line3DCollection
+
+    fig = plt.figure(figsize=(7, 7))
+    ax = fig.add_subplot(111, projection='3d')
+    ax.set_xlim([-1, 1])
+    ax.set_ylim([-1, 1])
+    ax.set_zlim([-1, 1])
+    ax.set_box_aspect([1, 1, 1])
+    ax.set_title("Animación de orientación del dron")
+
+    # Inicializar cuerpo y brazos
+    cuerpo = Poly3DCollection([], facecolors='deepskyblue', edgecolors='black', alpha=0.8)
+    brazos = Line3DCollection([[[0, 0, 0], [0, 0, 0]]], colors='black', linewidths=2)
+    ax.add_collection3d(cuerpo)
+    ax.add_collection3d(brazos)
+    return fig, ax, cuerpo, brazos
+
+def actualizador(ax, cuerpo, brazos, caras, segmentos, numeros, total):
+    """Función de animación: solo asigna vértices precalculados."""
+    def actualizar(i):
+        cuerpo.set_verts(caras[i])
+        brazos.set_segments(segmentos[i])
+        ax.set_title(f"Frame {numeros[i]}/{total}")
+        return cuerpo, brazos
+    return actualizar
+
+# ──────────── Render a video ────────────
+def renderizar_tramo(args):
+    """Escribe un tramo de frames a su propio MP4 (corre en un proceso del pool)."""
+    ruta, caras, segmentos, numeros, total, fps = args
+    matplotlib.use("Agg")
+    from matplotlib.animation import FFMpegWriter
+    import matplotlib.pyplot as plt
+
+    fig, ax, cuerpo, brazos = crear_figura()
+    actualizar = actualizador(ax, cuerpo, brazos, caras, segmentos, numeros, total)
+    writer = FFMpegWriter(fps=fps, codec="libx264", extra_args=["-pix_fmt", "yuv420p"])
+    with writer.saving(fig, ruta, dpi=100):
+        for i in range(len(caras)):
+            actualizar(i)
+            writer.grab_frame()
+    plt.close(fig)
+    return ruta
+
+def renderizar_video(salida, caras, segmentos, numeros, total, fps, procesos=None):
+    """Reparte los frames en tramos contiguos, uno por proceso, y los une con ffmpeg."""
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg no está instalado")
+    procesos = max(1, min(procesos or os.cpu_count() or 1, len(caras)))
+    limites = np.linspace(0, len(caras), procesos + 1).astype(int)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(salida))) as tmp:
+        tareas = [(os.path.join(tmp, f"tramo_{k:03d}.mp4"), caras[a:b], segmentos[a:b],
+                   numeros[a:b], total, fps)
+                  for k, (a, b) in enumerate(zip(limites[:-1], limites[1:]))]
+        with ProcessPoolExecutor(max_workers=procesos) as ex:
+            tramos = list(ex.map(renderizar_tramo, tareas))
+        lista = os.path.join(tmp, "tramos.txt")
+        with open(lista, "w") as f:
+            f.writelines(f"file '{t}'\n" for t in tramos)
+        # Todos los tramos tienen el mismo códec y tamaño: se concatenan sin recodificar
+        subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                        "-i", lista, "-c", "copy", salida], check=True)
+
+# ──────────── Main ────────────
+def main():
+    ap = argparse.ArgumentParser(description="Animación de la orientación del dron durante la campaña")
+    ap.add_argument("carpeta", nargs="?", default=".", help="carpeta de la campaña")
+    ap.add_argument("--paso", type=int, default=1, help="usar 1 de cada N frames del log")
+    ap.add_argument("--video", help="renderizar a este MP4 sin ventana en vez de mostrar")
+    ap.add_argument("--fps", type=float, default=10, help="cuadros por segundo del video")
+    ap.add_argument("--procesos", type=int, help="procesos para el render (por defecto, uno por núcleo)")
+    args = ap.parse_args()
+    if args.video and shutil.which("ffmpeg") is None:
+        sys.exit("❌ --video necesita ffmpeg instalado (apt install ffmpeg)")
+
+    # Índice de la campaña (se rehace solo si cambió el CSV)
+    try:
+        indice = cargar_indice(args.carpeta)
+    except OSError as e:
+        sys.exit(f"❌ No se pudo leer el log de la campaña: {e}")
+    validas = np.flatnonzero(indice["actitud_valida"])
+    total = len(validas)
+    if not total:
+        sys.exit("❌ La campaña no tiene frames con actitud (Yaw/Pitch/Roll)")
+    sel = np.arange(0, total, max(1, args.paso))
+
+    # Convertir a radianes y rotar todo el modelo de una vez
+    yaw = np.deg2rad(indice["Yaw_deg"][validas[sel]])
+    pitch = np.deg2rad(indice["Pitch_deg"][validas[sel]])
+    roll = np.deg2rad(indice["Roll_deg"][validas[sel]])
+    caras, segmentos = geometria(yaw, pitch, roll)
+    numeros = sel + 1
+    print(f"{len(sel)} de {total} frames con actitud")
+
+    if args.video:
+        renderizar_video(args.video, caras, segmentos, numeros, total, args.fps, args.procesos)
+        print(f"✅ Video generado: {args.video}")
+        return
+
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+    fig, ax, cuerpo, brazos = crear_figura()
+    actualizar = actualizador(ax, cuerpo, brazos, caras, segmentos, numeros, total)
+    ani = FuncAnimation(fig, actualizar, frames=len(caras), interval=100, blit=False)
+    plt.show()
+
+if __name__ == "__main__":
+    main()
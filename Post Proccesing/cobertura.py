@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+cobertura.py
+────────────
+Solape y cobertura logrados en una campaña terminada, a partir de las
+huellas de huellas.py.
+
+• Solape frontal por frame: el de la calculadora de vuelo,
+  1 − avance / largo de la huella, con el avance real entre los centros
+  de dos huellas consecutivas medido a lo largo de la huella actual.
+• Mapa de cobertura: cuántos frames ven cada celda de una grilla de
+  `res` metros.  Las huellas se rasterizan todas juntas por filas: para
+  cada par (huella, fila) se calcula el tramo de columnas que cubre y se
+  acumula +1/−1 en un array de diferencias que luego se integra con
+  cumsum.
+• Huecos: celdas sin cobertura rodeadas por zona cubierta.  Con scipy se
+  etiquetan como regiones; sin scipy se estima su área (celdas vacías
+  entre celdas cubiertas de su fila y de su columna).
+
+Escribe en la carpeta de la campaña:
+    cobertura.png        norte arriba; huecos en rojo
+    cobertura.json       resumen (áreas, huecos, estadísticas de solape)
+    solape_frames.csv    solape frontal de cada frame
+
+Uso por consola:
+    python cobertura.py "<campaña>" [--res 0.5] [--objetivo 70]
+"""
+
+import argparse, csv, json, os, time
+import numpy as np
+from PIL import Image
+from indice_campaña import cargar as cargar_indice
+import huellas
+
+MAX_CELDAS = 25_000_000
+
+
+def solape_frontal(h):
+    """Solape frontal (0..1) de cada huella válida con la siguiente; NaN en la última."""
+    e = h.esquinas[h.validas]
+    centro = e.mean(axis=1)
+    eje = (e[:, 0] + e[:, 1] - e[:, 2] - e[:, 3]) / 2          # de atrás hacia adelante
+    largo = np.linalg.norm(eje, axis=1)
+    solape = np.full(len(e), np.nan)
+    if len(e) > 1:
+        avance = np.einsum("nd,nd->n", centro[1:] - centro[:-1], eje[:-1]) / largo[:-1]
+        solape[:-1] = np.clip(1 - np.abs(avance) / largo[:-1], 0, 1)
+    return solape
+
+
+def _tramos(p, alto, ancho):
+    """(fila, x0, x1) de cada par (polígono, fila) con los polígonos en unidades de celda."""
+    ymin = np.clip(np.ceil(p[..., 1].min(axis=1)), 0, alto).astype(np.int64)
+    ymax = np.clip(np.floor(p[..., 1].max(axis=1)), -1, alto - 1).astype(np.int64)
+    n = np.maximum(ymax - ymin + 1, 0)
+    poli = np.repeat(np.arange(len(p)), n)
+    fila = np.repeat(ymin, n) + np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+
+    # Cruce de la fila con cada borde; un polígono convexo tiene dos
+    a, b = p[poli], np.roll(p[poli], -1, axis=1)
+    y = fila[:, None].astype(float)
+    cruza = ((a[..., 1] <= y) & (y < b[..., 1])) | ((b[..., 1] <= y) & (y < a[..., 1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = a[..., 0] + (y - a[..., 1]) * (b[..., 0] - a[..., 0]) / (b[..., 1] - a[..., 1])
+    x0 = np.ceil(np.where(cruza, x, np.inf).min(axis=1))
+    x1 = np.floor(np.where(cruza, x, -np.inf).max(axis=1))
+    ok = x0 <= x1
+    return (fila[ok], np.clip(x0[ok], 0, ancho).astype(np.int64),
+            np.clip(x1[ok], -1, ancho - 1).astype(np.int64))
+
+
+def rasterizar(esquinas, res, base, forma, lote=4096):
+    """Cantidad de polígonos convexos que cubren el centro de cada celda (uint16)."""
+    alto, ancho = forma
+    p = (esquinas - base) / res - 0.5                 # en unidades de celda, centros en enteros
+    # +1 al entrar y −1 al salir de cada tramo, integrado por filas al final
+    dif = np.zeros(alto * (ancho + 1), np.int64)
+    for i in range(0, len(p), lote):                  # por lotes: acota la memoria intermedia
+        fila, x0, x1 = _tramos(p[i:i + lote], alto, ancho)
+        dif += np.bincount(fila * (ancho + 1) + x0, minlength=len(dif))
+        dif -= np.bincount(fila * (ancho + 1) + x1 + 1, minlength=len(dif))
+    return np.cumsum(dif.reshape(alto, ancho + 1)[:, :ancho], axis=1).astype(np.uint16)
+
+
+def huecos(cuenta):
+    """(máscara de huecos, áreas en celdas de cada hueco o None sin scipy)."""
+    vacio = cuenta == 0
+    try:
+        from scipy import ndimage
+    except ImportError:
+        cubierto = ~vacio
+        def entre(eje):
+            c = np.cumsum(cubierto, axis=eje)
+            return (c > 0) & (c < c.take([-1], axis=eje))
+        return vacio & entre(0) & entre(1), None
+    etiquetas, n = ndimage.label(vacio)
+    borde = np.unique(np.concatenate([etiquetas[0], etiquetas[-1], etiquetas[:, 0], etiquetas[:, -1]]))
+    areas = np.bincount(etiquetas.ravel(), minlength=n + 1)
+    interior = np.ones(n + 1, bool)
+    interior[borde] = False
+    interior[0] = False
+    return interior[etiquetas], areas[interior]
+
+
+def imagen(cuenta, mascara_huecos):
+    """PNG RGB: negro sin cobertura, azul→verde→amarillo según cantidad de frames."""
+    tope = max(1, int(np.percentile(cuenta[cuenta > 0], 99)) if (cuenta > 0).any() else 1)
+    lut = np.zeros((tope + 1, 3), np.uint8)
+    t = np.linspace(0, 1, tope)
+    lut[1:, 0] = np.clip(2 * t - 1, 0, 1) * 255
+    lut[1:, 1] = np.clip(2 * t, 0, 1) * 220 + 35
+    lut[1:, 2] = np.clip(1 - 2 * t, 0, 1) * 255
+    rgb = lut[np.minimum(cuenta, tope)]
+    rgb[mascara_huecos] = (255, 0, 0)
+    return Image.fromarray(rgb[::-1])                 # fila 0 = sur: se invierte para norte arriba
+
+
+def analizar(carpeta, res=None, suelo=None, objetivo=None):
+    t0 = time.perf_counter()
+    indice = cargar_indice(carpeta)
+    h = huellas.calcular(indice, suelo)
+    e = h.esquinas[h.validas]
+    if not len(e):
+        raise ValueError("La campaña no tiene frames con GPS, actitud y altura sobre el suelo")
+    solape = solape_frontal(h)
+
+    base, tope = e.reshape(-1, 2).min(axis=0), e.reshape(-1, 2).max(axis=0)
+    if res is None:
+        largo = np.linalg.norm(e[:, 0] + e[:, 1] - e[:, 2] - e[:, 3], axis=1) / 2
+        res = float(np.median(largo)) / 20            # ~20 celdas a lo largo de una huella
+    res = max(res, float(np.sqrt(np.prod(tope - base) / MAX_CELDAS)))
+    ancho, alto = (np.ceil((tope - base) / res).astype(int) + 1).tolist()
+    cuenta = rasterizar(e, res, base, (alto, ancho))
+    mascara, areas = huecos(cuenta)
+    t1 = time.perf_counter()
+
+    celda_m2 = res * res
+    (lat0, lon0), (lat1, lon1) = (huellas.a_latlon(*base, h.origen),
+                                  huellas.a_latlon(*(base + np.array([ancho, alto]) * res), h.origen))
+    validos = solape[np.isfinite(solape)]
+    resumen = {
+        "frames": int(len(h.filas)), "huellas_validas": int(len(e)),
+        "resolucion_m": round(res, 3), "grilla": [alto, ancho],
+        "caja_latlon": [round(float(lat0), 7), round(float(lon0), 7),
+                        round(float(lat1), 7), round(float(lon1), 7)],
+        "area_cubierta_m2": round(float((cuenta > 0).sum() * celda_m2), 1),
+        "frames_por_punto": {"media": round(float(cuenta[cuenta > 0].mean()), 2),
+                             "max": int(cuenta.max())},
+        "huecos": {"area_m2": round(float(mascara.sum() * celda_m2), 1),
+                   "cantidad": None if areas is None else int(len(areas)),
+                   "mayor_m2": None if areas is None or not len(areas)
+                               else round(float(areas.max() * celda_m2), 1)},
+        "solape_frontal_pct": {
+            "media": round(float(validos.mean() * 100), 1) if len(validos) else None,
+            "p5": round(float(np.percentile(validos, 5) * 100), 1) if len(validos) else None,
+            "mediana": round(float(np.median(validos) * 100), 1) if len(validos) else None,
+            "min": round(float(validos.min() * 100), 1) if len(validos) else None},
+        "duracion_s": round(t1 - t0, 2),
+    }
+    if objetivo is not None:
+        resumen["solape_frontal_pct"]["objetivo"] = objetivo
+        resumen["solape_frontal_pct"]["frames_bajo_objetivo"] = int((validos * 100 < objetivo).sum())
+
+    imagen(cuenta, mascara).save(os.path.join(carpeta, "cobertura.png"))
+    with open(os.path.join(carpeta, "cobertura.json"), "w") as f:
+        json.dump(resumen, f, indent=2, ensure_ascii=False)
+    filas = h.filas[h.validas]
+    with open(os.path.join(carpeta, "solape_frames.csv"), "w", newline="") as f:
+        wr = csv.writer(f)
+        wr.writerow(["Img_cam1", "Solape_frontal_pct"])
+        for i, s in zip(filas, solape):
+            wr.writerow([indice["Img_cam1"][i], "NONE" if np.isnan(s) else round(float(s * 100), 1)])
+    return resumen
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cobertura y solape logrados en una campaña")
+    ap.add_argument("carpeta", help="carpeta de la campaña")
+    ap.add_argument("--res", type=float, help="tamaño de celda en m (por defecto, 1/20 de la huella)")
+    ap.add_argument("--suelo", type=float, help="altitud del suelo en m (por defecto, la del primer fix)")
+    ap.add_argument("--objetivo", type=float, help="solape frontal objetivo en %% (el de la calculadora)")
+    args = ap.parse_args()
+
+    r = analizar(args.carpeta, args.res, args.suelo, args.objetivo)
+    s, hu = r["solape_frontal_pct"], r["huecos"]
+    print(f"{r['huellas_validas']} huellas en {r['duracion_s']} s, celda de {r['resolucion_m']} m")
+    print(f"Área cubierta: {r['area_cubierta_m2'] / 1e4:.2f} ha, "
+          f"{r['frames_por_punto']['media']} frames por punto en promedio")
+    print(f"Solape frontal: media {s['media']} %, p5 {s['p5']} %, mínimo {s['min']} %")
+    if "frames_bajo_objetivo" in s:
+        print(f"   {s['frames_bajo_objetivo']} frames bajo el objetivo de {s['objetivo']} %")
+    print(f"Huecos: {hu['area_m2']} m²" + (f" en {hu['cantidad']} regiones" if hu["cantidad"] is not None else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,77 @@
-import pandas as pd
 import folium
+import argparse
 import base64
 import os
-import tifffile
-import numpy as np
+import time
+from urllib.parse import quote
 from PIL import Image
 from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 import tkinter as tk
 from tkinter import filedialog
-
-# Selección de carpeta
-tk.Tk().withdraw()
-carpeta = filedialog.askdirectory(title="Selecciona la carpeta de la campaña")
-
-if not carpeta:
-    print("❌ No se seleccionó ninguna carpeta.")
-    exit()
-
-print(f"📁 Carpeta seleccionada: {carpeta}")
-
-# Cargar CSV
-csv_path = os.path.join(carpeta, "log_Campaña.csv")
-df = pd.read_csv(csv_path, encoding='latin1')
-df['Lat'] = pd.to_numeric(df['Lat'], errors='coerce')
-df['Lon'] = pd.to_numeric(df['Lon'], errors='coerce')
-
-mask = (df['Lat'] < -70) & (df['Lon'] > -40)
-df.loc[mask, ['Lat', 'Lon']] = df.loc[mask, ['Lon', 'Lat']].values
-
-df_validas = df[(df['Lat'] < 0) & (df['Lat'] > -90) & (df['Lon'] < 0) & (df['Lon'] > -75)]
-
-cam1_dir = os.path.join(carpeta, "CAM1")
-cam2_dir = os.path.join(carpeta, "CAM2")
-preview1_dir = os.path.join(carpeta, "CAM1_preview")
-preview2_dir = os.path.join(carpeta, "CAM2_preview")
-
-os.makedirs(preview1_dir, exist_ok=True)
-os.makedirs(preview2_dir, exist_ok=True)
-
-def generar_jpg_si_no_existe(tiff_path, jpg_path):
-    if os.path.exists(jpg_path):
-        return
-    if not os.path.exists(tiff_path):
-        return
+from folium.plugins import FastMarkerCluster
+from lectura_frames import leer_reducido, origen_frame
+from indice_campaña import cargar as cargar_indice, a_dataframe
+
+LADO_PREVIEW = 800
+
+# Popup armado en el navegador recién al abrirse: los JPG se piden en ese momento.
+# row = [lat, lon, jpg1, jpg2, nombre]; jpg vacío si no hay preview
+POPUP_JS = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    var img = function (src) {
+        return src ? '<img src="' + src + '" width="640">'
+                   : '<i>Archivo no encontrado</i>';
+    };
+    marker.bindTooltip(row[4]);
+    marker.bindPopup(function () {
+        return '<b>CAM1:</b><br>' + img(row[2]) + '<br><br><b>CAM2:</b><br>' + img(row[3]);
+    }, {maxWidth: 700});
+    return marker;
+}
+"""
+
+def generar_preview(tarea):
+    """Genera un JPG de preview.  Corre en un proceso del pool; devuelve el estado."""
+    tiff_path, jpg_path = tarea
+    origen = origen_frame(tiff_path)
+    if origen is None:
+        return "falta"
+    # Al día si el JPG es posterior al TIFF (o al contenedor que lo guarda)
+    if os.path.exists(jpg_path) and os.path.getmtime(jpg_path) >= os.path.getmtime(origen):
+        return "al_dia"
     try:
-        print(f"🔄 Generando preview: {jpg_path}")
-        img_array = tifffile.imread(tiff_path)
-        img_8bit = (img_array / 16).clip(0, 255).astype(np.uint8)
+        img_8bit = leer_reducido(tiff_path, LADO_PREVIEW)  # Mono12 o Mono12p, ya a 8 bits
         img_pil = Image.fromarray(img_8bit)
-        img_pil.thumbnail((800, 800))
+        img_pil.thumbnail((LADO_PREVIEW, LADO_PREVIEW))
         img_pil.save(jpg_path, format="JPEG", quality=70)
+        return "ok"
     except Exception as e:
-        print(f"⚠️ Error al convertir {tiff_path} → {e}")
+        return f"⚠️ Error al convertir {tiff_path} → {e}"
+
+def generar_previews(tareas, procesos=None):
+    """Previews en paralelo, un proceso por núcleo, con avance y frames/s."""
+    procesos = procesos or os.cpu_count() or 1
+    total, cuenta = len(tareas), {"ok": 0, "al_dia": 0, "falta": 0, "error": 0}
+    t0 = t_aviso = time.monotonic()
+    print(f"🔄 Generando {total} previews con {procesos} procesos")
+    with ProcessPoolExecutor(max_workers=procesos) as ex:
+        for i, estado in enumerate(ex.map(generar_preview, tareas,
+                                          chunksize=max(1, min(16, total // (4 * procesos)))), 1):
+            if estado in cuenta:
+                cuenta[estado] += 1
+            else:
+                cuenta["error"] += 1
+                print(estado)
+            ahora = time.monotonic()
+            if ahora - t_aviso >= 2 or i == total:
+                t_aviso = ahora
+                print(f"   {i}/{total}  ({cuenta['ok'] / max(ahora - t0, 1e-9):.1f} frames/s)")
+    dur = time.monotonic() - t0
+    print(f"✅ Previews: {cuenta['ok']} nuevos, {cuenta['al_dia']} al día, "
+          f"{cuenta['falta']} sin TIFF, {cuenta['error']} con error en {dur:.1f} s")
+    return cuenta
 
 def codificar_jpg(path, max_ancho=640):
     if not os.path.exists(path):
@@ -66,25 +86,34 @@ def codificar_jpg(path, max_ancho=640):
     except Exception as e:
         return f"<i>Error al procesar imagen:<br>{e}</i>"
 
-# Convertir imágenes
-for _, row in df.iterrows():
-    tiff1 = os.path.join(cam1_dir, row["Img_cam1"])
-    tiff2 = os.path.join(cam2_dir, row["Img_cam2"])
-    jpg1 = os.path.join(preview1_dir, row["Img_cam1"].replace(".tiff", ".jpg"))
-    jpg2 = os.path.join(preview2_dir, row["Img_cam2"].replace(".tiff", ".jpg"))
-    generar_jpg_si_no_existe(tiff1, jpg1)
-    generar_jpg_si_no_existe(tiff2, jpg2)
-
-# Crear mapa solo si hay coordenadas válidas
-if not df_validas.empty:
-    m = folium.Map(
-        location=[df_validas['Lat'].iloc[0], df_validas['Lon'].iloc[0]],
-        zoom_start=18,
-        max_zoom=22,
-        tiles='https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}',
-        attr='Esri — World Imagery'
+def recorrido(df_validas):
+    """Traza de la campaña como una sola LineString GeoJSON."""
+    coords = df_validas[['Lon', 'Lat']].round(7).values.tolist()
+    return folium.GeoJson(
+        {"type": "Feature", "properties": {},
+         "geometry": {"type": "LineString", "coordinates": coords}},
+        name="Recorrido",
+        style_function=lambda _: {"color": "#ffcc00", "weight": 3},
     )
 
+def marcadores_externos(df_validas, carpeta, preview1_dir, preview2_dir):
+    """Marcadores agrupados; los popups referencian los JPG por ruta relativa al HTML."""
+    def relativa(jpg):
+        if not os.path.exists(jpg):
+            return ""
+        return quote(os.path.relpath(jpg, carpeta).replace(os.sep, "/"))
+
+    datos = [
+        [round(row['Lat'], 7), round(row['Lon'], 7),
+         relativa(os.path.join(preview1_dir, row["Img_cam1"].replace(".tiff", ".jpg"))),
+         relativa(os.path.join(preview2_dir, row["Img_cam2"].replace(".tiff", ".jpg"))),
+         row["Img_cam1"]]
+        for _, row in df_validas.iterrows()
+    ]
+    return FastMarkerCluster(datos, callback=POPUP_JS, name="Frames")
+
+def marcadores_embebidos(m, df_validas, preview1_dir, preview2_dir):
+    """Un Marker por frame con los JPG en base64 dentro del HTML (autocontenido)."""
     for _, row in df_validas.iterrows():
         jpg1 = os.path.join(preview1_dir, row["Img_cam1"].replace(".tiff", ".jpg"))
         jpg2 = os.path.join(preview2_dir, row["Img_cam2"].replace(".tiff", ".jpg"))
@@ -100,8 +129,68 @@ if not df_validas.empty:
             tooltip=row["Img_cam1"]
         ).add_to(m)
 
-    output_path = os.path.join(carpeta, "mapa_interactivo.html")
-    m.save(output_path)
-    print(f"✅ Mapa generado: {output_path}")
-else:
-    print("⚠️ No se encontraron coordenadas válidas. Solo se generaron los JPG.")
+def main():
+    ap = argparse.ArgumentParser(description="Previews y mapa interactivo de una campaña")
+    ap.add_argument("carpeta", nargs="?", help="carpeta de la campaña (si falta, se pregunta)")
+    ap.add_argument("--modo", choices=("externo", "embebido"), default="externo",
+                    help="externo: JPG referenciados y cargados al abrir el popup; "
+                         "embebido: JPG en base64 dentro del HTML (un solo archivo)")
+    args = ap.parse_args()
+
+    # Selección de carpeta
+    carpeta = args.carpeta
+    if not carpeta:
+        tk.Tk().withdraw()
+        carpeta = filedialog.askdirectory(title="Selecciona la carpeta de la campaña")
+
+    if not carpeta:
+        print("❌ No se seleccionó ninguna carpeta.")
+        return
+
+    print(f"📁 Carpeta seleccionada: {carpeta}")
+
+    # Índice de la campaña (se rehace solo si cambió log_Campaña.csv)
+    indice = cargar_indice(carpeta)
+    df = a_dataframe(indice)
+    df_validas = df[df['gps_valido']]
+
+    preview1_dir = os.path.join(carpeta, "CAM1_preview")
+    preview2_dir = os.path.join(carpeta, "CAM2_preview")
+
+    os.makedirs(preview1_dir, exist_ok=True)
+    os.makedirs(preview2_dir, exist_ok=True)
+
+    # Convertir imágenes
+    tareas = []
+    for _, row in df.iterrows():
+        tareas.append((row["Ruta_cam1"],
+                       os.path.join(preview1_dir, row["Img_cam1"].replace(".tiff", ".jpg"))))
+        tareas.append((row["Ruta_cam2"],
+                       os.path.join(preview2_dir, row["Img_cam2"].replace(".tiff", ".jpg"))))
+    generar_previews(tareas)
+
+    # Crear mapa solo si hay coordenadas válidas
+    if not df_validas.empty:
+        m = folium.Map(
+            location=[df_validas['Lat'].iloc[0], df_validas['Lon'].iloc[0]],
+            zoom_start=18,
+            max_zoom=22,
+            tiles='https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}',
+            attr='Esri — World Imagery'
+        )
+
+        recorrido(df_validas).add_to(m)
+        if args.modo == "externo":
+            marcadores_externos(df_validas, carpeta, preview1_dir, preview2_dir).add_to(m)
+        else:
+            marcadores_embebidos(m, df_validas, preview1_dir, preview2_dir)
+        folium.LayerControl().add_to(m)
+
+        output_path = os.path.join(carpeta, "mapa_interactivo.html")
+        m.save(output_path)
+        print(f"✅ Mapa generado: {output_path}")
+    else:
+        print("⚠️ No se encontraron coordenadas válidas. Solo se generaron los JPG.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+huellas.py
+──────────
+Huella en el suelo de cada frame de la campaña y un índice espacial para
+consultar qué frames cubren un punto o una caja.
+
+Modelo (el mismo de calculadora_vuelo_con_retorno.py):
+• cámara apuntando al nadir, FOV vertical 20.4° a lo largo del avance
+  (eje x del dron) y horizontal derivado del sensor 16:9 a lo ancho;
+• actitud Yaw/Pitch/Roll del log con la convención ZYX (Rz·Ry·Rx, NED);
+• suelo plano a la altitud del primer fix válido (el log guarda altitud
+  sobre el nivel del mar), salvo que se indique otro `suelo`.
+
+Las cuatro esquinas de todos los frames se calculan en una pasada de
+NumPy: rayos por las esquinas del sensor, rotados e intersectados con el
+plano del suelo.  Las coordenadas son metros Este/Norte en un plano local
+centrado en la campaña.  Un rayo que no llega al suelo (actitud extrema)
+deja la huella inválida.
+
+`GrillaEspacial` es una grilla regular en formato CSR: cada celda guarda
+los frames cuya caja envolvente la toca; las consultas filtran esos
+candidatos con el polígono exacto.
+
+Uso por consola:
+    python huellas.py "<campaña>" [--punto LAT LON] [--geojson]
+"""
+
+import argparse, json, math, os, time
+import numpy as np
+from indice_campaña import cargar as cargar_indice
+
+FOV_VERTICAL_DEG = 20.4
+ASPECTO = 16 / 9                       # ancho / alto del sensor (3840×2160)
+RADIO_TIERRA = 6371008.8
+Z_MIN = math.cos(math.radians(80))     # rayos a menos de 10° del horizonte: sin huella
+
+
+def rotaciones(yaw, pitch, roll):
+    """Matrices cuerpo→NED Rz·Ry·Rx de todos los frames, (N, 3, 3), en radianes."""
+    cz, sz = np.cos(yaw), np.sin(yaw)
+    cy, sy = np.cos(pitch), np.sin(pitch)
+    cx, sx = np.cos(roll), np.sin(roll)
+    return np.stack([
+        cz*cy, cz*sy*sx - sz*cx, cz*sy*cx + sz*sx,
+        sz*cy, sz*sy*sx + cz*cx, sz*sy*cx - cz*sx,
+        -sy,   cy*sx,            cy*cx], axis=-1).reshape(-1, 3, 3)
+
+
+def a_local(lat, lon, origen):
+    """Lat/Lon → metros (Este, Norte) respecto de `origen` (equirectangular)."""
+    lat0, lon0 = origen
+    este = np.radians(np.asarray(lon) - lon0) * RADIO_TIERRA * math.cos(math.radians(lat0))
+    norte = np.radians(np.asarray(lat) - lat0) * RADIO_TIERRA
+    return este, norte
+
+
+def a_latlon(este, norte, origen):
+    lat0, lon0 = origen
+    lat = lat0 + np.degrees(np.asarray(norte) / RADIO_TIERRA)
+    lon = lon0 + np.degrees(np.asarray(este) / (RADIO_TIERRA * math.cos(math.radians(lat0))))
+    return lat, lon
+
+
+def _esquinas_sensor(fov_vertical_deg=FOV_VERTICAL_DEG, aspecto=ASPECTO):
+    """Direcciones de las esquinas en ejes del cuerpo (x avance, y derecha, z abajo)."""
+    tv = math.tan(math.radians(fov_vertical_deg) / 2)
+    th = tv * aspecto
+    return np.array([[tv, th, 1], [tv, -th, 1], [-tv, -th, 1], [-tv, th, 1]])
+
+
+class Huellas:
+    """Esquinas (N, 4, 2) en metros Este/Norte de los frames con posición y actitud.
+
+    `filas` son las filas del índice de la campaña a las que corresponde
+    cada huella; `validas` marca las que llegan al suelo.
+    """
+
+    def __init__(self, esquinas, filas, validas, origen, indice):
+        self.esquinas, self.filas, self.validas = esquinas, filas, validas
+        self.origen, self.indice = origen, indice
+        self._grilla = None
+
+    def __len__(self):
+        return len(self.filas)
+
+    @property
+    def grilla(self):
+        if self._grilla is None:
+            self._grilla = GrillaEspacial(self.esquinas[self.validas])
+        return self._grilla
+
+    def _a_filas(self, k):
+        return self.filas[np.flatnonzero(self.validas)[k]]
+
+    def que_cubren(self, lat, lon):
+        """Filas del índice cuyos frames contienen el punto."""
+        return self._a_filas(self.grilla.en_punto(*a_local(lat, lon, self.origen)))
+
+    def en_caja(self, lat_min, lon_min, lat_max, lon_max):
+        """Filas del índice cuyos frames tocan la caja lat/lon."""
+        e0, n0 = a_local(lat_min, lon_min, self.origen)
+        e1, n1 = a_local(lat_max, lon_max, self.origen)
+        return self._a_filas(self.grilla.en_caja(e0, n0, e1, n1))
+
+    def a_geojson(self, ruta):
+        """Escribe las huellas válidas como FeatureCollection de polígonos."""
+        lat, lon = a_latlon(self.esquinas[..., 0], self.esquinas[..., 1], self.origen)
+        feats = []
+        for k in np.flatnonzero(self.validas):
+            anillo = np.round(np.column_stack([lon[k], lat[k]]), 7).tolist()
+            feats.append({"type": "Feature",
+                          "properties": {"Img_cam1": str(self.indice["Img_cam1"][self.filas[k]])},
+                          "geometry": {"type": "Polygon", "coordinates": [anillo + anillo[:1]]}})
+        with open(ruta, "w") as f:
+            json.dump({"type": "FeatureCollection", "features": feats}, f)
+        return len(feats)
+
+
+def calcular(indice, suelo=None, fov_vertical_deg=FOV_VERTICAL_DEG, aspecto=ASPECTO):
+    """Huellas de todos los frames con GPS y actitud, en una pasada vectorizada."""
+    filas = np.flatnonzero(indice["gps_valido"] & indice["actitud_valida"]
+                           & np.isfinite(indice["Alt"]))
+    lat, lon, alt = indice["Lat"][filas], indice["Lon"][filas], indice["Alt"][filas]
+    if suelo is None:
+        suelo = float(alt[0]) if len(alt) else 0.0
+    origen = (float(np.mean(lat)), float(np.mean(lon))) if len(lat) else (0.0, 0.0)
+
+    R = rotaciones(*(np.radians(indice[c][filas]) for c in ("Yaw_deg", "Pitch_deg", "Roll_deg")))
+    rayos = np.einsum("nij,cj->nci", R, _esquinas_sensor(fov_vertical_deg, aspecto))
+    z = rayos[..., 2] / np.linalg.norm(rayos, axis=-1)
+    agl = (alt - suelo)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = agl / rayos[..., 2]
+    validas = (agl[:, 0] > 0) & (z > Z_MIN).all(axis=1)
+
+    este, norte = a_local(lat, lon, origen)
+    esquinas = np.empty((len(filas), 4, 2))
+    esquinas[..., 0] = este[:, None] + t * rayos[..., 1]     # NED: y = Este
+    esquinas[..., 1] = norte[:, None] + t * rayos[..., 0]    #      x = Norte
+    esquinas[~validas] = np.nan
+    return Huellas(esquinas, filas, validas, origen, indice)
+
+
+class GrillaEspacial:
+    """Índice de polígonos convexos de 4 lados sobre una grilla regular (CSR).
+
+    `claves` son las celdas ocupadas (ordenadas) y `frames[inicio[k]:inicio[k+1]]`
+    los polígonos cuya caja envolvente toca la celda `claves[k]`.
+    """
+
+    def __init__(self, esquinas, celda=None):
+        self.esquinas = esquinas
+        self.min, self.max = esquinas.min(axis=1), esquinas.max(axis=1)
+        if celda is None:
+            # Del orden de una huella: pocas celdas por frame y pocos frames por celda
+            celda = float(np.median((self.max - self.min).max(axis=1))) if len(esquinas) else 1.0
+        self.celda = max(celda, 1e-6)
+        self.base = self.min.min(axis=0) if len(esquinas) else np.zeros(2)
+
+        c0 = self._celda(self.min)
+        c1 = self._celda(self.max)
+        self.columnas = int(c1[:, 0].max()) + 1 if len(esquinas) else 1
+        self.filas = int(c1[:, 1].max()) + 1 if len(esquinas) else 1
+        nx, ny = c1[:, 0] - c0[:, 0] + 1, c1[:, 1] - c0[:, 1] + 1
+        n = nx * ny
+        frame = np.repeat(np.arange(len(esquinas)), n)
+        # posición de cada par (frame, celda) dentro del rectángulo de celdas del frame
+        j = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        cx = np.repeat(c0[:, 0], n) + j % np.repeat(nx, n)
+        cy = np.repeat(c0[:, 1], n) + j // np.repeat(nx, n)
+        clave = cy * self.columnas + cx
+        orden = np.argsort(clave, kind="stable")
+        clave, self.frames = clave[orden], frame[orden]
+        self.claves, self.inicio = np.unique(clave, return_index=True)
+        self.inicio = np.append(self.inicio, len(clave))
+
+    def _celda(self, xy):
+        return np.floor((np.asarray(xy) - self.base) / self.celda).astype(np.int64)
+
+    def _candidatos(self, claves):
+        k = np.searchsorted(self.claves, claves)
+        k = k[(k < len(self.claves)) & (self.claves[np.minimum(k, len(self.claves) - 1)] == claves)]
+        if not len(k):
+            return np.empty(0, np.int64)
+        return np.unique(np.concatenate([self.frames[self.inicio[i]:self.inicio[i + 1]] for i in k]))
+
+    def en_punto(self, x, y):
+        """Polígonos que contienen el punto (x, y)."""
+        cx, cy = self._celda((x, y))
+        if not (0 <= cx < self.columnas and 0 <= cy < self.filas):
+            return np.empty(0, np.int64)
+        cand = self._candidatos(np.array([cy * self.columnas + cx]))
+        p = self.esquinas[cand]
+        a, b = p, np.roll(p, -1, axis=1)
+        cruz = (b[..., 0] - a[..., 0]) * (y - a[..., 1]) - (b[..., 1] - a[..., 1]) * (x - a[..., 0])
+        dentro = (cruz >= 0).all(axis=1) | (cruz <= 0).all(axis=1)   # cualquier sentido de giro
+        return cand[dentro]
+
+    def en_caja(self, x0, y0, x1, y1):
+        """Polígonos que intersectan la caja [x0, x1] × [y0, y1]."""
+        (cx0, cy0), (cx1, cy1) = self._celda((x0, y0)), self._celda((x1, y1))
+        cx0, cy0 = max(cx0, 0), max(cy0, 0)
+        cx1, cy1 = min(cx1, self.columnas - 1), min(cy1, self.filas - 1)
+        if cx1 < cx0 or cy1 < cy0:
+            return np.empty(0, np.int64)
+        gx, gy = np.meshgrid(np.arange(cx0, cx1 + 1), np.arange(cy0, cy1 + 1))
+        cand = self._candidatos((gy * self.columnas + gx).ravel())
+        # Ejes separadores: los de la caja (cajas envolventes) y las normales del polígono
+        cand = cand[(self.min[cand, 0] <= x1) & (self.max[cand, 0] >= x0)
+                    & (self.min[cand, 1] <= y1) & (self.max[cand, 1] >= y0)]
+        p = self.esquinas[cand]
+        borde = np.roll(p, -1, axis=1) - p
+        normal = np.stack([-borde[..., 1], borde[..., 0]], axis=-1)          # (M, 4, 2)
+        caja = np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]])
+        proy_p = np.einsum("mkd,mjd->mkj", normal, p)                        # (M, 4 ejes, 4 esquinas)
+        proy_c = np.einsum("mkd,jd->mkj", normal, caja)
+        separa = (proy_p.max(axis=2) < proy_c.min(axis=2)) | (proy_c.max(axis=2) < proy_p.min(axis=2))
+        return cand[~separa.any(axis=1)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Huellas en el suelo de los frames de una campaña")
+    ap.add_argument("carpeta", help="carpeta de la campaña")
+    ap.add_argument("--suelo", type=float, help="altitud del suelo en m (por defecto, la del primer fix)")
+    ap.add_argument("--punto", type=float, nargs=2, metavar=("LAT", "LON"),
+                    help="listar los frames que cubren este punto")
+    ap.add_argument("--geojson", action="store_true", help="escribir huellas.geojson en la campaña")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    h = calcular(cargar_indice(args.carpeta), args.suelo)
+    t1 = time.perf_counter()
+    h.grilla
+    t2 = time.perf_counter()
+    print(f"{int(h.validas.sum())} huellas de {len(h)} frames con GPS y actitud "
+          f"({(t1 - t0) * 1e3:.0f} ms), índice de {len(h.grilla.claves)} celdas de "
+          f"{h.grilla.celda:.1f} m ({(t2 - t1) * 1e3:.0f} ms)")
+    if args.punto:
+        t = time.perf_counter()
+        filas = h.que_cubren(*args.punto)
+        print(f"{len(filas)} frames cubren el punto ({(time.perf_counter() - t) * 1e3:.2f} ms)")
+        for i in filas:
+            print("  ", h.indice["Img_cam1"][i], h.indice["Img_cam2"][i])
+    if args.geojson:
+        ruta = os.path.join(args.carpeta, "huellas.geojson")
+        print(f"{h.a_geojson(ruta)} huellas → {ruta}")
+
+
+if __name__ == "__main__":
+    main()
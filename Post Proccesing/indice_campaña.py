@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+indice_campaña.py
+─────────────────
+Índice columnar de una campaña (indice_campaña.npz), para no volver a
+parsear log_Campaña.csv en cada herramienta de post-proceso.
+
+El CSV se lee una sola vez y se guarda con tipos:
+• columnas numéricas (Lat, Lon, Alt, Yaw_deg, …) como float64, NaN donde
+  el log dice NONE o el valor no se puede leer;
+• Hora_RTC / Hora_GPS como epoch en segundos (t_rtc, t_gps);
+• Img_cam1 / Img_cam2 y las rutas resueltas Ruta_cam1 / Ruta_cam2;
+• máscaras: gps_valido, actitud_valida, existe_cam1, existe_cam2 y
+  latlon_invertida (filas a las que se les corrigió Lat/Lon invertidas).
+
+`cargar()` reconstruye el índice solo si el CSV cambió (mtime o tamaño)
+o si la carpeta se movió; si no, lo carga del .npz en milisegundos.
+
+Uso por consola:
+    python indice_campaña.py "/ruta/Campaña 01-07-2025 - 10h00m00s"
+"""
+
+import csv, datetime, math, os, sys, time
+import numpy as np
+from lectura_frames import existe_frame
+
+VERSION = 1
+NOMBRE_CSV, NOMBRE_INDICE = "log_Campaña.csv", "indice_campaña.npz"
+TEXTO = ("Hora_RTC", "Hora_GPS", "Img_cam1", "Img_cam2")
+
+
+def _epoch(texto, utc=False):
+    """ISO 8601 → epoch s, NaN si falta.  Hora_GPS se guarda en UTC sin huso."""
+    try:
+        t = datetime.datetime.fromisoformat(texto)
+    except (TypeError, ValueError):
+        return math.nan
+    if utc and t.tzinfo is None:
+        t = t.replace(tzinfo=datetime.timezone.utc)
+    return t.timestamp()
+
+
+def _float(texto):
+    try:
+        return float(texto)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def construir(carpeta):
+    """Parsea el CSV, escribe el .npz y devuelve el índice (dict de arrays)."""
+    carpeta = os.path.abspath(carpeta)
+    ruta_csv = os.path.join(carpeta, NOMBRE_CSV)
+    st = os.stat(ruta_csv)
+    with open(ruta_csv, newline="", encoding="latin1") as f:
+        filas = list(csv.DictReader(f))
+    numericas = [c for c in (filas[0].keys() if filas else ()) if c not in TEXTO]
+
+    ind = {c: np.array([_float(r[c]) for r in filas], np.float64) for c in numericas}
+    ind["t_rtc"] = np.array([_epoch(r.get("Hora_RTC")) for r in filas], np.float64)
+    ind["t_gps"] = np.array([_epoch(r.get("Hora_GPS"), utc=True) for r in filas], np.float64)
+    for n in (1, 2):
+        img = np.array([r.get(f"Img_cam{n}") or "" for r in filas], dtype=str)
+        ruta = np.array([os.path.join(carpeta, f"CAM{n}", x) if x else "" for x in img], dtype=str)
+        ind[f"Img_cam{n}"], ind[f"Ruta_cam{n}"] = img, ruta
+        ind[f"existe_cam{n}"] = np.array([bool(x) and existe_frame(x) for x in ruta], bool)
+
+    if "Lat" in ind and "Lon" in ind:
+        lat, lon = ind["Lat"], ind["Lon"]
+        # Algunos logs viejos traen Lat/Lon invertidas
+        inv = (lat < -70) & (lon > -40)
+        lat[inv], lon[inv] = lon[inv], lat[inv]
+        ind["latlon_invertida"] = inv
+        ind["gps_valido"] = (lat < 0) & (lat > -90) & (lon < 0) & (lon > -75)
+    else:
+        ind["latlon_invertida"] = ind["gps_valido"] = np.zeros(len(filas), bool)
+    att = [c for c in ("Yaw_deg", "Pitch_deg", "Roll_deg") if c in ind]
+    ind["actitud_valida"] = (np.isfinite(np.column_stack([ind[c] for c in att])).all(axis=1)
+                             if len(att) == 3 else np.zeros(len(filas), bool))
+
+    meta = {"_version": np.int64(VERSION), "_csv_mtime_ns": np.int64(st.st_mtime_ns),
+            "_csv_largo": np.int64(st.st_size), "_carpeta": np.array(carpeta)}
+    ruta_ind = os.path.join(carpeta, NOMBRE_INDICE)
+    tmp = ruta_ind + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **ind, **meta)
+    os.replace(tmp, ruta_ind)            # un índice a medias nunca queda con el nombre final
+    return ind
+
+
+def _vigente(ind, carpeta):
+    try:
+        st = os.stat(os.path.join(carpeta, NOMBRE_CSV))
+    except OSError:
+        return True                      # sin CSV: lo que haya en el índice es lo único que queda
+    return (int(ind["_version"]) == VERSION and str(ind["_carpeta"]) == carpeta
+            and int(ind["_csv_mtime_ns"]) == st.st_mtime_ns
+            and int(ind["_csv_largo"]) == st.st_size)
+
+
+def cargar(carpeta, reconstruir=False):
+    """Índice de la campaña como dict de arrays; se reconstruye si está viejo."""
+    carpeta = os.path.abspath(carpeta)
+    ruta_ind = os.path.join(carpeta, NOMBRE_INDICE)
+    if not reconstruir and os.path.exists(ruta_ind):
+        try:
+            with np.load(ruta_ind, allow_pickle=False) as z:
+                ind = {k: z[k] for k in z.files}
+            if _vigente(ind, carpeta):
+                return {k: v for k, v in ind.items() if not k.startswith("_")}
+        except (OSError, ValueError, KeyError):
+            pass                         # índice dañado o de otra versión: se rehace
+    return construir(carpeta)
+
+
+def a_dataframe(ind):
+    """El índice como DataFrame de pandas (columnas con los nombres del CSV)."""
+    import pandas as pd
+    return pd.DataFrame(ind)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("Uso: python indice_campaña.py <carpeta de la campaña>")
+    t0 = time.perf_counter()
+    ind = construir(sys.argv[1])
+    n = len(ind["t_rtc"])
+    print(f"{n} filas indexadas en {time.perf_counter() - t0:.2f} s: "
+          f"{int(ind['gps_valido'].sum())} con GPS, {int(ind['actitud_valida'].sum())} con actitud, "
+          f"{int(ind['latlon_invertida'].sum())} con Lat/Lon corregidas")
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+lector_contenedor.py
+────────────────────
+Lectura y exportación de los contenedores por cámara (cam1.vfr + cam1.vfi)
+que genera la captura con "Contenedor": true.
+
+• LectorContenedor(carpeta_cam)   acceso aleatorio por índice de frame
+                                   o por nombre (cam1_<ts>.tiff); un
+                                   mismo lector sirve a varios hilos.
+• exportar(carpeta_cam)           vuelve a escribir un TIFF por frame
+                                   con el nombre original, byte a byte.
+
+Uso por consola (exporta CAM1 y CAM2 de una campaña):
+    python lector_contenedor.py "/ruta/Campaña 01-07-2025 - 10h00m00s"
+"""
+
+import glob, os, sys, threading
+import numpy as np
+from io import BytesIO
+from lectura_frames import leer_tiff
+
+MAGIA    = b"VFRIDX01"
+REGISTRO = np.dtype([("seq", "<u8"), ("offset", "<u8"),
+                     ("largo", "<u8"), ("nombre", "S40")])
+
+
+def buscar_contenedor(carpeta):
+    """Devuelve la ruta del .vfr de una carpeta CAMx, o None."""
+    vfr = sorted(glob.glob(os.path.join(carpeta, "*.vfr")))
+    return vfr[0] if vfr else None
+
+
+class LectorContenedor:
+    """Frames de un contenedor ordenados por secuencia de captura."""
+
+    def __init__(self, ruta_vfr):
+        self.ruta = ruta_vfr
+        with open(ruta_vfr[:-4] + ".vfi", "rb") as f:
+            if f.read(len(MAGIA)) != MAGIA:
+                raise ValueError(f"Índice inválido: {ruta_vfr}")
+            crudo = f.read()
+        # Un registro incompleto al final (corte de energía) se ignora
+        n = len(crudo) // REGISTRO.itemsize
+        reg = np.frombuffer(crudo, REGISTRO, count=n)
+        self.registros = reg[np.argsort(reg["seq"], kind="stable")]
+        self.nombres   = [x.decode() for x in self.registros["nombre"]]
+        self._pos      = {nom: i for i, nom in enumerate(self.nombres)}
+        self._f        = open(ruta_vfr, "rb")
+        self._lock     = threading.Lock()
+
+    def __len__(self):
+        return len(self.registros)
+
+    def __contains__(self, nombre):
+        return nombre in self._pos
+
+    def indice_de(self, nombre):
+        return self._pos[nombre]
+
+    def blob(self, i):
+        """Bytes del TIFF del frame i.  Se puede llamar desde varios hilos a la vez."""
+        r = self.registros[i]
+        offset, largo = int(r["offset"]), int(r["largo"])
+        if hasattr(os, "pread"):
+            # Lectura posicional: no usa la posición compartida del archivo
+            return os.pread(self._f.fileno(), largo, offset)
+        with self._lock:                              # Windows: seek + read juntos
+            self._f.seek(offset)
+            return self._f.read(largo)
+
+    def leer(self, i):
+        """Frame i como uint16 de 12 bits."""
+        return leer_tiff(BytesIO(self.blob(i)))
+
+    def leer_nombre(self, nombre):
+        return self.leer(self._pos[nombre])
+
+    def exportar(self, destino=None):
+        destino = destino or os.path.dirname(self.ruta)
+        os.makedirs(destino, exist_ok=True)
+        for i, nombre in enumerate(self.nombres):
+            with open(os.path.join(destino, nombre), "wb") as f:
+                f.write(self.blob(i))
+        return len(self.nombres)
+
+    def cerrar(self):
+        self._f.close()
+
+
+def exportar(carpeta_cam, destino=None):
+    vfr = buscar_contenedor(carpeta_cam)
+    if vfr is None:
+        return 0
+    lector = LectorContenedor(vfr)
+    try:
+        return lector.exportar(destino)
+    finally:
+        lector.cerrar()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("Uso: python lector_contenedor.py <carpeta de la campaña>")
+    for cam in ("CAM1", "CAM2"):
+        n = exportar(os.path.join(sys.argv[1], cam))
+        print(f"{cam}: {n} frames exportados")
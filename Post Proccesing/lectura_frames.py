@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+lectura_frames.py
+─────────────────
+Lectura de los frames de una campaña, sea cual sea el formato en que se
+guardaron:
+
+• Mono12  : TIFF uint16 (12 bits útiles), se devuelve tal cual.
+• Mono12p : TIFF uint8 con el payload empaquetado de la cámara (2 píxeles
+            en 3 bytes).  La descripción del TIFF lleva
+            {"PixelFormat": "Mono12p", "Width": W, "Height": H} y se
+            desempaqueta a uint16 de forma vectorizada.
+
+Si la campaña se grabó en contenedor (CAMx/camx.vfr) y el TIFF suelto no
+existe, `leer_frame` lo busca por nombre dentro del contenedor.
+
+`leer_reducido` entrega una versión 8 bits submuestreada para previews:
+si el TIFF no está comprimido lee solo las filas y columnas necesarias
+(memmap del archivo o vista sobre el blob del contenedor) sin decodificar
+el frame completo; en Mono12p toma el byte alto de los píxeles impares.
+"""
+
+import json, os
+import numpy as np
+import tifffile
+from io import BytesIO
+
+
+def desempaquetar_mono12p(datos, ancho, alto):
+    """Convierte un buffer Mono12p (PFNC, LSB primero) a uint16 (alto, ancho).
+
+    Cada grupo de 3 bytes b0 b1 b2 contiene dos píxeles:
+        p0 = b0        | (b1 & 0x0F) << 8
+        p1 = b1 >> 4   |  b2         << 4
+    """
+    b = np.frombuffer(np.ascontiguousarray(datos), np.uint8,
+                      count=ancho * alto * 3 // 2).reshape(-1, 3)
+    b0, b1, b2 = (b[:, i].astype(np.uint16) for i in range(3))
+    out = np.empty((b.shape[0], 2), np.uint16)
+    np.bitwise_or(b0, (b1 & 0x0F) << 8, out=out[:, 0])
+    np.bitwise_or(b1 >> 4, b2 << 4, out=out[:, 1])
+    return out.reshape(alto, ancho)
+
+
+def formato_pagina(pagina):
+    """Devuelve el dict de formato guardado en la descripción, o {} si es Mono12."""
+    try:
+        meta = json.loads(pagina.description or "{}")
+    except ValueError:
+        return {}
+    return meta if meta.get("PixelFormat") == "Mono12p" else {}
+
+
+def leer_tiff(fuente):
+    """Lee un TIFF (ruta o archivo en memoria) como uint16 de 12 bits."""
+    with tifffile.TiffFile(fuente) as tif:
+        pagina = tif.pages[0]
+        datos  = pagina.asarray()
+        fmt    = formato_pagina(pagina)
+    if fmt:
+        return desempaquetar_mono12p(datos, fmt["Width"], fmt["Height"])
+    return datos
+
+
+def _reducir(datos, fmt, paso):
+    """Submuestreo 1 de cada `paso` y paso a 8 bits (>> 4) de un frame leído o mapeado."""
+    if fmt:
+        datos = datos.reshape(fmt["Height"], -1)
+        if paso < 2:
+            return (desempaquetar_mono12p(datos, fmt["Width"], fmt["Height"]) >> 4).astype(np.uint8)
+        # b2 de cada grupo = 8 bits altos del píxel impar: sin desempaquetar
+        return np.ascontiguousarray(datos[::paso, 2::3][:, ::paso // 2])
+    return (datos[::paso, ::paso] >> 4).astype(np.uint8)
+
+
+def reducir_tiff(fuente, lado_max=800, blob=None):
+    """Frame 8 bits con su lado mayor cerca de `lado_max` (sin pasarse del doble).
+
+    `fuente` es una ruta o, para frames del contenedor, un BytesIO sobre `blob`.
+    """
+    with tifffile.TiffFile(fuente) as tif:
+        pagina = tif.pages[0]
+        fmt    = formato_pagina(pagina)
+        alto, ancho = (fmt["Height"], fmt["Width"]) if fmt else pagina.shape[:2]
+        paso = max(1, max(alto, ancho) // lado_max)
+        if fmt and paso > 1:
+            paso -= paso % 2                    # Mono12p: pares de píxeles
+        if pagina.compression == 1 and pagina.is_contiguous:
+            # Sin comprimir y en un solo tramo: se mapea en vez de decodificar
+            dtype, offset = pagina.dtype.newbyteorder(tif.byteorder), pagina.dataoffsets[0]
+            if blob is None:
+                datos = np.memmap(fuente, dtype, "r", offset, pagina.shape)
+            else:
+                datos = np.frombuffer(blob, dtype, count=int(np.prod(pagina.shape)),
+                                      offset=offset).reshape(pagina.shape)
+        else:
+            datos = pagina.asarray()
+        return _reducir(datos, fmt, paso)
+
+
+_lectores = {}
+
+def _lector(carpeta):
+    """Contenedor de la carpeta CAMx (cacheado), o None si no hay."""
+    if carpeta not in _lectores:
+        from lector_contenedor import LectorContenedor, buscar_contenedor
+        vfr = buscar_contenedor(carpeta)
+        _lectores[carpeta] = LectorContenedor(vfr) if vfr else None
+    return _lectores[carpeta]
+
+
+def existe_frame(ruta):
+    if os.path.exists(ruta):
+        return True
+    lector = _lector(os.path.dirname(ruta))
+    return lector is not None and os.path.basename(ruta) in lector
+
+
+def origen_frame(ruta):
+    """Archivo donde está guardado el frame (TIFF suelto o .vfr), o None."""
+    if os.path.exists(ruta):
+        return ruta
+    lector = _lector(os.path.dirname(ruta))
+    if lector is not None and os.path.basename(ruta) in lector:
+        return lector.ruta
+    return None
+
+
+def leer_frame(ruta):
+    """Lee un frame (TIFF suelto o dentro del contenedor) como uint16 de 12 bits."""
+    if os.path.exists(ruta):
+        return leer_tiff(ruta)
+    lector = _lector(os.path.dirname(ruta))
+    if lector is None:
+        raise FileNotFoundError(ruta)
+    return lector.leer_nombre(os.path.basename(ruta))
+
+
+def leer_reducido(ruta, lado_max=800):
+    """Como `leer_frame`, pero en 8 bits y submuestreado para previews."""
+    if os.path.exists(ruta):
+        return reducir_tiff(ruta, lado_max)
+    lector = _lector(os.path.dirname(ruta))
+    if lector is None:
+        raise FileNotFoundError(ruta)
+    blob = lector.blob(lector.indice_de(os.path.basename(ruta)))
+    return reducir_tiff(BytesIO(blob), lado_max, blob)
@@ -1,116 +1,179 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-
-import tkinter as tk
-from tkinter import messagebox
-from functools import partial
-import cv2, json, os
-from pypylon import pylon
-
-# Parametros por defecto
-EXPOSURE, GAIN = 500, 0.0
-if os.path.exists("config.json"):
-    try:
-        cfg = json.load(open("config.json"))["Camaras"]
-        EXPOSURE = int(cfg.get("ExposureTime", EXPOSURE))
-        GAIN     = float(cfg.get("Gain", GAIN))
-    except Exception as e:
-        print("config.json invalido; usando valores por defecto:", e)
-
-# Estilo visual
-BG_MAIN, FG_MAIN         = "black", "white"
-FONT_LABEL               = ("Helvetica", 25)
-FONT_BUTTON              = ("Helvetica", 20, "bold")
-BTN_BG, BTN_FG           = "gray25", "white"
-BTN_ACTIVE_BG, BTN_W     = "gray40", 10
-
-# Funcion para mostrar vista previa
-def preview(idx, root):
-    tl   = pylon.TlFactory.GetInstance()
-    devs = tl.EnumerateDevices()
-    if idx >= len(devs):
-        messagebox.showerror("Error", f"Can't find the camera {idx+1}.")
-        return
-
-    root.withdraw()
-
-    cam = pylon.InstantCamera(tl.CreateDevice(devs[idx]))
-    cam.Open()
-    cam.Width.Value, cam.Height.Value = 1440, 960
-    cam.PixelFormat.Value  = "Mono8"
-    cam.ExposureTime.Value = EXPOSURE
-    cam.Gain.Value         = GAIN
-    cam.TriggerMode.Value  = "Off"
-    cam.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
-
-    win = f"CAM {idx+1} - Enfoque (toque para salir)"
-    cv2.namedWindow(win, cv2.WINDOW_NORMAL)
-    cv2.setWindowProperty(win, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-
-    quit_flag = False
-
-    def on_mouse(event, x, y, flags, param):
-        nonlocal quit_flag
-        if event == cv2.EVENT_LBUTTONDOWN:
-            quit_flag = True
-
-    cv2.setMouseCallback(win, on_mouse)
-
-    try:
-        while not quit_flag:
-            res = cam.RetrieveResult(500, pylon.TimeoutHandling_Return)
-            if res and res.GrabSucceeded():
-                gray = res.Array
-                h, w = gray.shape
-
-                roi = gray[h//3 : 2*h//3, w//3 : 2*w//3]
-                gx  = cv2.Sobel(roi, cv2.CV_64F, 1, 0, ksize=3)
-                gy  = cv2.Sobel(roi, cv2.CV_64F, 0, 1, ksize=3)
-                focus = (gx**2 + gy**2).mean()
-                enfocado = focus > 1000
-                col_bgr = (0, 255, 0) if enfocado else (0, 0, 255)
-
-                frame_bgr = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
-                cv2.rectangle(frame_bgr, (5, 5), (w-6, h-6), col_bgr, thickness=40)
-                cv2.putText(frame_bgr, f"Foco: {focus:.0f}",
-                            (40, 70), cv2.FONT_HERSHEY_SIMPLEX,
-                            1.2, col_bgr, 3, cv2.LINE_AA)
-                cv2.imshow(win, frame_bgr)
-                res.Release()
-
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
-
-    finally:
-        if cam.IsGrabbing(): cam.StopGrabbing()
-        cam.Close()
-        cv2.destroyWindow(win)
-        root.deiconify()
-
-# GUI principal
-def main():
-    root = tk.Tk()
-    root.title("Camera Focus")
-    root.configure(bg=BG_MAIN)
-    root.attributes("-fullscreen", True)
-
-    barra = tk.Frame(root, bg=BG_MAIN); barra.pack(anchor="ne", padx=20, pady=10)
-    tk.Button(barra, text="x",
-              command=lambda: root.destroy(),
-              font=FONT_LABEL, bg="red", fg="white").pack()
-
-    tk.Label(root, text="Choose a camera",
-             font=FONT_LABEL, fg=FG_MAIN, bg=BG_MAIN).pack(pady=10)
-
-    cont = tk.Frame(root, bg=BG_MAIN); cont.pack(pady=40)
-    for i, txt in enumerate(("CAM 1", "CAM 2")):
-        tk.Button(cont, text=txt, width=BTN_W, height=3,
-                  font=FONT_BUTTON, bg=BTN_BG, fg=BTN_FG,
-                  activebackground=BTN_ACTIVE_BG,
-                  command=partial(preview, i, root)).grid(row=0, column=i,
-                                                          padx=30, pady=5)
-
-    root.mainloop()
-
-if __name__ == "__main__":
-    main()
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import tkinter as tk
+from tkinter import messagebox
+from functools import partial
+import cv2, json, os
+import numpy as np
+from pypylon import pylon
+
+# Parametros por defecto
+EXPOSURE, GAIN = 500, 0.0
+# Enfoque: reducción en la cámara (binning o decimación), grilla columnas×filas del mapa
+# de foco y umbral de energía de gradiente para marcar una celda como enfocada
+REDUCCION, GRILLA, UMBRAL = 2, (4, 3), 1000.0
+if os.path.exists("config.json"):
+    try:
+        config = json.load(open("config.json"))
+        cfg, enf = config["Camaras"], config.get("Enfoque", {})
+        EXPOSURE  = int(cfg.get("ExposureTime", EXPOSURE))
+        GAIN      = float(cfg.get("Gain", GAIN))
+        REDUCCION = int(enf.get("Binning", REDUCCION))
+        GRILLA    = tuple(enf.get("Grilla", GRILLA))
+        UMBRAL    = float(enf.get("Umbral", UMBRAL))
+    except Exception as e:
+        print("config.json invalido; usando valores por defecto:", e)
+
+# Estilo visual
+BG_MAIN, FG_MAIN         = "black", "white"
+FONT_LABEL               = ("Helvetica", 25)
+FONT_BUTTON              = ("Helvetica", 20, "bold")
+BTN_BG, BTN_FG           = "gray25", "white"
+BTN_ACTIVE_BG, BTN_W     = "gray40", 10
+VERDE, ROJO              = (0, 255, 0), (0, 0, 255)
+
+# Reducción de resolución en la cámara: menos bytes por GigE y menos píxeles que procesar
+def reducir(cam, factor):
+    """Binning y, si la cámara no lo tiene, decimación.  Devuelve el modo usado."""
+    for modo in ("Binning", "Decimation"):
+        try:
+            getattr(cam, modo + "Horizontal").Value = factor
+            getattr(cam, modo + "Vertical").Value   = factor
+            return modo
+        except Exception:
+            continue
+    return None
+
+# Energía de gradiente (Sobel 3×3) media por celda de la grilla, en float32
+def mapa_foco(gray, cols, filas):
+    gx = cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3)
+    gy = cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=3)
+    e  = cv2.multiply(gx, gx, dtype=cv2.CV_32F)
+    e += cv2.multiply(gy, gy, dtype=cv2.CV_32F)
+    return cv2.resize(e, (cols, filas), interpolation=cv2.INTER_AREA)
+
+# Overlay de la grilla sobre fondo negro; se guardan solo sus píxeles no nulos
+def dibujar_overlay(alto, ancho, valores):
+    filas, cols = valores.shape
+    ov = np.zeros((alto, ancho, 3), np.uint8)
+    for f in range(filas):
+        for c in range(cols):
+            v = valores[f, c]
+            col = VERDE if v > UMBRAL else ROJO
+            x0, y0 = c*ancho//cols, f*alto//filas
+            x1, y1 = (c+1)*ancho//cols - 1, (f+1)*alto//filas - 1
+            cv2.rectangle(ov, (x0+3, y0+3), (x1-3, y1-3), col, 2)
+            cv2.putText(ov, f"{v:.0f}", (x0+12, y0+32), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.8, col, 2, cv2.LINE_AA)
+    focus = float(np.median(valores))
+    col = VERDE if focus > UMBRAL else ROJO
+    cv2.rectangle(ov, (0, 0), (ancho-1, alto-1), col, 12)
+    cv2.putText(ov, f"Foco: {focus:.0f}", (20, alto-24), cv2.FONT_HERSHEY_SIMPLEX,
+                1.2, col, 3, cv2.LINE_AA)
+    idx = np.flatnonzero(ov.any(axis=2))
+    return idx, ov.reshape(-1, 3)[idx]
+
+# Funcion para mostrar vista previa
+def preview(idx, root):
+    tl   = pylon.TlFactory.GetInstance()
+    devs = tl.EnumerateDevices()
+    if idx >= len(devs):
+        messagebox.showerror("Error", f"Can't find the camera {idx+1}.")
+        return
+
+    root.withdraw()
+
+    cam = pylon.InstantCamera(tl.CreateDevice(devs[idx]))
+    cam.Open()
+    modo = reducir(cam, REDUCCION)
+    # Campo completo (ya reducido): el mapa de foco cubre todo el sensor
+    for nodo in ("OffsetX", "OffsetY"):
+        try: getattr(cam, nodo).Value = 0
+        except Exception: pass
+    cam.Width.Value, cam.Height.Value = cam.Width.Max, cam.Height.Max
+    cam.PixelFormat.Value  = "Mono8"
+    cam.ExposureTime.Value = EXPOSURE
+    cam.Gain.Value         = GAIN
+    cam.TriggerMode.Value  = "Off"
+    cam.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+
+    win = f"CAM {idx+1} - Enfoque (toque para salir)"
+    cv2.namedWindow(win, cv2.WINDOW_NORMAL)
+    cv2.setWindowProperty(win, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    quit_flag = False
+
+    def on_mouse(event, x, y, flags, param):
+        nonlocal quit_flag
+        if event == cv2.EVENT_LBUTTONDOWN:
+            quit_flag = True
+
+    cv2.setMouseCallback(win, on_mouse)
+
+    # La vista se arma al tamaño de la pantalla: la conversión a BGR y el overlay
+    # se hacen sobre esa imagen chica, no sobre el frame de la cámara
+    sw, sh = root.winfo_screenwidth(), root.winfo_screenheight()
+    cols, filas = GRILLA
+    clave, overlay, vista = None, None, None
+
+    try:
+        while not quit_flag:
+            res = cam.RetrieveResult(500, pylon.TimeoutHandling_Return)
+            if res and res.GrabSucceeded():
+                with res.GetArrayZeroCopy() as gray:
+                    valores = mapa_foco(gray, cols, filas)
+                    h, w = gray.shape
+                    esc = min(sw / w, sh / h)
+                    dims = (int(w*esc), int(h*esc))
+                    chica = cv2.resize(gray, dims, interpolation=cv2.INTER_AREA)
+                    del gray                # pypylon no cierra el contexto con referencias vivas
+                res.Release()
+
+                if vista is None or vista.shape[:2] != chica.shape:
+                    vista, clave = np.empty(chica.shape + (3,), np.uint8), None
+                # El overlay se redibuja solo si alguna celda cambia más de ~5 %
+                nueva = tuple(np.round(np.log1p(valores) * 20).astype(int).ravel())
+                if nueva != clave:
+                    clave, overlay = nueva, dibujar_overlay(*chica.shape, valores)
+                cv2.cvtColor(chica, cv2.COLOR_GRAY2BGR, dst=vista)
+                vista.reshape(-1, 3)[overlay[0]] = overlay[1]
+                cv2.imshow(win, vista)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+    finally:
+        if cam.IsGrabbing(): cam.StopGrabbing()
+        if modo: reducir(cam, 1)    # la captura espera el sensor sin reducir
+        cam.Close()
+        cv2.destroyWindow(win)
+        root.deiconify()
+
+# GUI principal
+def main():
+    root = tk.Tk()
+    root.title("Camera Focus")
+    root.configure(bg=BG_MAIN)
+    root.attributes("-fullscreen", True)
+
+    barra = tk.Frame(root, bg=BG_MAIN); barra.pack(anchor="ne", padx=20, pady=10)
+    tk.Button(barra, text="x",
+              command=lambda: root.destroy(),
+              font=FONT_LABEL, bg="red", fg="white").pack()
+
+    tk.Label(root, text="Choose a camera",
+             font=FONT_LABEL, fg=FG_MAIN, bg=BG_MAIN).pack(pady=10)
+
+    cont = tk.Frame(root, bg=BG_MAIN); cont.pack(pady=40)
+    for i, txt in enumerate(("CAM 1", "CAM 2")):
+        tk.Button(cont, text=txt, width=BTN_W, height=3,
+                  font=FONT_BUTTON, bg=BTN_BG, fg=BTN_FG,
+                  activebackground=BTN_ACTIVE_BG,
+                  command=partial(preview, i, root)).grid(row=0, column=i,
+                                                          padx=30, pady=5)
+
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
-import math
+import json, math, os
+import numpy as np
 from functools import partial
 
 # ---------------- TECLADO NUMÉRICO ----------------
@@ -66,6 +67,108 @@ angle_vertical_rad = math.radians(angle_vertical_deg)
 def image_height_from_altitude(altitude):
     return 2 * altitude * math.tan(angle_vertical_rad / 2)
 
+# ---------------- LÍMITES DE RENDIMIENTO ----------------
+# limites_rendimiento.json: lo medido en este equipo, un objeto JSON con
+#   "Enlace_MBps"    MB/s que sostiene el enlace con las dos cámaras
+#   "Disco_MBps"     MB/s de escritura al disco de captura
+#   "Combinado_FPS"  pares/s sostenidos capturando y escribiendo a la vez
+#   "Sensor_FPS_max" FPS máximos del sensor con la configuración actual
+# Las claves que falten no limitan.  Sin archivo, o si ninguna clave trae un
+# valor, se usan los valores por defecto (un enlace GigE de 110 MB/s y nada
+# más) y la calculadora lo avisa.
+# Lo escribe Tests/Benchmark_suite.py con hardware real (agrega "Frame" y
+# "Fecha", informativos).
+LIMITES_JSON = "limites_rendimiento.json"
+CAMARAS = 2
+BYTES_PIXEL = {"Mono8": 1, "Mono12p": 1.5, "Mono12": 2, "Mono16": 2}
+GRILLA_H = np.arange(10, 151, 5)         # altitud (m), filas de la grilla
+GRILLA_V = np.arange(1, 21, 1)           # velocidad (m/s), columnas
+
+LIMITES_DEF = {"Enlace_MBps": 110.0, "Disco_MBps": None, "Combinado_FPS": None,
+               "Sensor_FPS_max": None}
+
+def cargar_limites():
+    lim = dict(LIMITES_DEF, medido=False)
+    try:
+        with open(LIMITES_JSON) as f:
+            lim.update(json.load(f), medido=True)
+    except (OSError, ValueError):
+        pass
+    # Un archivo con todos los límites en null/0 no dice nada: valores por defecto
+    if not any(lim[k] for k in LIMITES_DEF):
+        lim.update(LIMITES_DEF, medido=False)
+    cam = {}
+    if os.path.exists("config.json"):
+        try:
+            cam = json.load(open("config.json")).get("Camaras", {})
+        except ValueError:
+            pass
+    ancho, alto = int(cam.get("Width", 3840)), int(cam.get("Height", 2160))
+    bpp = BYTES_PIXEL.get(cam.get("PixelFormat", "Mono12"), 2)
+    lim["frame_MB"] = ancho * alto * bpp / 1e6
+    return lim
+
+def fps_maximo(lim):
+    """(FPS máximo sostenible por cámara, cuello de botella)."""
+    par_MB = CAMARAS * lim["frame_MB"]
+    topes = {"link": lim["Enlace_MBps"] and lim["Enlace_MBps"] / par_MB,
+             "disk": lim["Disco_MBps"] and lim["Disco_MBps"] / par_MB,
+             "capture+write": lim["Combinado_FPS"],
+             "sensor": lim["Sensor_FPS_max"]}
+    topes = {k: v for k, v in topes.items() if v}
+    cuello = min(topes, key=topes.get)
+    return topes[cuello], cuello
+
+LIMITES = cargar_limites()
+FPS_MAX, CUELLO = fps_maximo(LIMITES)
+
+def indice_grilla(valor, grilla):
+    """Posición de `valor` en filas/columnas de una grilla uniforme, o None si cae fuera."""
+    k = (valor - grilla[0]) / (grilla[1] - grilla[0])
+    return k if -0.5 <= k <= len(grilla) - 0.5 else None
+
+def dibujar_grilla(o, h=None, v=None):
+    """Región factible altitud×velocidad para el solape `o` (0..1), en el canvas."""
+    grilla_canvas.delete("all")
+    cw, ch = int(grilla_canvas["width"]), int(grilla_canvas["height"])
+    mx, my = 40, 22                                            # márgenes para los ejes
+    H, V = np.meshgrid(GRILLA_H, GRILLA_V, indexing="ij")
+    fps = V / (2 * H * math.tan(angle_vertical_rad / 2) * (1 - o))
+    uso = fps / FPS_MAX
+    dw, dh = (cw - mx) / len(GRILLA_V), (ch - my) / len(GRILLA_H)
+    for i in range(len(GRILLA_H)):
+        y0 = (len(GRILLA_H) - 1 - i) * dh                      # altitud hacia arriba
+        for j in range(len(GRILLA_V)):
+            u = uso[i, j]
+            col = (f"#00{int(255 - 150 * u):02x}00" if u <= 1     # más oscuro cerca del límite
+                   else "#7a0000")
+            grilla_canvas.create_rectangle(mx + j * dw, y0, mx + (j + 1) * dw, y0 + dh,
+                                           fill=col, width=0)
+    for txt, x, y in ((f"{GRILLA_H[-1]}", 2, 2), (f"{GRILLA_H[0]}", 2, ch - my - 14),
+                      (f"{GRILLA_V[0]}", mx, ch - my + 4), (f"{GRILLA_V[-1]} m/s", cw - 50, ch - my + 4)):
+        grilla_canvas.create_text(x, y, text=txt, anchor="nw", fill="white", font=("Helvetica", 9))
+    grilla_canvas.create_text(2, (ch - my) / 2, text="H (m)", anchor="w", fill="white", font=("Helvetica", 9))
+    i = indice_grilla(h, GRILLA_H) if h is not None else None
+    j = indice_grilla(v, GRILLA_V) if v is not None else None
+    if i is not None and j is not None:                        # plan fuera de la grilla: sin marca
+        x = mx + (j + 0.5) * dw
+        y = (ch - my) - (i + 0.5) * dh
+        grilla_canvas.create_oval(x - 5, y - 5, x + 5, y + 5, outline="white", width=2)
+    grilla_canvas.datos = (o, fps, mx, dw, dh, ch - my)
+
+def tocar_grilla(event):
+    """Muestra altitud, velocidad, FPS y MB/min de la celda tocada."""
+    datos = getattr(grilla_canvas, "datos", None)
+    if not datos:
+        return
+    o, fps, mx, dw, dh, alto = datos
+    j, i = int((event.x - mx) // dw), int((alto - event.y) // dh)
+    if 0 <= i < len(GRILLA_H) and 0 <= j < len(GRILLA_V):
+        f = fps[i, j]
+        estado = "OK" if f <= FPS_MAX else f"over {CUELLO} limit"
+        grilla_label.config(text=f"H {GRILLA_H[i]} m, v {GRILLA_V[j]} m/s: {f:.2f} FPS, "
+                                 f"{f * CAMARAS * LIMITES['frame_MB'] * 60:.0f} MB/min ({estado})")
+
 def calculate(*args):
     try:
         h_val = altitude_entry.get()
@@ -93,24 +196,36 @@ def calculate(*args):
 
         if not known_vars['H']:
             h_terreno = v_val / (fps_val * (1 - o_val))
-            h = h_terreno / (2 * math.tan(angle_vertical_rad / 2))
-            result = f"Altitude required: {h:.2f} m"
+            h_val = h_terreno / (2 * math.tan(angle_vertical_rad / 2))
+            result = f"Altitude required: {h_val:.2f} m"
         elif not known_vars['v']:
             h_terreno = image_height_from_altitude(h_val)
-            v = fps_val * h_terreno * (1 - o_val)
-            result = f"Speed required: {v:.2f} m/s"
+            v_val = fps_val * h_terreno * (1 - o_val)
+            result = f"Speed required: {v_val:.2f} m/s"
         elif not known_vars['O']:
             h_terreno = image_height_from_altitude(h_val)
-            o = 1 - v_val / (fps_val * h_terreno)
-            result = f"Overlay required: {o * 100:.2f} %"
+            o_val = 1 - v_val / (fps_val * h_terreno)
+            result = f"Overlay required: {o_val * 100:.2f} %"
         elif not known_vars['fps']:
             h_terreno = image_height_from_altitude(h_val)
-            fps = v_val / (h_terreno * (1 - o_val))
-            result = f"FPS required: {fps:.2f}"
+            fps_val = v_val / (h_terreno * (1 - o_val))
+            result = f"FPS required: {fps_val:.2f}"
         else:
             result = "unexpected Error."
 
-        result_label.config(text=result)
+        # Factibilidad con los límites medidos (2 cámaras, frames completos)
+        mb_min = fps_val * CAMARAS * LIMITES["frame_MB"] * 60
+        if fps_val > FPS_MAX:
+            result += f"\nNot feasible: max {FPS_MAX:.2f} FPS ({CUELLO} limit)"
+            color = "red"
+        else:
+            result += f"\n{mb_min:.0f} MB/min, {fps_val / FPS_MAX * 100:.0f}% of {CUELLO} limit"
+            color = "cyan"
+        if not LIMITES["medido"]:
+            result += f"\n(built-in default limits: no valid {LIMITES_JSON})"
+        result_label.config(text=result, fg=color)
+        if 0 <= o_val < 1:
+            dibujar_grilla(o_val, h_val, v_val)
     except Exception as e:
         messagebox.showerror("Error", f"Check the inputs.\n\n{e}")
 
@@ -161,6 +276,17 @@ overlap_entry = overlap_entry_ref[0]
 fps_entry = fps_entry_ref[0]
 
 result_label = tk.Label(root, text="", font=font_result, fg="cyan", bg="black")
-result_label.pack(pady=23)
+result_label.pack(pady=12)
+
+# Región factible altitud×velocidad para el solape ingresado; tocar una celda la detalla
+fuente = "measured" if LIMITES["medido"] else "built-in default, not measured"
+tk.Label(root, text=f"Max {FPS_MAX:.2f} FPS ({CUELLO} limit, {fuente})",
+         font=font_label, fg="white", bg="black").pack()
+grilla_canvas = tk.Canvas(root, width=420, height=200, bg="black", highlightthickness=0)
+grilla_canvas.pack(pady=4)
+grilla_canvas.bind("<Button-1>", tocar_grilla)
+grilla_label = tk.Label(root, text="", font=("Helvetica", 12), fg="white", bg="black")
+grilla_label.pack()
+dibujar_grilla(0.7)
 
 root.mainloop()
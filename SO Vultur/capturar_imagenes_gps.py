@@ -2,155 +2,387 @@
 # -*- coding: utf-8 -*-
 
 from pypylon import pylon
-import tifffile as tiff
-import json, time, datetime, csv, pathlib, sys, signal, threading
+import json, time, datetime, pathlib, sys, signal, threading, math, collections
+from concurrent.futures import ThreadPoolExecutor
 import RPi.GPIO as GPIO
 from pymavlink import mavutil
+from escritor_frames import EscritorFrames
+from disparo_dual import HiloCaptura, disparar_par
+from pool_buffers import PoolBuffers
+from control_fps import ControlFPS
+from telemetria import Telemetria
+from registro_binario import RegistroBinario, a_csv
+from metricas import Metricas, Resumidor
+from config_camara import configurar, cargar_cache, guardar_cache
+from vista_compartida import PublicadorVista
 
 # ───────── GPIO ─────────
 LED_RUN, LED_WARN = 16, 20
-stop = False
 
-print_fix_warning = True
 
-def _stop(*_):
-    global stop
-    stop = True
+class SinCamaras(RuntimeError):
+    pass
 
-signal.signal(signal.SIGINT , _stop)
-signal.signal(signal.SIGTERM, _stop)
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(LED_RUN , GPIO.OUT, initial=GPIO.LOW)
-GPIO.setup(LED_WARN, GPIO.OUT, initial=GPIO.LOW)
 
 # ───────── leer config ─────────
-prm = json.load(open("config.json")) ["Camaras"]
-FPS, EXP, GAIN = float(prm.get("FPS",2)), int(prm.get("ExposureTime",500)), float(prm.get("Gain",0))
-PERIODO, DELAY = 1/FPS, 0.01
-
-# ───────── GPS check ─────────
-gps_ok = False
-last_gps = {"hora": None, "lat": None, "lon": None, "alt": None}
-last_att = {"yaw":None,"pitch":None,"roll":None,"gs":None,"climb":None}
-
-def gps_reader():
-    global gps_ok, print_fix_warning
-    while True:
+def leer_config(ruta="config.json"):
+    config = json.load(open(ruta))
+    prm, prm_esc = config["Camaras"], config.get("Escritura", {})
+    c = {"prm": prm, "prm_esc": prm_esc,
+         "prm_adp": config.get("FPS_adaptativo", {}), "prm_tel": config.get("Telemetria", {}),
+         "prm_reg": config.get("Registro", {}), "prm_met": config.get("Metricas", {}),
+         "prm_vis": config.get("Vista", {})}
+    c["FPS"], c["EXP"], c["GAIN"] = float(prm.get("FPS",2)), int(prm.get("ExposureTime",500)), float(prm.get("Gain",0))
+    c["DELAY"] = 0.01
+    # "secuencial": cam1 → RetrieveResult → DELAY → cam2 ; "concurrente": ambas a la vez
+    c["MODO_DISPARO"] = prm.get("Disparo", "secuencial")
+    # "Mono12": uint16 por píxel ; "Mono12p": 12 bits empaquetados de la cámara al disco
+    c["PIXEL_FORMAT"] = prm.get("PixelFormat", "Mono12")
+    c["ANCHO"], c["ALTO"] = int(prm.get("Width", 3840)), int(prm.get("Height", 2160))
+    # Buffers de pylon por cámara: deben cubrir la cola + los hilos escritores + el grab en curso
+    c["MAX_BUFFERS"] = int(prm.get("MaxNumBuffer", 8))
+    # transporte.json (Tests/Bandwidth_test.py --barrido): tamaño de paquete y retardo GigE
+    # medidos sin pérdidas; los buffers quedan en el mayor de los dos (enlace y cola)
+    transporte = pathlib.Path(ruta).with_name("transporte.json")
+    c["TRANSPORTE"] = json.load(open(transporte)) if transporte.exists() else {}
+    c["MAX_BUFFERS"] = max(c["MAX_BUFFERS"], int(c["TRANSPORTE"].get("MaxNumBuffer", 0)))
+    c["HILOS_ESC"] = max(1, int(prm_esc.get("Hilos",2)))
+    c["COLA_ESC"] = int(prm_esc.get("Cola",4))
+    if c["COLA_ESC"] + c["HILOS_ESC"] + 1 > c["MAX_BUFFERS"]:
+        c["COLA_ESC"] = max(1, c["MAX_BUFFERS"] - c["HILOS_ESC"] - 1)
+        print(f"Write queue limited to {c['COLA_ESC']} by MaxNumBuffer={c['MAX_BUFFERS']}")
+    c["NODOS"] = {"Width": c["ANCHO"], "Height": c["ALTO"], "PixelFormat": c["PIXEL_FORMAT"],
+                  "ExposureTime": float(c["EXP"]), "Gain": c["GAIN"], "TriggerSelector": "FrameStart",
+                  "TriggerMode": "On", "TriggerSource": "Software"}
+    for k in ("GevSCPSPacketSize", "GevSCPD"):
+        if k in c["TRANSPORTE"]:
+            c["NODOS"][k] = int(c["TRANSPORTE"][k])
+    if c["TRANSPORTE"]:
+        print(f"GigE transport from {transporte.name}: packet {c['TRANSPORTE'].get('GevSCPSPacketSize')}, "
+              f"delay {c['TRANSPORTE'].get('GevSCPD')}, MaxNumBuffer {c['MAX_BUFFERS']}")
+    return c
+
+
+class SistemaCaptura:
+    """Cámaras abiertas y configuradas + enlace MAVLink vivo entre campañas.
+
+    Ejecutado como script corre una sola campaña hasta Ctrl-C;
+    `servicio_captura.py` lo mantiene abierto y corre una campaña por cada
+    `start` sin volver a abrir cámaras ni puerto serie.
+    """
+
+    def __init__(self, ruta_config="config.json"):
+        self.t_arranque = time.monotonic()
+        self.ruta_config = ruta_config
+        self.arranque = {}          # tiempos de arranque (s desde el inicio)
+        self.mav, self.gps_ok = None, False
+        self.global_pos_visto = False   # GPS_RAW_INT solo alimenta la posición si no llega GLOBAL_POSITION_INT
+        self.print_fix_warning = True
+        self.cams, self.nodos, self.error = None, None, None
+        self.activa = None          # contadores de la campaña en curso
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(LED_RUN , GPIO.OUT, initial=GPIO.LOW)
+        GPIO.setup(LED_WARN, GPIO.OUT, initial=GPIO.LOW)
+
+        self.c = leer_config(ruta_config)
+        prm_tel = self.c["prm_tel"]
+        self.tele = Telemetria(muestras=prm_tel.get("Muestras",256), acel_max=prm_tel.get("Acel_max_ms2",3.0),
+                               acel_ang_max=prm_tel.get("Acel_ang_max_degs2",90.0),
+                               edad_max_s=prm_tel.get("Edad_max_s",2.0))
+
+        # MAVLink en paralelo con la configuración de las cámaras: el heartbeat puede tardar hasta 3 s
+        hilo_gps = threading.Thread(target=self.iniciar_gps, daemon=True)
+        hilo_gps.start()
         try:
-            msg = mav.recv_match(type=['GLOBAL_POSITION_INT','GPS_RAW_INT','ATTITUDE','VFR_HUD'], blocking=True, timeout=1)
+            self.preparar_camaras(self.t_arranque)
+        except SinCamaras as e:
+            self.error = str(e)
+        hilo_gps.join()
+
+    # ───────── GPS ─────────
+    def iniciar_gps(self):
+        try:
+            self.mav = mavutil.mavlink_connection('/dev/serial0', baud=57600)
+            self.mav.wait_heartbeat(timeout=3)
+            threading.Thread(target=self.gps_reader, daemon=True).start()
         except Exception:
-            continue
-        if not msg:
-            continue
-
-        if msg.get_type() == "GLOBAL_POSITION_INT" and msg.lat not in (0, 0x7FFFFFFF):
-            gps_ok = True
-            last_gps.update(
-                hora=datetime.datetime.utcnow().isoformat(timespec="milliseconds"),
-                lat=msg.lat/1e7, lon=msg.lon/1e7, alt=msg.alt/1000.0)
-
-        elif msg.get_type() == "GPS_RAW_INT":
-            if msg.fix_type >= 3 and msg.lat not in (0, 0x7FFFFFFF):
-                gps_ok = True
-                last_gps.update(
-                    hora=datetime.datetime.utcnow().isoformat(timespec="milliseconds"),
-                    lat=msg.lat/1e7, lon=msg.lon/1e7, alt=msg.alt/1000.0)
-            elif print_fix_warning:
-                print("No GPS fix.")
-                print_fix_warning = False
-
-        elif msg.get_type() == "ATTITUDE":
-            last_att.update(
-                yaw  = round(msg.yaw   * 57.2958, 2),
-                pitch= round(msg.pitch * 57.2958, 2),
-                roll = round(msg.roll  * 57.2958, 2))
-
-        elif msg.get_type() == "VFR_HUD":
-            last_att.update(gs=msg.groundspeed, climb=msg.climb)
-
-# ───────── GPS init ─────────
-try:
-    mav = mavutil.mavlink_connection('/dev/serial0', baud=57600)
-    mav.wait_heartbeat(timeout=3)
-    threading.Thread(target=gps_reader, daemon=True).start()
-except Exception:
-    gps_ok = False
-
-if not gps_ok:
-    for _ in range(2):
-        GPIO.output(LED_WARN, 1); time.sleep(0.25)
-        GPIO.output(LED_WARN, 0); time.sleep(0.25)
-    print("Continuing without GPS ")
-
-# ───────── carpetas ─────────
-ini = datetime.datetime.now()
-root = pathlib.Path.home()/f"Campaña {ini:%d-%m-%Y} - {ini:%Hh%Mm%Ss}"
-(cam1_dir:=root/"CAM1").mkdir(parents=True, exist_ok=True)
-(cam2_dir:=root/"CAM2").mkdir(exist_ok=True)
-csv_path = root/"log_Campaña.csv"
-
-parametros = {"Fecha_inicio": ini.isoformat(sep=" ", timespec="seconds"),
-              "FPS": FPS, "Delay_master_slave_s": DELAY,
-              "ExposureTime_us": EXP, "Gain": GAIN,
-              "PixelFormat": "Mono12", "GPS_detectado": gps_ok}
-json.dump(parametros, open(root/"Parametros.json","w"), indent=2)
-
-# ───────── cámaras ─────────
-tl=pylon.TlFactory.GetInstance()
-devs=tl.EnumerateDevices()
-if len(devs)<2:
-    GPIO.cleanup(); sys.exit("Connect 2 cameras")
-
-cam1,cam2=[pylon.InstantCamera(tl.CreateDevice(d)) for d in devs[:2]]
-def cfg(c):
-    c.Open(); c.Width.Value=3840; c.Height.Value=2160; c.PixelFormat.Value="Mono12"
-    c.ExposureTime.Value=EXP; c.Gain.Value=GAIN
-    c.TriggerSelector.Value="FrameStart"; c.TriggerMode.Value="On"; c.TriggerSource.Value="Software"
-
-for c in (cam1,cam2): cfg(c); c.StartGrabbing(pylon.GrabStrategy_OneByOne)
-
-GPIO.output(LED_RUN, 1)
-print("Capturing")
-
-with csv_path.open("w",newline="") as fcsv:
-    wr=csv.writer(fcsv)
-    wr.writerow(["Hora_RTC","Hora_GPS","Img_cam1","Img_cam2",
-                 "Lat","Lon","Alt",
-                 "Yaw_deg","Pitch_deg","Roll_deg", "gs","climb" ])
+            self.gps_ok = False
+        self.arranque["Gps"] = round(time.monotonic()-self.t_arranque, 3)
+
+    def gps_reader(self):
+        tele = self.tele
+        while True:
+            try:
+                msg = self.mav.recv_match(type=['GLOBAL_POSITION_INT','GPS_RAW_INT','ATTITUDE','VFR_HUD'], blocking=True, timeout=1)
+            except Exception:
+                continue
+            if not msg:
+                continue
+            t = time.monotonic()
+
+            if msg.get_type() == "GLOBAL_POSITION_INT" and msg.lat not in (0, 0x7FFFFFFF):
+                self.gps_ok = self.global_pos_visto = True
+                tele.pos.agregar(t, msg.lat/1e7, msg.lon/1e7, msg.alt/1000.0)
+
+            elif msg.get_type() == "GPS_RAW_INT":
+                if msg.fix_type >= 3 and msg.lat not in (0, 0x7FFFFFFF):
+                    self.gps_ok = True
+                    if not self.global_pos_visto:
+                        tele.pos.agregar(t, msg.lat/1e7, msg.lon/1e7, msg.alt/1000.0)
+                elif self.print_fix_warning:
+                    print("No GPS fix.")
+                    self.print_fix_warning = False
+
+            elif msg.get_type() == "ATTITUDE":
+                tele.att.agregar(t, msg.yaw*57.2958, msg.pitch*57.2958, msg.roll*57.2958)
+
+            elif msg.get_type() == "VFR_HUD":
+                tele.hud.agregar(t, msg.groundspeed, msg.climb)
+
+    def parpadear_warn(self):
+        for _ in range(2):
+            GPIO.output(LED_WARN, 1); time.sleep(0.25)
+            GPIO.output(LED_WARN, 0); time.sleep(0.25)
+
+    # ───────── cámaras ─────────
+    def preparar_camaras(self, t0):
+        """Abre y configura ambas cámaras si no lo están o si cambió la config."""
+        abiertas = self.cams is not None and all(c.IsOpen() for c in self.cams)
+        if abiertas and self.nodos == self.c["NODOS"]:
+            return
+        if not abiertas:
+            self.liberar()
+            tl=pylon.TlFactory.GetInstance()
+            devs=tl.EnumerateDevices()
+            if len(devs)<2:
+                raise SinCamaras("Connect 2 cameras")
+            self.cams=[pylon.InstantCamera(tl.CreateDevice(d)) for d in devs[:2]]
+
+        cache = cargar_cache()
+        # Ambas cámaras se configuran a la vez (cada una en su propio enlace GigE)
+        with ThreadPoolExecutor(2) as ex:
+            configs = list(ex.map(lambda c: configurar(c, self.c["NODOS"], cache), self.cams))
+        nuevas = {s: e for s, _, e in configs if e}
+        if nuevas:
+            cache.update(nuevas); guardar_cache(cache)
+        self.nodos, self.error = self.c["NODOS"], None
+        self.arranque["Camaras"] = round(time.monotonic()-t0, 3)
+        self.arranque["Config_camaras"] = {s: m for s, m, _ in configs}
+
+    def liberar(self):
+        """Cierra las cámaras (p. ej. para que otro programa las abra)."""
+        for c in self.cams or ():
+            try:
+                if c.IsGrabbing(): c.StopGrabbing()
+                c.Close()
+            except Exception:
+                pass
+        self.cams, self.nodos = None, None
+
+    def cerrar(self):
+        self.liberar()
+        GPIO.output(LED_RUN, 0); GPIO.cleanup()
+
+    def estado(self):
+        """Contadores en vivo para el servicio."""
+        e = {"Capturando": self.activa is not None, "GPS": self.gps_ok,
+             "Camaras": [c.GetDeviceInfo().GetSerialNumber() for c in self.cams] if self.cams else None,
+             "Error": self.error}
+        a = self.activa
+        if a:
+            # Copia bajo lock: el hilo de captura agrega disparos mientras tanto
+            with a["lock"]:
+                t = list(a["disparos"])
+            esc = a["escritor"].contadores()
+            e.update(Campaña=a["root"].name, Pares_escritos=esc["escritos"],
+                     Pares_descartados=esc["descartados"], Cola=esc["cola"],
+                     FPS_objetivo=round(1/a["periodo"], 2),
+                     FPS_medido=round((len(t)-1)/(t[-1]-t[0]), 2) if len(t) > 1 and t[-1] > t[0] else None,
+                     Duracion_s=round(time.monotonic()-a["t_inicio"], 1))
+        return e
+
+    # ───────── campaña ─────────
+    def campaña(self, detener, t0=None, listo=None):
+        """Captura hasta que se active `detener` (threading.Event).
+
+        `listo` (Event) se activa cuando empieza la captura; `t0` es el
+        instante desde el que se mide el primer frame (def: ahora).
+        """
+        t0 = time.monotonic() if t0 is None else t0
+        # La config se relee en cada campaña; las cámaras solo se tocan si cambió
+        self.c = c = leer_config(self.ruta_config)
+        FPS, EXP, GAIN, DELAY = c["FPS"], c["EXP"], c["GAIN"], c["DELAY"]
+        MODO_DISPARO, PIXEL_FORMAT, ANCHO, ALTO = c["MODO_DISPARO"], c["PIXEL_FORMAT"], c["ANCHO"], c["ALTO"]
+        MAX_BUFFERS, HILOS_ESC, COLA_ESC = c["MAX_BUFFERS"], c["HILOS_ESC"], c["COLA_ESC"]
+        prm_esc, prm_adp, prm_reg, prm_met = c["prm_esc"], c["prm_adp"], c["prm_reg"], c["prm_met"]
+        prm_vis = c["prm_vis"]
+        PERIODO = 1/FPS
+        try:
+            self.preparar_camaras(t0)
+        except SinCamaras as e:
+            self.error = str(e)
+            raise
+        cam1, cam2 = self.cams
+        tele, metricas = self.tele, Metricas()
+
+        if not self.gps_ok:
+            threading.Thread(target=self.parpadear_warn, daemon=True).start()
+            print("Continuing without GPS ")
+
+        # ───────── carpetas ─────────
+        ini = datetime.datetime.now()
+        root = pathlib.Path.home()/f"Campaña {ini:%d-%m-%Y} - {ini:%Hh%Mm%Ss}"
+        (cam1_dir:=root/"CAM1").mkdir(parents=True, exist_ok=True)
+        (cam2_dir:=root/"CAM2").mkdir(exist_ok=True)
+        csv_path, bin_path = root/"log_Campaña.csv", root/"log_Campaña.bin"
+
+        parametros = {"Fecha_inicio": ini.isoformat(sep=" ", timespec="seconds"),
+                      "FPS": FPS, "Modo_disparo": MODO_DISPARO,
+                      "Delay_master_slave_s": DELAY if MODO_DISPARO != "concurrente" else 0,
+                      "ExposureTime_us": EXP, "Gain": GAIN,
+                      "PixelFormat": PIXEL_FORMAT, "GPS_detectado": self.gps_ok}
+        json.dump(parametros, open(root/"Parametros.json","w"), indent=2)
+
+        for cam in (cam1,cam2):
+            cam.MaxNumBuffer.Value=MAX_BUFFERS     # parámetro del host, no va en el UserSet
+            cam.StartGrabbing(pylon.GrabStrategy_OneByOne)
+
+        if MODO_DISPARO == "concurrente":
+            hilos_captura = [HiloCaptura(cam) for cam in (cam1,cam2)]
+
+        # En Mono12p se guarda el payload empaquetado tal cual llega de la cámara
+        pool = PoolBuffers(MAX_BUFFERS, cam1.PayloadSize.Value, empaquetado=PIXEL_FORMAT=="Mono12p", alto=ALTO)
+
+        # Vista en vivo por memoria compartida (visor_vista.py); solo trabaja si hay un visor
+        vista = None
+        if prm_vis.get("Activa", True):
+            try:
+                vista = PublicadorVista(ANCHO, ALTO, reduccion=prm_vis.get("Reduccion",4),
+                                        hz=prm_vis.get("Hz",2.0))
+            except Exception as e:
+                print(f"Live preview disabled ({e})")
+
+        escritor = EscritorFrames(hilos=HILOS_ESC, cola=COLA_ESC,
+                                  espera_max=prm_esc.get("Espera_max_s",0.5),
+                                  formato=PIXEL_FORMAT, ancho=ANCHO, alto=ALTO,
+                                  compresion=prm_esc.get("Compresion","none"),
+                                  nivel=prm_esc.get("Nivel"),
+                                  contenedor=prm_esc.get("Contenedor",False),
+                                  bloque_mb=prm_esc.get("Bloque_MB",256),
+                                  metricas=metricas, vista=vista)
+
+        # FPS adaptativo: baja la tasa si la SD no da abasto y la recupera con holgura
+        control = (ControlFPS(escritor, FPS, fps_min=prm_adp.get("FPS_min",0.2),
+                              backlog_max=prm_adp.get("Backlog_max",2),
+                              ventana_s=prm_adp.get("Ventana_s",3.0))
+                   if prm_adp.get("Activo", False) else None)
+
+        GPIO.output(LED_RUN, 1)
+        print("Capturing")
+
+        # Registro binario por lotes; log_Campaña.csv se genera al terminar
+        registro = RegistroBinario(bin_path, lote=prm_reg.get("Lote",32),
+                                   intervalo_s=prm_reg.get("Intervalo_s",5.0))
+        # Resumen periódico opcional de latencias por consola (0 = desactivado)
+        resumidor = Resumidor(metricas, prm_met.get("Resumen_s", 0))
+        self.activa = activa = {"root": root, "escritor": escritor, "periodo": PERIODO,
+                                "t_inicio": time.monotonic(),
+                                "disparos": collections.deque(maxlen=32), "lock": threading.Lock()}
+        if listo: listo.set()
+        skew_n, skew_sum, skew_max = 0, 0.0, 0.0
+        try:
+            while not detener.is_set():
+                tic=time.time()
+                t_disp, w_disp = time.monotonic(), time.time()
+                c0=time.perf_counter()
+
+                if MODO_DISPARO == "concurrente":
+                    r1, r2, skew = disparar_par(cam1, cam2, *hilos_captura, metricas=metricas)
+                else:
+                    t1=time.perf_counter(); cam1.ExecuteSoftwareTrigger()
+                    ta=time.perf_counter()
+                    r1=cam1.RetrieveResult(5000,pylon.TimeoutHandling_ThrowException)
+                    tb=time.perf_counter()
+                    time.sleep(DELAY)
+                    t2=time.perf_counter(); cam2.ExecuteSoftwareTrigger()
+                    tc=time.perf_counter()
+                    r2=cam2.RetrieveResult(5000,pylon.TimeoutHandling_ThrowException)
+                    td=time.perf_counter()
+                    skew = t2-t1
+                    metricas.registrar("disparo", (ta-t1)+(tc-t2))
+                    metricas.registrar("transferencia", (tb-ta)+(td-tc))
+                    metricas.registrar("delay", t2-tb)
+                skew_n += 1; skew_sum += skew; skew_max = max(skew_max, skew)
+                b1, b2 = pool.tomar(r1, 0), pool.tomar(r2, 1)
+                enviado = False
+
+                if r1.GrabSucceeded() and r2.GrabSucceeded():
+                    # Pose interpolada en el instante del disparo (no la última muestra)
+                    p = tele.pose(t_disp)
+                    if "Primer_frame" not in parametros:
+                        parametros["Primer_frame"] = round(time.monotonic()-t0, 3)
+                    ts=datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+                    f1,f2=cam1_dir/f"cam1_{ts}.tiff",cam2_dir/f"cam2_{ts}.tiff"
+                    c1=time.perf_counter()
+                    meta = (w_disp, p["lat"], p["lon"], p["alt"], p["yaw"],
+                            p["pitch"], p["roll"], p["gs"]) if vista else None
+                    enviado = escritor.encolar([(f1,b1),(f2,b2)], meta)
+                    c2=time.perf_counter()
+                    metricas.registrar("encolado", c2-c1)
+                    if enviado:
+                        registro.agregar((time.time(), math.nan if math.isnan(p["lat"]) else w_disp,
+                                          f1.name, f2.name, p["lat"], p["lon"], p["alt"],
+                                          p["yaw"], p["pitch"], p["roll"], p["gs"], p["climb"],
+                                          skew*1000, 1/PERIODO, p["err_pos_m"], p["err_att_deg"]))
+                        metricas.registrar("registro", time.perf_counter()-c2)
+                        with activa["lock"]:
+                            activa["disparos"].append(t_disp)
+                    else:
+                        print(f"Write queue full, frame dropped ({escritor.descartados})")
+
+                if not enviado: b1.liberar(); b2.liberar()   # si no, los libera el escritor
+                if control: PERIODO = activa["periodo"] = control.actualizar()
+                resumidor.tick(f" | queue {escritor.cola.qsize()}")
+                c3=time.perf_counter()
+                detener.wait(max(0, PERIODO-(time.time()-tic)))
+                c4=time.perf_counter()
+                metricas.registrar("espera", c4-c3)
+                metricas.registrar("ciclo", c4-c0)
+        finally:
+            self.activa = None
+            if MODO_DISPARO == "concurrente":
+                for h in hilos_captura: h.cerrar()
+            escritor.cerrar()          # antes de parar las cámaras: aún retiene sus buffers
+            if vista: vista.cerrar()
+            for cam in (cam1,cam2):
+                if cam.IsGrabbing(): cam.StopGrabbing()
+            registro.cerrar()
+            try:
+                a_csv(bin_path, csv_path)
+            except Exception as e:
+                print(f"CSV conversion failed ({e}); log kept in {bin_path.name}")
+            parametros["Arranque_s"] = dict(self.arranque, Primer_frame=parametros.pop("Primer_frame", None))
+            parametros["Escritura"] = escritor.estado()
+            parametros["Buffers"] = pool.estado()
+            if control: parametros["FPS_adaptativo"] = control.estado()
+            if vista: parametros["Vista_publicados"] = vista.publicados
+            parametros["Skew_ms"] = {"Medio": round(skew_sum/skew_n*1000,2) if skew_n else None,
+                                     "Max": round(skew_max*1000,2)}
+            json.dump(parametros, open(root/"Parametros.json","w"), indent=2)
+            metricas.guardar(root/"Latencias.json")
+            GPIO.output(LED_RUN, 0)
+            print("End Capture")
+        return parametros
+
+
+if __name__ == "__main__":
+    detener = threading.Event()
+    signal.signal(signal.SIGINT , lambda *_: detener.set())
+    signal.signal(signal.SIGTERM, lambda *_: detener.set())
+    sistema = SistemaCaptura()
     try:
-        while not stop:
-            tic=time.time()
-
-            cam1.ExecuteSoftwareTrigger()
-            r1=cam1.RetrieveResult(5000,pylon.TimeoutHandling_ThrowException)
-            time.sleep(DELAY)
-            cam2.ExecuteSoftwareTrigger()
-            r2=cam2.RetrieveResult(5000,pylon.TimeoutHandling_ThrowException)
-
-            if r1.GrabSucceeded() and r2.GrabSucceeded():
-                rtc=datetime.datetime.now().astimezone().isoformat(timespec="milliseconds")
-                gps_iso = last_gps["hora"] or "NONE"
-                lat = last_gps["lat"] if last_gps["lat"] is not None else "NONE"
-                lon = last_gps["lon"] if last_gps["lon"] is not None else "NONE"
-                alt = last_gps["alt"] if last_gps["alt"] is not None else "NONE"
-
-                yaw  = last_att["yaw"]  if last_att["yaw"]  is not None else "NONE"
-                pitch= last_att["pitch"]if last_att["pitch"]is not None else "NONE"
-                roll = last_att["roll"] if last_att["roll"] is not None else "NONE"
-                gs   = last_att["gs"]   if last_att["gs"]   is not None else "NONE"
-                climb= last_att["climb"]if last_att["climb"]is not None else "NONE"
-
-                ts=datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")[:-3]
-                f1,f2=cam1_dir/f"cam1_{ts}.tiff",cam2_dir/f"cam2_{ts}.tiff"
-                tiff.imwrite(f1,r1.GetArray(),photometric="minisblack")
-                tiff.imwrite(f2,r2.GetArray(),photometric="minisblack")
-                wr.writerow([rtc, gps_iso, f1.name, f2.name, lat, lon, alt,
-                             yaw, pitch, roll, gs, climb]); fcsv.flush()
-
-            r1.Release(); r2.Release()
-            time.sleep(max(0, PERIODO-(time.time()-tic)))
+        sistema.campaña(detener, t0=sistema.t_arranque)
+    except SinCamaras as e:
+        sys.exit(str(e))
     finally:
-        for c in (cam1,cam2):
-            if c.IsGrabbing(): c.StopGrabbing(); c.Close()
-        GPIO.output(LED_RUN, 0); GPIO.cleanup()
-        print("End Capture")
+        sistema.cerrar()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cliente_captura.py
+──────────────────
+Cliente del servicio de captura (servicio_captura.py).
+
+Protocolo: una línea JSON por pedido y una por respuesta sobre el socket
+Unix `SOCKET`.  Pedidos: {"cmd": "start"}, {"cmd": "stop"},
+{"cmd": "status", "desde": n}, {"cmd": "liberar"}, {"cmd": "salir"}.
+Toda respuesta trae "ok" y, si falla, "error".
+
+Uso:
+    python3 cliente_captura.py start | stop | status | liberar | salir
+"""
+
+import json, socket, sys
+
+SOCKET = "/tmp/vultur_captura.sock"
+
+
+def enviar(cmd, ruta=SOCKET, timeout=5.0, **datos):
+    """Envía un pedido y devuelve la respuesta (dict).  OSError si no hay servicio."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(ruta)
+        s.sendall((json.dumps(dict(datos, cmd=cmd)) + "\n").encode())
+        linea = s.makefile("r", encoding="utf-8").readline()
+    if not linea:
+        raise OSError("Capture service closed the connection")
+    return json.loads(linea)
+
+
+def disponible(ruta=SOCKET):
+    try:
+        return enviar("status", ruta, timeout=1.0).get("ok", False)
+    except (OSError, ValueError):
+        return False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    # stop espera a que se vacíe la cola de escritura
+    try:
+        r = enviar(sys.argv[1], timeout=60.0)
+    except OSError as e:
+        sys.exit(f"Capture service not available ({e})")
+    for linea in r.pop("Mensajes", []):
+        print(linea)
+    print(json.dumps(r, indent=2, ensure_ascii=False))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+config_camara.py
+────────────────
+Configuración de cámara persistida en un UserSet.
+
+Escribir nodo por nodo (resolución, formato, exposición, trigger) cuesta
+un acceso GigE por nodo en cada arranque.  La primera vez se escriben los
+nodos, se leen de vuelta (la cámara redondea exposición y ganancia a sus
+incrementos) y se guardan en el UserSet de la cámara; el valor validado
+queda en `cache_camaras.json` junto al hash de la configuración pedida,
+por número de serie.  En los arranques siguientes, si el hash coincide,
+basta un `UserSetLoad` y una verificación por lectura; ante cualquier
+diferencia o error se vuelve a la escritura nodo por nodo.
+"""
+
+import hashlib, json, pathlib
+
+USER_SET = "UserSet1"
+CACHE = pathlib.Path("cache_camaras.json")
+
+
+def hash_nodos(nodos):
+    return hashlib.sha1(json.dumps(nodos, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def cargar_cache(ruta=CACHE):
+    try:
+        return json.load(open(ruta))
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_cache(cache, ruta=CACHE):
+    try:
+        json.dump(cache, open(ruta, "w"), indent=2)
+    except OSError as e:
+        print(f"Camera cache not saved ({e})")
+
+
+def _leer(c, nodos):
+    return {k: getattr(c, k).Value for k in nodos}
+
+
+def _iguales(a, b):
+    for k, v in b.items():
+        x = a.get(k)
+        if isinstance(v, float) or isinstance(x, float):
+            if x is None or abs(float(x) - float(v)) > 1e-3 * max(1.0, abs(float(v))):
+                return False
+        elif x != v:
+            return False
+    return True
+
+
+def configurar(c, nodos, cache):
+    """Abre `c` (si hace falta) y le aplica `nodos` (dict ordenado nodo → valor).
+
+    Devuelve (serie, modo, entrada): modo "userset" o "nodos", y la
+    entrada de caché a guardar (None si no cambió o no hay UserSet).
+    """
+    if not c.IsOpen():
+        c.Open()
+    serie = c.GetDeviceInfo().GetSerialNumber()
+    h = hash_nodos(nodos)
+    previo = cache.get(serie)
+    if previo and previo.get("hash") == h:
+        try:
+            c.UserSetSelector.Value = USER_SET
+            c.UserSetLoad.Execute()
+            if _iguales(_leer(c, nodos), previo["valores"]):
+                return serie, "userset", None
+        except Exception as e:
+            print(f"{serie}: UserSet load failed ({e}), writing nodes")
+
+    for k, v in nodos.items():
+        getattr(c, k).Value = v
+    try:
+        c.UserSetSelector.Value = USER_SET
+        c.UserSetSave.Execute()
+    except Exception as e:
+        print(f"{serie}: UserSet not saved ({e})")
+        return serie, "nodos", None
+    return serie, "nodos", {"hash": h, "user_set": USER_SET, "valores": _leer(c, nodos)}
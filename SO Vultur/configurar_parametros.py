@@ -13,13 +13,13 @@ def cargar_configuracion():
     return {}
 
 def guardar_configuracion():
-    nueva_config = {
-        "Camaras": {
-            "ExposureTime": int(entry_exposure1.get()),
-            "Gain": float(entry_gain1.get()),
-            "FPS": float(entry_fps1.get())
-        }
-    }
+    # Se conservan las demas secciones (Escritura, etc.) del config.json
+    nueva_config = cargar_configuracion()
+    nueva_config.setdefault("Camaras", {}).update({
+        "ExposureTime": int(entry_exposure1.get()),
+        "Gain": float(entry_gain1.get()),
+        "FPS": float(entry_fps1.get())
+    })
 
     with open(CONFIG_FILE, "w") as file:
         json.dump(nueva_config, file, indent=4)
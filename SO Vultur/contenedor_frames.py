@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+contenedor_frames.py
+────────────────────
+Contenedor de solo-anexado por cámara, alternativa a un TIFF por frame.
+
+Por cada cámara se crean dos archivos en su carpeta (CAM1/, CAM2/):
+
+• cam1.vfr : los frames uno tras otro, cada uno como un TIFF completo
+             (con la misma compresión/formato que en modo archivo).
+             El archivo se reserva por bloques (`posix_fallocate`) y al
+             cerrar se recorta al tamaño real.
+• cam1.vfi : índice.  Cabecera MAGIA + registros fijos de 64 bytes
+             (seq, offset, largo, nombre) en el orden en que se escriben.
+
+Así la SD ve un único archivo creciendo por cámara en vez de miles de
+entradas de directorio.  La lectura por índice y la exportación a TIFFs
+sueltos están en `Post Proccesing/lector_contenedor.py`.
+"""
+
+import os, threading
+import numpy as np
+
+MAGIA    = b"VFRIDX01"
+REGISTRO = np.dtype([("seq", "<u8"), ("offset", "<u8"),
+                     ("largo", "<u8"), ("nombre", "S40")])
+
+
+class ContenedorFrames:
+    """Archivo de datos + índice de una cámara; seguro entre hilos."""
+
+    def __init__(self, carpeta, prefijo, bloque_mb=256):
+        self.datos  = os.path.join(carpeta, f"{prefijo}.vfr")
+        self.indice = os.path.join(carpeta, f"{prefijo}.vfi")
+        self.bloque = int(bloque_mb) * 1024 * 1024
+        self._lock  = threading.Lock()
+        self._fd    = os.open(self.datos, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        self._fidx  = open(self.indice, "wb")
+        self._fidx.write(MAGIA); self._fidx.flush()
+        self.fin = self.asignado = 0
+        self.frames = 0
+
+    def _reservar(self, hasta):
+        # Crecer por bloques grandes evita actualizar la FAT/extents en cada frame
+        while self.asignado < hasta:
+            try:
+                os.posix_fallocate(self._fd, self.asignado, self.bloque)
+            except (AttributeError, OSError):
+                self.asignado = float("inf")       # el FS no lo soporta: crecer normal
+                return
+            self.asignado += self.bloque
+
+    def agregar(self, seq, nombre, blob):
+        """Anexa un frame ya codificado (bytes de un TIFF)."""
+        with self._lock:
+            offset = self.fin
+            self.fin += len(blob)
+            self._reservar(self.fin)
+        os.pwrite(self._fd, blob, offset)          # escrituras en paralelo sin lock
+        reg = np.array([(seq, offset, len(blob), nombre.encode()[:40])], REGISTRO)
+        with self._lock:
+            self._fidx.write(reg.tobytes()); self._fidx.flush()
+            self.frames += 1
+
+    def cerrar(self):
+        with self._lock:
+            os.ftruncate(self._fd, self.fin)
+            os.close(self._fd)
+            self._fidx.close()
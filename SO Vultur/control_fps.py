@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+control_fps.py
+──────────────
+Ajuste de la tasa de disparo según lo que la SD es capaz de escribir.
+
+Cada `ventana_s` segundos se mide la capacidad sostenida de escritura:
+pares escritos divididos por el tiempo que los hilos escritores estuvieron
+ocupados (y multiplicado por el número de hilos).  Con eso:
+
+• si la cola del escritor supera `backlog_max` o hubo descartes, se baja
+  la tasa a lo que la escritura puede sostener (con margen);
+• si la cola está holgada y la capacidad sobra, se sube de a poco hasta
+  volver al FPS configurado.
+
+Cada cambio queda en `cambios` (tiempo, FPS, motivo) y se imprime, para
+saber la densidad real de muestreo por tramo del vuelo.
+"""
+
+import time
+
+
+class ControlFPS:
+    """Controlador de la tasa de disparo con histéresis."""
+
+    def __init__(self, escritor, fps_obj, fps_min=0.2, backlog_max=2,
+                 ventana_s=3.0, margen=0.85, paso_subida=1.25):
+        self.escritor = escritor
+        self.fps_obj, self.fps_min = float(fps_obj), float(fps_min)
+        self.fps = self.fps_obj
+        self.backlog_max, self.ventana_s = int(backlog_max), float(ventana_s)
+        self.margen, self.paso_subida = margen, paso_subida
+        self.t0 = time.monotonic()
+        self._t_ult = self.t0
+        self._escritos = self._ocupado = 0.0
+        self._descartados = 0
+        self.capacidad = None        # pares/s sostenibles medidos
+        self.cambios = []
+
+    def _cambiar(self, fps, motivo, ahora):
+        fps = min(self.fps_obj, max(self.fps_min, fps))
+        if abs(fps - self.fps) < 0.05 * self.fps:
+            return
+        self.fps = fps
+        t = round(ahora - self.t0, 1)
+        self.cambios.append({"t_s": t, "FPS": round(fps, 3), "Motivo": motivo})
+        print(f"[{t:>7.1f}s] FPS -> {fps:.2f} ({motivo})")
+
+    def actualizar(self):
+        """Llamar una vez por ciclo; devuelve el periodo de disparo a usar."""
+        ahora = time.monotonic()
+        if ahora - self._t_ult >= self.ventana_s:
+            e = self.escritor.contadores()
+            escritos, ocupado, descartados = e["escritos"], e["t_ocupado"], e["descartados"]
+            d_esc, d_ocu = escritos - self._escritos, ocupado - self._ocupado
+            d_desc = descartados - self._descartados
+            self._escritos, self._ocupado, self._descartados = escritos, ocupado, descartados
+            self._t_ult = ahora
+
+            if d_esc and d_ocu > 0:
+                self.capacidad = d_esc / d_ocu * e["hilos"]
+            sostenible = self.capacidad * self.margen if self.capacidad else None
+            backlog = e["cola"]
+
+            if backlog > self.backlog_max or d_desc:
+                motivo = f"backlog {backlog}" + (f", {d_desc} dropped" if d_desc else "")
+                self._cambiar(min(self.fps / self.paso_subida, sostenible or self.fps),
+                              motivo, ahora)
+            elif (backlog <= self.backlog_max // 2 and sostenible
+                    and sostenible > self.fps and self.fps < self.fps_obj):
+                self._cambiar(min(self.fps * self.paso_subida, sostenible),
+                              f"headroom {self.capacidad:.2f} pairs/s", ahora)
+        return 1 / self.fps
+
+    def estado(self):
+        return {"FPS_objetivo": self.fps_obj, "FPS_min": self.fps_min,
+                "FPS_final": round(self.fps, 3),
+                "Capacidad_pares_s": round(self.capacidad, 3) if self.capacidad else None,
+                "Cambios": self.cambios}
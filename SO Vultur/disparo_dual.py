@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+disparo_dual.py
+───────────────
+Disparo concurrente de las dos cámaras.
+
+Cada cámara tiene un hilo propio que espera su `RetrieveResult`; el hilo
+principal dispara ambas cámaras una tras otra sin esperar la transferencia
+de la primera, de modo que las dos imágenes viajan por GigE en paralelo y
+el desfase entre disparos queda en el tiempo de un comando de trigger.
+"""
+
+import queue, threading, time
+from pypylon import pylon
+
+
+class HiloCaptura:
+    """Hilo dedicado a recuperar los resultados de una cámara."""
+
+    def __init__(self, cam, timeout_ms=5000):
+        self.cam, self.timeout_ms = cam, timeout_ms
+        self._pedidos, self._resultados = queue.Queue(), queue.Queue()
+        self._hilo = threading.Thread(target=self._trabajar, daemon=True)
+        self._hilo.start()
+
+    def pedir(self):
+        self._pedidos.put(True)
+
+    def resultado(self):
+        r = self._resultados.get()
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    def _trabajar(self):
+        while self._pedidos.get() is not None:
+            try:
+                r = self.cam.RetrieveResult(self.timeout_ms,
+                                            pylon.TimeoutHandling_ThrowException)
+            except Exception as e:
+                r = e
+            self._resultados.put(r)
+
+    def cerrar(self):
+        self._pedidos.put(None)
+        self._hilo.join(timeout=self.timeout_ms / 1000)
+
+
+def disparar_par(cam1, cam2, h1, h2, metricas=None):
+    """Dispara ambas cámaras y devuelve (r1, r2, desfase_s entre triggers)."""
+    h1.pedir(); h2.pedir()
+    t1 = time.perf_counter(); cam1.ExecuteSoftwareTrigger()
+    t2 = time.perf_counter(); cam2.ExecuteSoftwareTrigger()
+    t3 = time.perf_counter()
+    # Se recuperan ambos resultados aunque uno falle, para no dejar
+    # un resultado huérfano en la cola del otro hilo.
+    r1, r2, err = None, None, None
+    try:
+        r1 = h1.resultado()
+    except Exception as e:
+        err = e
+    try:
+        r2 = h2.resultado()
+    except Exception as e:
+        err = err or e
+    if metricas:
+        metricas.registrar("disparo", t3 - t1)
+        metricas.registrar("transferencia", time.perf_counter() - t3)
+    if err is not None:
+        for r in (r1, r2):
+            if r is not None: r.Release()
+        raise err
+    return r1, r2, t2 - t1
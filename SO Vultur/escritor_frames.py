@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+escritor_frames.py
+──────────────────
+Etapa de escritura a disco desacoplada del bucle de disparo.
+
+El bucle de captura entrega cada par de frames a una cola acotada y un
+grupo de hilos escritores vacía la cola hacia la SD.  Si la cola está
+llena durante más de `espera_max` segundos el par se descarta, de modo
+que la cadencia de las cámaras la fija el bucle de disparo y no la
+velocidad de la tarjeta.
+
+En formato Mono12p el array es el payload empaquetado (uint8, 3 bytes cada
+2 píxeles) y la descripción del TIFF guarda el formato y las dimensiones
+reales para que post-proceso pueda desempaquetarlo.
+
+La compresión sin pérdida es opcional (config.json → "Escritura"):
+    "Compresion": "none" | "deflate" | "zstd" | "lzw"
+    "Nivel"     : nivel del códec (deflate 1-9, zstd 1-22; lzw lo ignora)
+zstd y lzw requieren el paquete `imagecodecs`.
+
+Con "Contenedor": true los frames no se escriben como archivos sueltos
+sino que se anexan a un contenedor por cámara (ver contenedor_frames.py).
+
+Los frames pueden llegar como array o como `BufferCamara` (grab result de
+pylon sin copiar); en ese caso se escriben desde el buffer de pylon y se
+liberan al terminar.
+
+Con `vista` (PublicadorVista) el hilo escritor publica además una copia
+reducida del frame recién escrito para el visor en vivo; el publicador
+decide si hace falta y nunca espera.
+"""
+
+import io, json, os, queue, threading, time
+import numpy as np
+import tifffile as tiff
+from contenedor_frames import ContenedorFrames
+from pool_buffers import BufferCamara
+
+# nombre en config.json → nombre de compresión de tifffile
+CODECS = {"deflate": "zlib", "zstd": "zstd", "lzw": "lzw"}
+
+
+def opciones_compresion(codec="none", nivel=None, predictor=True):
+    """Argumentos extra de `tiff.imwrite` para el códec elegido."""
+    codec = (codec or "none").lower()
+    if codec == "none":
+        return {}
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression '{codec}' (none/deflate/zstd/lzw)")
+    kw = {"compression": CODECS[codec]}
+    if nivel is not None and codec != "lzw":
+        kw["compressionargs"] = {"level": int(nivel)}
+    if predictor:
+        kw["predictor"] = True     # diferencia horizontal, mejora mucho en imágenes
+    return kw
+
+
+class EscritorFrames:
+    """Pool de hilos productor/consumidor que escribe los frames en disco."""
+
+    def __init__(self, hilos=2, cola=4, espera_max=0.5,
+                 formato="Mono12", ancho=None, alto=None,
+                 compresion="none", nivel=None, contenedor=False, bloque_mb=256,
+                 metricas=None, vista=None):
+        self.n_hilos    = max(1, int(hilos))
+        self.cola       = queue.Queue(maxsize=max(1, int(cola)))
+        self.espera_max = float(espera_max)
+        self.descripcion= (json.dumps({"PixelFormat": formato,
+                                       "Width": ancho, "Height": alto})
+                           if formato == "Mono12p" else None)
+        # El predictor no tiene sentido sobre bytes empaquetados
+        self.opciones   = self._validar(opciones_compresion(
+            compresion, nivel, predictor=formato != "Mono12p"))
+        self.compresion = self.opciones.get("compression", "none")
+        self.contenedor = bool(contenedor)
+        self.bloque_mb  = bloque_mb
+        self._contenedores = {}      # carpeta → ContenedorFrames
+        self._seq       = 0          # índice del par dentro de la campaña
+        self.metricas   = metricas   # opcional: etapa "escritura" por par
+        self.vista      = vista      # opcional: PublicadorVista
+        self.empaquetado= formato == "Mono12p"
+
+        self._lock      = threading.Lock()
+        self.escritos   = 0          # pares escritos
+        self.descartados= 0          # pares perdidos por cola llena
+        self.errores    = 0          # archivos que fallaron al escribir
+        self.cola_max   = 0          # profundidad máxima observada
+        self.t_bloqueado= 0.0        # tiempo total que el bucle esperó a la cola
+        self.t_ocupado  = 0.0        # tiempo total de los hilos escribiendo
+
+        self._hilos = [threading.Thread(target=self._trabajar, daemon=True,
+                                        name=f"escritor-{i}")
+                       for i in range(self.n_hilos)]
+        for h in self._hilos: h.start()
+
+    @staticmethod
+    def _validar(opciones):
+        # Si el códec no está disponible se prefiere seguir capturando sin comprimir
+        try:
+            tiff.imwrite(io.BytesIO(), np.zeros((16, 16), np.uint16), **opciones)
+            return opciones
+        except Exception as e:
+            print(f"Compression {opciones.get('compression')} unavailable ({e}); writing uncompressed")
+            return {}
+
+    # ───────── productor ─────────
+    def encolar(self, frames, meta=None):
+        """Entrega una lista de (ruta, array | BufferCamara), una por cámara.
+
+        `meta` (secuencia de floats) acompaña al frame en la vista en vivo.
+        Devuelve False si se descartó; en ese caso los buffers siguen siendo
+        del llamador.
+        """
+        t0 = time.perf_counter()
+        try:
+            self.cola.put((self._seq, frames, meta), timeout=self.espera_max)
+            ok = True
+            self._seq += 1
+        except queue.Full:
+            ok = False
+        dt = time.perf_counter() - t0
+
+        with self._lock:
+            self.t_bloqueado += dt
+            if ok:
+                self.cola_max = max(self.cola_max, self.cola.qsize())
+            else:
+                self.descartados += 1
+        return ok
+
+    # ───────── consumidores ─────────
+    def _imwrite(self, destino, datos):
+        if self.descripcion:
+            tiff.imwrite(destino, datos, photometric="minisblack",
+                         description=self.descripcion, metadata=None, **self.opciones)
+        else:
+            tiff.imwrite(destino, datos, photometric="minisblack", **self.opciones)
+
+    def _contenedor_de(self, ruta):
+        carpeta = os.path.dirname(ruta)
+        with self._lock:
+            if carpeta not in self._contenedores:
+                prefijo = os.path.basename(ruta).split("_")[0]      # cam1 / cam2
+                self._contenedores[carpeta] = ContenedorFrames(carpeta, prefijo,
+                                                               self.bloque_mb)
+            return self._contenedores[carpeta]
+
+    def _escribir(self, seq, ruta, datos, cam=0, meta=None):
+        if isinstance(datos, BufferCamara):
+            return datos.usar(lambda a: self._escribir(seq, ruta, a, cam, meta))
+        if self.contenedor:
+            buf = io.BytesIO()
+            self._imwrite(buf, datos)
+            self._contenedor_de(ruta).agregar(seq, os.path.basename(ruta), buf.getbuffer())
+        else:
+            self._imwrite(ruta, datos)
+        if self.vista:
+            self.vista.publicar(cam, datos, os.path.basename(ruta), meta, self.empaquetado)
+
+    def _trabajar(self):
+        while True:
+            item = self.cola.get()
+            if item is None:
+                self.cola.task_done()
+                return
+            seq, frames, meta = item
+            fallos, t0 = 0, time.perf_counter()
+            for cam, (ruta, datos) in enumerate(frames):
+                try:
+                    self._escribir(seq, ruta, datos, cam, meta)
+                except Exception as e:
+                    fallos += 1
+                    print(f"Write error {ruta}: {e}")
+                finally:
+                    if isinstance(datos, BufferCamara):
+                        datos.liberar()
+            dt = time.perf_counter() - t0
+            if self.metricas:
+                self.metricas.registrar("escritura", dt)
+            with self._lock:
+                self.escritos += 1
+                self.errores  += fallos
+                self.t_ocupado+= dt
+            self.cola.task_done()
+
+    def cerrar(self):
+        """Espera a que se vacíe la cola y detiene los hilos."""
+        for _ in self._hilos:
+            self.cola.put(None)
+        for h in self._hilos:
+            h.join()
+        for c in self._contenedores.values():
+            c.cerrar()
+
+    def contadores(self):
+        """Contadores sin redondear, consistentes entre sí, para seguir la escritura en vivo."""
+        with self._lock:
+            return {"escritos": self.escritos, "descartados": self.descartados,
+                    "t_ocupado": self.t_ocupado, "t_bloqueado": self.t_bloqueado,
+                    "cola": self.cola.qsize(), "hilos": self.n_hilos}
+
+    def estado(self):
+        with self._lock:
+            return {"Hilos": self.n_hilos,
+                    "Compresion": self.compresion,
+                    "Contenedor": self.contenedor,
+                    "Cola_capacidad": self.cola.maxsize,
+                    "Cola_actual": self.cola.qsize(),
+                    "Cola_max": self.cola_max,
+                    "Pares_escritos": self.escritos,
+                    "Pares_descartados": self.descartados,
+                    "Errores_escritura": self.errores,
+                    "Tiempo_bloqueado_s": round(self.t_bloqueado, 3),
+                    "Tiempo_escribiendo_s": round(self.t_ocupado, 3)}
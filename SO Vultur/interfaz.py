@@ -7,17 +7,27 @@ import signal
 import RPi.GPIO as GPIO
 import os
 import time
+import queue
+import cliente_captura
 
 AUTOHIDE_DELAY_MS = 10000
+CONSOLE_POLL_MS = 100        # cada cuánto el loop de Tk vacía la cola de salida
+CONSOLE_MAX_LINES = 500      # scrollback de la consola
+CONSOLE_MAX_BATCH = 1000     # trozos por tick, para no trabar la pantalla táctil
 
 class InterfazApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Interfaz de Ejecucion de Codigos")
         self.capture_process = None
+        self.capture_servicio = False
+        self.servicio_proceso = None
         self.console_window = None
         self.console_text = None
         self.hide_timer = None
+        self.cola_consola = queue.SimpleQueue()
+        self.linea_parcial = ""
+        self.ultima_linea, self.repeticiones = None, 0
         self.apagado_timer = None
         self.timer_mensaje = None
         self.popup_apagado = None
@@ -58,6 +68,67 @@ class InterfazApp:
         GPIO.add_event_detect(self.pin_stop,  GPIO.BOTH, callback=self.controlar_apagado_fisico, bouncetime=300)
 
         self.root.bind("<Escape>", self.toggle_fullscreen)
+        self.root.after(CONSOLE_POLL_MS, self.vaciar_consola)
+        self.iniciar_servicio()
+
+    # Servicio de captura persistente: cámaras y MAVLink quedan abiertos entre campañas.
+    # Si no está disponible se vuelve a lanzar capturar_imagenes_gps.py por campaña.
+    # El sondeo del socket puede tardar hasta 1 s: se hace en un hilo para no trabar el arranque
+    def iniciar_servicio(self):
+        threading.Thread(target=self.lanzar_servicio, daemon=True).start()
+
+    def lanzar_servicio(self):
+        if cliente_captura.disponible():
+            return
+        try:
+            self.servicio_proceso = subprocess.Popen(['python3', 'servicio_captura.py'],
+                                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception as e:
+            self.write(f"Capture service not started: {e}\n")
+
+    def cerrar_servicio(self):
+        if self.servicio_proceso is not None and self.servicio_proceso.poll() is None:
+            self.servicio_proceso.send_signal(signal.SIGINT)
+            try:
+                self.servicio_proceso.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.servicio_proceso.kill()
+
+    def captura_activa(self):
+        return self.capture_process is not None or self.capture_servicio
+
+    def ejecutar_captura(self):
+        if not cliente_captura.disponible():
+            self.ejecutar_script_captura('capturar_imagenes_gps.py')
+            return
+        try:
+            desde = cliente_captura.enviar("status")["Siguiente"]
+            self.capture_servicio = True
+            self.mostrar_marco_verde()
+            r = cliente_captura.enviar("start", timeout=30)
+            if not r["ok"]:
+                self.write(f"{r['error']}\n")
+                return
+            self.seguir_servicio(desde)
+        except (OSError, ValueError) as e:
+            self.write(f"Capture service error: {e}\n")
+        finally:
+            self.capture_servicio = False
+            self.ocultar_marco_verde()
+
+    def seguir_servicio(self, desde):
+        ultimo_resumen = time.time()
+        while True:
+            time.sleep(1)
+            e = cliente_captura.enviar("status", desde=desde)
+            for linea in e["Mensajes"]:
+                self.write(linea + "\n")
+            desde = e["Siguiente"]
+            if not e["Capturando"]:
+                return
+            if time.time() - ultimo_resumen >= 30:
+                ultimo_resumen = time.time()
+                self.write(f"Frames {e['Pares_escritos']} | queue {e['Cola']} | {e['FPS_medido']} FPS\n")
 
     def mostrar_marco_verde(self):
         if self.marcos_verdes:
@@ -126,11 +197,11 @@ class InterfazApp:
         self.root.after(3000, lambda: os.system("sudo shutdown now"))
 
     def iniciar_captura_gpio(self, channel):
-        if self.capture_process is not None:
+        if self.captura_activa():
             self.write("Script alredy excecuted.\n")
             return
         self.write("START pressed: iniciating capture...\n")
-        threading.Thread(target=self.ejecutar_script_captura, args=('capturar_imagenes_gps.py',), daemon=True).start()
+        threading.Thread(target=self.ejecutar_captura, daemon=True).start()
 
     def create_console_window(self):
         if self.console_window is not None:
@@ -149,13 +220,51 @@ class InterfazApp:
         self.console_text.pack(expand=True, fill='both')
         self.console_window.protocol("WM_DELETE_WINDOW", self.ocultar_consola)
 
+    # write() se llama desde cualquier hilo (stdout y lectores de subprocesos):
+    # solo encola; el loop de Tk vacía la cola por lotes en vaciar_consola()
     def write(self, text):
+        self.cola_consola.put(text)
+
+    def vaciar_consola(self):
+        partes = []
+        try:
+            while len(partes) < CONSOLE_MAX_BATCH:
+                partes.append(self.cola_consola.get_nowait())
+        except queue.Empty:
+            pass
+        texto = self.linea_parcial + "".join(partes)
+        *lineas, self.linea_parcial = texto.split("\n")
+        if self.linea_parcial and not partes:
+            # Texto sin salto de línea que ya esperó un tick: se muestra igual
+            lineas.append(self.linea_parcial)
+            self.linea_parcial = ""
+        if lineas:
+            self.mostrar_lineas(lineas)
+        self.root.after(CONSOLE_POLL_MS, self.vaciar_consola)
+
+    def mostrar_lineas(self, lineas):
         self.create_console_window()
+        txt = self.console_text
+        # Líneas repetidas seguidas se muestran una vez con su cuenta
+        grupos = []
+        for linea in lineas:
+            if grupos and grupos[-1][0] == linea:
+                grupos[-1][1] += 1
+            else:
+                grupos.append([linea, 1])
+        if grupos[0][0] == self.ultima_linea:
+            ultima = int(txt.index("end-1c").split(".")[0]) - 1
+            txt.delete(f"{ultima}.0", f"{ultima + 1}.0")
+            grupos[0][1] += self.repeticiones
+        grupos = grupos[-CONSOLE_MAX_LINES:]
+        txt.insert(tk.END, "".join(f"{l} (x{n})\n" if n > 1 else l + "\n" for l, n in grupos))
+        self.ultima_linea, self.repeticiones = grupos[-1]
+        sobrantes = int(txt.index("end-1c").split(".")[0]) - 1 - CONSOLE_MAX_LINES
+        if sobrantes > 0:
+            txt.delete("1.0", f"{sobrantes + 1}.0")
+        txt.see(tk.END)
         if self.hide_timer:
             self.console_window.after_cancel(self.hide_timer)
-        self.console_text.insert(tk.END, text)
-        self.console_text.see(tk.END)
-        self.console_text.update()
         self.hide_timer = self.console_window.after(AUTOHIDE_DELAY_MS, self.ocultar_consola)
 
     def flush(self):
@@ -167,6 +276,7 @@ class InterfazApp:
             self.console_window = None
             self.console_text = None
             self.hide_timer = None
+            self.ultima_linea, self.repeticiones = None, 0
 
     def ejecutar_script(self, script):
         try:
@@ -194,22 +304,57 @@ class InterfazApp:
 
     def detectar_dispositivos(self):
         threading.Thread(target=self.ejecutar_script, args=('detectar_camaras.py',), daemon=True).start()
-        threading.Thread(target=self.ejecutar_script, args=('detectar_gps.py',), daemon=True).start()
+        threading.Thread(target=self.detectar_gps, daemon=True).start()
+
+    # Los pedidos al servicio corren en hilos: si está caído o reiniciando no traban la pantalla
+    def detectar_gps(self):
+        try:
+            # El servicio tiene abierto el puerto serie: se informa su estado
+            e = cliente_captura.enviar("status")
+        except (OSError, ValueError):
+            e = None
+        if e is None or not e.get("ok"):
+            self.ejecutar_script('detectar_gps.py')
+        else:
+            self.write("GPS OK\n" if e["GPS"] else "No GPS fix (capture service).\n")
 
     def abrir_configuracion(self):
         threading.Thread(target=self.ejecutar_script, args=('configurar_parametros.py',), daemon=True).start()
 
     def capturar_imagenes(self):
-        if self.capture_process is not None:
+        if self.captura_activa():
             messagebox.showinfo("Informacion", "El script de captura ya esta en ejecucion.")
             return
-        threading.Thread(target=self.ejecutar_script_captura, args=('capturar_imagenes_gps.py',), daemon=True).start()
+        threading.Thread(target=self.ejecutar_captura, daemon=True).start()
 
     def capturar_y_ver(self):
-        threading.Thread(target=self.ejecutar_script, args=('Focus_test.py',), daemon=True).start()
+        if self.captura_activa():
+            # Las cámaras están tomadas por la captura: se ve la vista publicada en memoria compartida
+            threading.Thread(target=self.ejecutar_script, args=('visor_vista.py',), daemon=True).start()
+            return
+        threading.Thread(target=self.ver_foco, daemon=True).start()
+
+    def ver_foco(self):
+        if cliente_captura.disponible():
+            try:
+                cliente_captura.enviar("liberar", timeout=10)   # Focus_test necesita abrir las cámaras
+            except (OSError, ValueError) as e:
+                self.write(f"Capture service did not release the cameras: {e}\n")
+        self.ejecutar_script('Focus_test.py')
+
+    def detener_servicio(self):
+        # stop espera a que se vacíe la cola de escritura (hasta 60 s)
+        try:
+            r = cliente_captura.enviar("stop", timeout=60)
+        except (OSError, ValueError) as e:
+            self.write(f"Capture service error: {e}\n")
+            return
+        self.write("Data saved.\n" if r["ok"] else f"{r['error']}\n")
 
     def detener_captura(self):
-        if self.capture_process is not None:
+        if self.capture_servicio:
+            threading.Thread(target=self.detener_servicio, daemon=True).start()
+        elif self.capture_process is not None:
             if self.capture_process.poll() is None:
                 self.capture_process.send_signal(signal.SIGINT)
                 try:
@@ -237,4 +382,5 @@ class InterfazApp:
 root = tk.Tk()
 app = InterfazApp(root)
 root.mainloop()
+app.cerrar_servicio()
 GPIO.cleanup()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+metricas.py
+───────────
+Latencia por etapa del bucle de captura con costo mínimo.
+
+Cada muestra cae en un histograma de bins logarítmicos fijos (1 µs a
+100 s, 40 bins por década), así la memoria no crece con la campaña y
+registrar una muestra es un `bisect` y una suma.  Al final se guardan
+p50/p95/p99/máx por etapa y los histogramas en Latencias.json, junto a
+Parametros.json.  Los percentiles se reportan como el borde superior del
+bin (error < 6 %).
+"""
+
+import bisect, json, threading, time
+
+BORDES = [10 ** (-6 + i / 40) for i in range(8 * 40 + 1)]     # 1e-6 … 1e2 s
+
+
+class Metricas:
+    """Histogramas de latencia por etapa, seguros entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cuentas, self.n, self.suma, self.maximo = {}, {}, {}, {}
+
+    def registrar(self, etapa, dt):
+        i = bisect.bisect_left(BORDES, dt)
+        with self._lock:
+            if etapa not in self.cuentas:
+                self.cuentas[etapa] = [0] * (len(BORDES) + 1)
+                self.n[etapa], self.suma[etapa], self.maximo[etapa] = 0, 0.0, 0.0
+            self.cuentas[etapa][i] += 1
+            self.n[etapa] += 1
+            self.suma[etapa] += dt
+            if dt > self.maximo[etapa]:
+                self.maximo[etapa] = dt
+
+    def percentil(self, etapa, q):
+        cuentas, n = self.cuentas[etapa], self.n[etapa]
+        objetivo, acum = q / 100 * n, 0
+        for i, c in enumerate(cuentas):
+            acum += c
+            if acum >= objetivo and c:
+                return min(BORDES[min(i, len(BORDES) - 1)], self.maximo[etapa])
+        return self.maximo[etapa]
+
+    def resumen(self):
+        with self._lock:
+            return {e: {"n": self.n[e],
+                        "media_ms": round(self.suma[e] / self.n[e] * 1000, 3),
+                        "p50_ms": round(self.percentil(e, 50) * 1000, 3),
+                        "p95_ms": round(self.percentil(e, 95) * 1000, 3),
+                        "p99_ms": round(self.percentil(e, 99) * 1000, 3),
+                        "max_ms": round(self.maximo[e] * 1000, 3)}
+                    for e in self.cuentas if self.n[e]}
+
+    def linea(self):
+        """Resumen de una línea (p50/p95 en ms) para la consola de la interfaz."""
+        return " | ".join(f"{e} {r['p50_ms']:.0f}/{r['p95_ms']:.0f}"
+                          for e, r in self.resumen().items())
+
+    def guardar(self, ruta):
+        with self._lock:
+            hist = {e: {str(i): c for i, c in enumerate(cu) if c}
+                    for e, cu in self.cuentas.items()}
+        json.dump({"Etapas": self.resumen(),
+                   "Histograma": {"Bordes_s": "10**(-6 + i/40), bin i = (borde[i-1], borde[i]]",
+                                  "Cuentas": hist}},
+                  open(ruta, "w"), indent=2)
+
+
+class Resumidor:
+    """Imprime `metricas.linea()` cada `periodo_s` segundos (0 = nunca)."""
+
+    def __init__(self, metricas, periodo_s=0):
+        self.metricas, self.periodo_s = metricas, float(periodo_s)
+        self._t = time.monotonic()
+
+    def tick(self, extra=""):
+        if self.periodo_s and time.monotonic() - self._t >= self.periodo_s:
+            self._t = time.monotonic()
+            print(f"[ms p50/p95] {self.metricas.linea()}{extra}")
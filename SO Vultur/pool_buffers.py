@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pool_buffers.py
+───────────────
+Camino de captura sin copias sobre el pool fijo de buffers de pylon.
+
+pylon reserva `MaxNumBuffer` buffers por cámara al llamar a
+`StartGrabbing` y los reutiliza durante toda la campaña.  En vez de copiar
+cada imagen con `GetArray()`, el bucle de captura envuelve el grab result
+en un `BufferCamara` y se lo entrega tal cual al escritor, que lee los
+píxeles directamente del buffer de pylon (`GetArrayZeroCopy`) y lo libera
+al terminar de escribir.  `PoolBuffers` lleva la cuenta de cuántos
+buffers están retenidos para dimensionar la RAM de cada campaña.
+"""
+
+import threading
+import numpy as np
+
+
+class BufferCamara:
+    """Grab result retenido hasta que el escritor termina con él."""
+
+    def __init__(self, pool, resultado, cam=0):
+        self.pool, self.resultado, self.cam = pool, resultado, cam
+        self._liberado = False
+
+    def usar(self, funcion):
+        """Llama a `funcion(array)` con los píxeles del buffer y devuelve su resultado.
+
+        pypylon no deja salir de `GetArrayZeroCopy` mientras quede alguna
+        referencia al array: `funcion` no debe guardarlo ni guardar vistas
+        de él (los datos tienen que copiarse o terminar de usarse dentro).
+        """
+        if self.pool.empaquetado:
+            # pylon no expone Mono12p sin copia: se copia el payload aquí,
+            # en el hilo escritor y no en el bucle de disparo
+            return funcion(np.frombuffer(self.resultado.GetBuffer(), np.uint8).reshape(self.pool.alto, -1))
+        with self.resultado.GetArrayZeroCopy() as a:
+            r = funcion(a)
+            del a
+        return r
+
+    def liberar(self):
+        if not self._liberado:
+            self._liberado = True
+            self.resultado.Release()
+            self.pool._devolver(self.cam)
+
+
+class PoolBuffers:
+    """Ocupación de los `MaxNumBuffer` buffers por cámara de pylon.
+
+    La ocupación se cuenta por cámara (listas indexadas por cámara): cada
+    una tiene su propio pool y `MaxNumBuffer` es el límite de cada una.
+    """
+
+    def __init__(self, capacidad, bytes_buffer, camaras=2, empaquetado=False, alto=None):
+        self.capacidad, self.bytes_buffer, self.camaras = int(capacidad), int(bytes_buffer), camaras
+        self.empaquetado, self.alto = empaquetado, alto
+        self._lock = threading.Lock()
+        self.ocupados, self.max_ocupados = [0] * camaras, [0] * camaras
+
+    def tomar(self, resultado, cam=0):
+        with self._lock:
+            self.ocupados[cam] += 1
+            self.max_ocupados[cam] = max(self.max_ocupados[cam], self.ocupados[cam])
+        return BufferCamara(self, resultado, cam)
+
+    def _devolver(self, cam):
+        with self._lock:
+            self.ocupados[cam] -= 1
+
+    def estado(self):
+        mb = self.bytes_buffer / 1e6
+        with self._lock:
+            return {"MaxNumBuffer": self.capacidad,
+                    "Bytes_buffer": self.bytes_buffer,
+                    "RAM_reservada_MB": round(self.capacidad * self.camaras * mb, 1),
+                    "Ocupados": list(self.ocupados),               # por cámara
+                    "Max_ocupados": list(self.max_ocupados),       # por cámara, ≤ MaxNumBuffer
+                    "Max_ocupados_MB": round(sum(self.max_ocupados) * mb, 1)}
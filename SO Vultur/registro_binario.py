@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+registro_binario.py
+───────────────────
+Registro binario por frame de la campaña (log_Campaña.bin), en lugar de
+una fila CSV de texto con flush por ciclo.
+
+• Registros de ancho fijo (`REGISTRO`), valores ausentes como NaN.
+• Cabecera: MAGIA + largo (u4) + JSON con la descripción del dtype y el
+  huso horario del RTC, así el archivo se lee sin conocer la versión.
+• Los registros se acumulan en un array preasignado y se escriben por
+  lotes (`lote` registros o cada `intervalo_s` segundos).
+
+`a_csv()` lo convierte al formato de log_Campaña.csv de siempre; la
+captura lo hace sola al terminar, y por consola sirve para recuperar una
+campaña que se cortó:
+    python3 registro_binario.py "<campaña>/log_Campaña.bin"
+"""
+
+import csv, datetime, json, math, struct, sys, time
+import numpy as np
+
+MAGIA = b"VLOGBIN1"
+
+REGISTRO = np.dtype([
+    ("t_rtc", "<f8"), ("t_gps", "<f8"),             # epoch s (t_gps NaN sin GPS)
+    ("img1", "S40"), ("img2", "S40"),
+    ("lat", "<f8"), ("lon", "<f8"), ("alt", "<f4"),
+    ("yaw", "<f4"), ("pitch", "<f4"), ("roll", "<f4"),
+    ("gs", "<f4"), ("climb", "<f4"),
+    ("skew_ms", "<f4"), ("fps", "<f4"),
+    ("err_pos_m", "<f4"), ("err_att_deg", "<f4")])
+
+# columna CSV ← campo, decimales
+COLUMNAS = [("Lat", "lat", 7), ("Lon", "lon", 7), ("Alt", "alt", 3),
+            ("Yaw_deg", "yaw", 2), ("Pitch_deg", "pitch", 2), ("Roll_deg", "roll", 2),
+            ("gs", "gs", 2), ("climb", "climb", 2), ("Skew_ms", "skew_ms", 2),
+            ("FPS", "fps", 3), ("Err_pos_m", "err_pos_m", 3),
+            ("Err_att_deg", "err_att_deg", 3)]
+ENCABEZADO = ["Hora_RTC", "Hora_GPS", "Img_cam1", "Img_cam2"] + [c for c, _, _ in COLUMNAS]
+
+
+class RegistroBinario:
+    """Escritor por lotes de registros de ancho fijo."""
+
+    def __init__(self, ruta, lote=32, intervalo_s=5.0):
+        self.f = open(ruta, "wb")
+        tz = datetime.datetime.now().astimezone().utcoffset().total_seconds()
+        cab = json.dumps({"dtype": REGISTRO.descr, "utcoffset_s": tz}).encode()
+        self.f.write(MAGIA + struct.pack("<I", len(cab)) + cab)
+        self.f.flush()
+        self.buf = np.zeros(max(1, int(lote)), REGISTRO)
+        self.i, self.intervalo_s = 0, float(intervalo_s)
+        self._t_ult = time.monotonic()
+        self.registros = 0
+
+    def agregar(self, fila):
+        """fila: tupla en el orden de REGISTRO."""
+        self.buf[self.i] = fila
+        self.i += 1
+        self.registros += 1
+        if self.i == len(self.buf) or time.monotonic() - self._t_ult >= self.intervalo_s:
+            self.vaciar()
+
+    def vaciar(self):
+        if self.i:
+            self.f.write(self.buf[:self.i].tobytes())
+            self.f.flush()
+            self.i = 0
+        self._t_ult = time.monotonic()
+
+    def cerrar(self):
+        self.vaciar()
+        self.f.close()
+
+
+def leer(ruta):
+    """Devuelve (registros, cabecera) de un log binario."""
+    with open(ruta, "rb") as f:
+        if f.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f"No es un log binario de Vultur: {ruta}")
+        n, = struct.unpack("<I", f.read(4))
+        cab = json.loads(f.read(n))
+        dt = np.dtype([tuple(c) for c in cab["dtype"]])
+        crudo = f.read()
+    # Un registro a medias al final (corte de energía) se descarta
+    return np.frombuffer(crudo, dt, count=len(crudo) // dt.itemsize), cab
+
+
+def a_csv(ruta_bin, ruta_csv):
+    """Escribe log_Campaña.csv con las mismas columnas y formato de la captura."""
+    reg, cab = leer(ruta_bin)
+    tz = datetime.timezone(datetime.timedelta(seconds=cab.get("utcoffset_s", 0)))
+    campos = set(reg.dtype.names)
+    with open(ruta_csv, "w", newline="") as fcsv:
+        wr = csv.writer(fcsv)
+        wr.writerow(ENCABEZADO)
+        for r in reg:
+            rtc = datetime.datetime.fromtimestamp(float(r["t_rtc"]), tz)
+            t_gps = float(r["t_gps"])
+            gps = ("NONE" if math.isnan(t_gps) else
+                   datetime.datetime.fromtimestamp(t_gps, datetime.timezone.utc)
+                   .replace(tzinfo=None).isoformat(timespec="milliseconds"))
+            fila = [rtc.isoformat(timespec="milliseconds"), gps,
+                    r["img1"].decode(), r["img2"].decode()]
+            for _, campo, nd in COLUMNAS:
+                x = float(r[campo]) if campo in campos else math.nan
+                fila.append("NONE" if math.isnan(x) else round(x, nd))
+            wr.writerow(fila)
+    return len(reg)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("Uso: python3 registro_binario.py <log_Campaña.bin> [log_Campaña.csv]")
+    destino = sys.argv[2] if len(sys.argv) > 2 else sys.argv[1][:-4] + ".csv"
+    print(f"{a_csv(sys.argv[1], destino)} filas → {destino}")
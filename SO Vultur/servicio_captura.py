@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+servicio_captura.py
+───────────────────
+Servicio de captura persistente.
+
+Mantiene un `SistemaCaptura` vivo: pypylon y pymavlink importados, las
+dos cámaras abiertas y configuradas y el lector MAVLink alimentando la
+telemetría.  Cada `start` solo crea la carpeta de la campaña, arranca el
+grabbing y los escritores, así que el primer par llega en milisegundos.
+Se controla por el socket Unix de `cliente_captura.SOCKET` (ver el
+protocolo en cliente_captura.py); la interfaz, los botones GPIO y
+cualquier script usan el mismo cliente.
+
+La salida de la captura se guarda también en memoria y se entrega con
+`status` ({"desde": n} → mensajes a partir del n-ésimo) para que la
+interfaz la muestre en su consola.
+
+Uso (desde la carpeta SO Vultur):
+    python3 servicio_captura.py [--socket RUTA]
+"""
+
+import argparse, collections, json, os, signal, socketserver, sys, threading, time
+from capturar_imagenes_gps import SistemaCaptura
+from cliente_captura import SOCKET, disponible
+
+
+class Consola:
+    """stdout que además guarda las últimas líneas numeradas."""
+
+    def __init__(self, salida, maximo=500):
+        self.salida, self.lineas, self.n = salida, collections.deque(maxlen=maximo), 0
+        self._parcial, self._lock = "", threading.Lock()
+
+    def write(self, texto):
+        self.salida.write(texto)
+        with self._lock:
+            *completas, self._parcial = (self._parcial + texto).split("\n")
+            for linea in completas:
+                self.lineas.append((self.n, linea)); self.n += 1
+
+    def flush(self):
+        self.salida.flush()
+
+    def desde(self, n):
+        with self._lock:
+            return [l for i, l in self.lineas if i >= n], self.n
+
+
+class Servicio:
+    def __init__(self, consola):
+        self.consola = consola
+        self.sistema, self.error_inicio = None, None
+        self.hilo, self.detener, self.resultado = None, threading.Event(), None
+        self._lock = threading.Lock()      # serializa start, stop y liberar
+        self.iniciado = threading.Event()
+
+    def iniciar(self):
+        t = time.monotonic()
+        try:
+            self.sistema = SistemaCaptura()
+        except Exception as e:
+            self.error_inicio = str(e)
+            print(f"Capture service failed to start: {e}")
+            return
+        finally:
+            self.iniciado.set()
+        if self.sistema.error:
+            print(f"{self.sistema.error} (will retry on start)")
+        print(f"Capture service ready in {time.monotonic()-t:.1f} s")
+
+    def capturando(self):
+        return self.hilo is not None and self.hilo.is_alive()
+
+    # ───────── comandos ─────────
+    def start(self):
+        t0 = time.monotonic()
+        self.iniciado.wait()
+        with self._lock:
+            if self.sistema is None:
+                return {"ok": False, "error": self.error_inicio or "Service not initialized"}
+            if self.capturando():
+                return {"ok": False, "error": "Capture already running"}
+            self.detener, listo, fallo = threading.Event(), threading.Event(), []
+            self.resultado = None
+
+            def correr():
+                try:
+                    self.resultado = self.sistema.campaña(self.detener, t0=t0, listo=listo)
+                except Exception as e:
+                    fallo.append(e)
+                    self.sistema.error = str(e)
+                    print(f"Capture failed: {e}")
+                    self.sistema.liberar()      # en el próximo start se reabren
+                finally:
+                    listo.set()
+
+            self.hilo = threading.Thread(target=correr, daemon=True)
+            self.hilo.start()
+            listo.wait()
+            if fallo:
+                return {"ok": False, "error": str(fallo[0])}
+            return {"ok": True, "Inicio_ms": round((time.monotonic()-t0)*1000, 1),
+                    **self.sistema.estado()}
+
+    def stop(self):
+        with self._lock:
+            if not self.capturando():
+                return {"ok": False, "error": "No capture running"}
+            self.detener.set()
+            self.hilo.join()
+            r = self.resultado or {}
+            return {"ok": True, "Escritura": r.get("Escritura"), "Arranque_s": r.get("Arranque_s")}
+
+    def status(self, desde=0):
+        mensajes, siguiente = self.consola.desde(int(desde))
+        e = (self.sistema.estado() if self.sistema else
+             {"Capturando": False, "Error": self.error_inicio})
+        return {"ok": True, "Iniciando": not self.iniciado.is_set(),
+                **e, "Mensajes": mensajes, "Siguiente": siguiente}
+
+    def liberar(self):
+        self.iniciado.wait()
+        with self._lock:
+            if self.capturando():
+                return {"ok": False, "error": "Capture running"}
+            if self.sistema:
+                self.sistema.liberar()
+            return {"ok": True}
+
+    def cerrar(self):
+        if self.capturando():
+            self.detener.set(); self.hilo.join()
+        if self.sistema:
+            self.sistema.cerrar()
+
+    def atender(self, pedido, servidor):
+        cmd = pedido.get("cmd")
+        if cmd == "start":   return self.start()
+        if cmd == "stop":    return self.stop()
+        if cmd == "status":  return self.status(pedido.get("desde", 0))
+        if cmd == "liberar": return self.liberar()
+        if cmd == "salir":
+            threading.Thread(target=servidor.shutdown, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown command: {cmd}"}
+
+
+class Manejador(socketserver.StreamRequestHandler):
+    def handle(self):
+        for linea in self.rfile:
+            try:
+                r = self.server.servicio.atender(json.loads(linea), self.server)
+            except Exception as e:
+                r = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(r, ensure_ascii=False, default=str) + "\n").encode())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Servicio de captura persistente")
+    ap.add_argument("--socket", default=SOCKET)
+    args = ap.parse_args()
+
+    if os.path.exists(args.socket):
+        if disponible(args.socket):
+            sys.exit(f"Capture service already running on {args.socket}")
+        os.unlink(args.socket)          # socket huérfano de una ejecución anterior
+
+    sys.stdout = consola = Consola(sys.stdout)
+    servicio = Servicio(consola)
+    servidor = socketserver.ThreadingUnixStreamServer(args.socket, Manejador)
+    servidor.daemon_threads, servidor.servicio = True, servicio
+    for s in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(s, lambda *_: threading.Thread(target=servidor.shutdown, daemon=True).start())
+
+    # Se escucha desde ya: un start que llegue durante el arranque espera a `iniciado`
+    threading.Thread(target=servicio.iniciar, daemon=True).start()
+    print(f"Capture service listening on {args.socket}")
+    try:
+        servidor.serve_forever()
+    finally:
+        servicio.cerrar()
+        servidor.server_close()
+        os.unlink(args.socket)
+        print("Capture service stopped")
+
+
+if __name__ == "__main__":
+    main()
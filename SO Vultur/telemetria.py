@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+telemetria.py
+─────────────
+Historial de telemetría MAVLink con marca de tiempo monotónica e
+interpolación de la pose en el instante de disparo de cada frame.
+
+Cada tipo de mensaje (GLOBAL_POSITION_INT, ATTITUDE, VFR_HUD) va a su
+propio `Anillo`: arrays de NumPy de tamaño fijo escritos dos veces
+(posición i e i+n), de modo que las últimas n muestras siempre forman un
+tramo contiguo y ordenado en el tiempo.  La búsqueda del par de muestras
+que rodea al disparo es un `searchsorted` (O(log n)) sin copiar nada.
+
+La cota de error de la interpolación lineal entre (ta, tb) evaluada en t
+es |(t-ta)(t-tb)|·a_max/2, con a_max la aceleración máxima supuesta
+(lineal para la posición, angular para la actitud).  Vale igual para una
+extrapolación corta más allá de la última muestra; más allá de
+`edad_max_s` la pose se considera desconocida (NaN).
+"""
+
+import math, threading
+import numpy as np
+
+
+class Anillo:
+    """Buffer circular de muestras (t, v1, v2, ...) respaldado por arrays."""
+
+    def __init__(self, n, campos, angulos=()):
+        self.n, self.campos = int(n), tuple(campos)
+        self.angulos = np.array([c in angulos for c in self.campos])
+        self.t = np.full(2 * self.n, np.nan)
+        self.v = np.full((2 * self.n, len(self.campos)), np.nan)
+        self.cab = self.cuenta = 0
+        self._lock = threading.Lock()
+
+    def agregar(self, t, *valores):
+        with self._lock:
+            i = self.cab
+            self.t[i] = self.t[i + self.n] = t
+            self.v[i] = self.v[i + self.n] = valores
+            self.cab = (i + 1) % self.n
+            self.cuenta = min(self.cuenta + 1, self.n)
+
+    def interpolar(self, t, edad_max_s=2.0):
+        """Devuelve (valores en t, |(t-ta)(t-tb)|) o (NaN..., NaN)."""
+        nan = np.full(len(self.campos), np.nan)
+        with self._lock:
+            c = self.cuenta
+            if c == 0:
+                return nan, math.nan
+            fin = self.cab + self.n
+            tv = self.t[fin - c:fin]                     # vista ordenada, sin copia
+            if c == 1:
+                if abs(t - tv[0]) > edad_max_s:
+                    return nan, math.nan
+                return self.v[fin - 1].copy(), math.nan
+            k = int(np.searchsorted(tv, t))
+            k = min(max(k, 1), c - 1)                    # extrapola con el par extremo
+            ta, tb = tv[k - 1], tv[k]
+            va, vb = self.v[fin - c + k - 1].copy(), self.v[fin - c + k].copy()
+        if t - tb > edad_max_s or ta - t > edad_max_s or tb <= ta:
+            return nan, math.nan
+        d = vb - va
+        d[self.angulos] = (d[self.angulos] + 180.0) % 360.0 - 180.0
+        val = va + d * ((t - ta) / (tb - ta))
+        val[self.angulos] = (val[self.angulos] + 180.0) % 360.0 - 180.0
+        return val, abs((t - ta) * (t - tb))
+
+
+class Telemetria:
+    """Anillos de posición, actitud y velocidad con pose por frame."""
+
+    def __init__(self, muestras=256, acel_max=3.0, acel_ang_max=90.0, edad_max_s=2.0):
+        self.pos = Anillo(muestras, ("lat", "lon", "alt"))
+        self.att = Anillo(muestras, ("yaw", "pitch", "roll"), angulos=("yaw", "pitch", "roll"))
+        self.hud = Anillo(muestras, ("gs", "climb"))
+        self.acel_max, self.acel_ang_max = float(acel_max), float(acel_ang_max)
+        self.edad_max_s = float(edad_max_s)
+
+    def pose(self, t):
+        """Pose interpolada en el instante monotónico t.
+
+        Devuelve un dict con lat, lon, alt, yaw, pitch, roll, gs, climb
+        (NaN si no hay datos) y las cotas err_pos_m / err_att_deg.
+        """
+        (lat, lon, alt), k_pos = self.pos.interpolar(t, self.edad_max_s)
+        (yaw, pitch, roll), k_att = self.att.interpolar(t, self.edad_max_s)
+        (gs, climb), _ = self.hud.interpolar(t, self.edad_max_s)
+        return {"lat": float(lat), "lon": float(lon), "alt": float(alt),
+                "yaw": float(yaw), "pitch": float(pitch), "roll": float(roll),
+                "gs": float(gs), "climb": float(climb),
+                "err_pos_m": float(k_pos * self.acel_max / 2),
+                "err_att_deg": float(k_att * self.acel_ang_max / 2)}
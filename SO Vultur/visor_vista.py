@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+visor_vista.py
+──────────────
+Vista en vivo de una captura en curso (ver vista_compartida.py).
+
+Muestra lado a lado el último frame publicado por cada cámara con su
+hora y posición.  Mientras está abierto toca el archivo de latido para
+que la captura publique; al cerrarse la captura deja de hacerlo.  Si no
+hay captura espera a que empiece, y se reengancha sola a cada campaña.
+Toque la pantalla o presione q para salir.
+"""
+
+import datetime, math, time
+import cv2
+import numpy as np
+from vista_compartida import LectorVista, ruta_latido
+
+VENTANA = "Vultur - Live (toque para salir)"
+
+
+def texto(img, linea, y, color=(255, 255, 255)):
+    cv2.putText(img, linea, (12, y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2, cv2.LINE_AA)
+
+
+def componer(frames):
+    """Imágenes de las cámaras lado a lado con su metadata, en BGR."""
+    alto = max(f[0].shape[0] for f in frames)
+    partes = []
+    for img, frame, meta, nombre in frames:
+        bgr = cv2.cvtColor(cv2.copyMakeBorder(img, 0, alto - img.shape[0], 0, 4,
+                                              cv2.BORDER_CONSTANT), cv2.COLOR_GRAY2BGR)
+        texto(bgr, nombre, 28)
+        if not math.isnan(meta["t"]):
+            texto(bgr, datetime.datetime.fromtimestamp(meta["t"]).strftime("%H:%M:%S"), 56)
+        if not math.isnan(meta["lat"]):
+            texto(bgr, f"{meta['lat']:.6f} {meta['lon']:.6f}  {meta['alt']:.0f} m", 84)
+        else:
+            texto(bgr, "No GPS", 84, (0, 0, 255))
+        partes.append(bgr)
+    return np.hstack(partes)
+
+
+def espera():
+    img = np.zeros((240, 640, 3), np.uint8)
+    texto(img, "Waiting for capture...", 130)
+    return img
+
+
+def main():
+    salir = False
+
+    def on_mouse(event, x, y, flags, param):
+        nonlocal salir
+        if event == cv2.EVENT_LBUTTONDOWN:
+            salir = True
+
+    cv2.namedWindow(VENTANA, cv2.WINDOW_NORMAL)
+    cv2.setWindowProperty(VENTANA, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+    cv2.setMouseCallback(VENTANA, on_mouse)
+
+    lector, ultimos, t_latido = None, None, 0.0
+    latido = ruta_latido()
+    cv2.imshow(VENTANA, espera())
+    try:
+        while not salir:
+            if time.monotonic() - t_latido >= 1.0:
+                t_latido = time.monotonic()
+                if lector and not lector.vigente():
+                    lector.cerrar(); lector = None
+                    cv2.imshow(VENTANA, espera())
+                if lector is None:
+                    try:
+                        lector, ultimos = LectorVista(), None
+                    except (OSError, ValueError):
+                        pass
+                try:
+                    latido.touch()                  # también sin captura: publica apenas empiece
+                except OSError:
+                    pass
+
+            if lector:
+                frames = [lector.leer(c) for c in range(lector.camaras)]
+                if all(frames):
+                    clave = tuple(f[1] for f in frames)
+                    if clave != ultimos:            # solo se redibuja si hay frames nuevos
+                        ultimos = clave
+                        cv2.imshow(VENTANA, componer(frames))
+
+            if cv2.waitKey(50) & 0xFF == ord('q'):
+                break
+    finally:
+        try:
+            latido.unlink()                         # la captura deja de publicar enseguida
+        except OSError:
+            pass
+        if lector:
+            lector.cerrar()
+        cv2.destroyWindow(VENTANA)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+vista_compartida.py
+───────────────────
+Vista previa de una captura en curso por memoria compartida.
+
+Las cámaras se abren en modo exclusivo, así que durante una campaña
+ningún otro proceso puede verlas.  Los hilos escritores publican una copia
+reducida (8 bits, 1 de cada `reduccion` píxeles por eje) del último frame
+de cada cámara, con su metadata, en un segmento de /dev/shm.  Cada cámara
+tiene un anillo de `SLOTS` slots protegidos por un contador tipo seqlock
+(impar mientras se escribe); el visor lee el último slot completo y
+reintenta si el contador cambió durante la copia.
+
+Publicar nunca frena la captura:
+• solo se publica si hay un visor vivo (archivo de latido tocado hace
+  menos de `LATIDO_MAX_S`), a lo sumo `hz` veces por segundo y cámara;
+• si otro hilo escritor está publicando la misma cámara, se salta;
+• el visor abre el segmento de solo lectura y nunca bloquea al escritor.
+
+En Mono12p se leen solo los bytes de los píxeles elegidos, sin
+desempaquetar el frame: el tercer byte de cada grupo de 3 es el píxel
+impar en 8 bits; el par se arma con el nibble alto del primero y el bajo
+del segundo.
+"""
+
+import mmap, os, pathlib, threading, time
+import numpy as np
+from multiprocessing import shared_memory
+
+NOMBRE = "vultur_vista"
+MAGIA = b"VVISTA01"
+SLOTS = 2
+LATIDO_MAX_S = 3.0
+CABECERA = np.dtype([("magia", "S8"), ("camaras", "<i8"), ("slots", "<i8"),
+                     ("alto", "<i8"), ("ancho", "<i8"), ("ultimo", "<i8", (4,))])
+SLOT = np.dtype([("seqlock", "<u8"), ("frame", "<u8"), ("alto", "<i8"), ("ancho", "<i8"),
+                 ("meta", "<f8", (8,)), ("nombre", "S48")])
+INICIO = -(-CABECERA.itemsize // 64) * 64          # slots alineados a 64 bytes
+# meta: Hora_RTC, Lat, Lon, Alt, Yaw, Pitch, Roll, gs
+CAMPOS_META = ("t", "lat", "lon", "alt", "yaw", "pitch", "roll", "gs")
+
+
+def ruta_latido(nombre=NOMBRE):
+    base = pathlib.Path("/dev/shm")
+    return (base if base.is_dir() else pathlib.Path("/tmp")) / f"{nombre}.visor"
+
+
+def _vistas(buf, camaras, alto, ancho):
+    """Cabecera, slots (camaras×SLOTS) e imágenes sobre el buffer compartido."""
+    cab = np.ndarray((), CABECERA, buf, 0)
+    off = INICIO
+    slots = np.ndarray((camaras, SLOTS), SLOT, buf, off)
+    off += slots.nbytes
+    imgs = np.ndarray((camaras, SLOTS, alto, ancho), np.uint8, buf, off)
+    return cab, slots, imgs
+
+
+def _mono12p_reducido(datos, r):
+    """8 bits altos de 1 de cada `r` píxeles por eje de un frame Mono12p (alto, 3·ancho/2)."""
+    filas = datos[::r]
+    x = np.arange(0, datos.shape[1] * 2 // 3, r)
+    b = 3 * (x >> 1)                                 # primer byte del grupo de cada píxel
+    img = (filas[:, b] >> 4) | ((filas[:, b + 1] & 0x0F) << 4)      # píxeles pares
+    impar = (x & 1).astype(bool)
+    img[:, impar] = filas[:, b[impar] + 2]
+    return img
+
+
+def tamaño(camaras, alto, ancho):
+    return INICIO + camaras * SLOTS * (SLOT.itemsize + alto * ancho)
+
+
+class PublicadorVista:
+    """Lado de la captura: crea el segmento y publica frames reducidos."""
+
+    def __init__(self, ancho, alto, camaras=2, reduccion=4, hz=2.0, nombre=NOMBRE):
+        self.reduccion, self.periodo = max(1, int(reduccion)), 1.0 / float(hz)
+        self.alto, self.ancho = -(-alto // self.reduccion), -(-ancho // self.reduccion)
+        try:
+            self.shm = shared_memory.SharedMemory(nombre, create=True,
+                                                  size=tamaño(camaras, self.alto, self.ancho))
+        except FileExistsError:
+            # Segmento huérfano de una captura que no terminó bien
+            viejo = shared_memory.SharedMemory(nombre)
+            viejo.close(); viejo.unlink()
+            self.shm = shared_memory.SharedMemory(nombre, create=True,
+                                                  size=tamaño(camaras, self.alto, self.ancho))
+        self.cab, self.slots, self.imgs = _vistas(self.shm.buf, camaras, self.alto, self.ancho)
+        self.cab["camaras"], self.cab["slots"] = camaras, SLOTS
+        self.cab["alto"], self.cab["ancho"] = self.alto, self.ancho
+        self.cab["ultimo"] = -1
+        self.cab["magia"] = MAGIA            # al final: el visor espera la magia
+        self.latido = ruta_latido(nombre)
+        self._locks = [threading.Lock() for _ in range(camaras)]
+        self._t_pub = [0.0] * camaras
+        self._t_latido, self._hay_visor = 0.0, False
+        self.publicados = 0
+
+    def hay_visor(self):
+        ahora = time.monotonic()
+        if ahora - self._t_latido >= 1.0:          # un stat por segundo como mucho
+            self._t_latido = ahora
+            try:
+                self._hay_visor = time.time() - self.latido.stat().st_mtime < LATIDO_MAX_S
+            except OSError:
+                self._hay_visor = False
+        return self._hay_visor
+
+    def publicar(self, cam, datos, nombre="", meta=None, empaquetado=False):
+        if not self.hay_visor() or time.monotonic() - self._t_pub[cam] < self.periodo:
+            return False
+        lock = self._locks[cam]
+        if not lock.acquire(blocking=False):
+            return False
+        try:
+            self._t_pub[cam] = time.monotonic()
+            k = (int(self.cab["ultimo"][cam]) + 1) % SLOTS
+            s, r = self.slots[cam, k], self.reduccion
+            if empaquetado:
+                src = _mono12p_reducido(datos, r)
+            else:
+                src = datos[::r, ::r]
+            h, w = src.shape
+            s["seqlock"] += 1                      # impar: escribiendo
+            dst = self.imgs[cam, k, :h, :w]
+            if src.dtype == np.uint8:
+                dst[...] = src
+            else:
+                np.right_shift(src, 4, out=dst, casting="unsafe")   # 12 → 8 bits
+            s["frame"] += 1
+            s["alto"], s["ancho"] = h, w
+            s["meta"] = meta if meta is not None else np.nan
+            s["nombre"] = nombre.encode()[:48]
+            s["seqlock"] += 1                      # par: listo
+            self.cab["ultimo"][cam] = k
+            self.publicados += 1
+            return True
+        finally:
+            lock.release()
+
+    def cerrar(self):
+        del self.cab, self.slots, self.imgs        # sin vistas vivas el buffer se puede cerrar
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class LectorVista:
+    """Lado del visor: mapea el segmento de solo lectura."""
+
+    def __init__(self, nombre=NOMBRE):
+        # mmap directo en vez de SharedMemory: permite PROT_READ y no registra
+        # el segmento en el resource_tracker (que lo borraría al salir el visor)
+        fd = os.open(f"/dev/shm/{nombre}", os.O_RDONLY)
+        try:
+            self._mm = mmap.mmap(fd, 0, prot=mmap.PROT_READ)
+            self.inodo = os.fstat(fd).st_ino
+        finally:
+            os.close(fd)
+        cab = np.ndarray((), CABECERA, self._mm, 0)
+        if cab["magia"] != MAGIA:
+            raise ValueError("Preview segment not initialized")
+        self.camaras, alto, ancho = int(cab["camaras"]), int(cab["alto"]), int(cab["ancho"])
+        self.cab, self.slots, self.imgs = _vistas(self._mm, self.camaras, alto, ancho)
+        self.nombre = nombre
+
+    def vigente(self):
+        """False si la captura terminó o el segmento se recreó (nueva campaña)."""
+        try:
+            return os.stat(f"/dev/shm/{self.nombre}").st_ino == self.inodo
+        except OSError:
+            return False
+
+    def leer(self, cam, intentos=5):
+        """(imagen, frame, meta, nombre) del último frame de `cam`, o None."""
+        for _ in range(intentos):
+            k = int(self.cab["ultimo"][cam])
+            if k < 0:
+                return None
+            s = self.slots[cam, k]
+            antes = int(s["seqlock"])
+            if antes % 2:
+                continue
+            h, w = int(s["alto"]), int(s["ancho"])
+            img = self.imgs[cam, k, :h, :w].copy()
+            frame, meta, nombre = int(s["frame"]), s["meta"].copy(), bytes(s["nombre"])
+            if int(s["seqlock"]) == antes:
+                return img, frame, dict(zip(CAMPOS_META, meta.tolist())), nombre.decode(errors="replace")
+        return None
+
+    def cerrar(self):
+        del self.cab, self.slots, self.imgs
+        self._mm.close()
@@ -1,125 +1,333 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-test_bandwidth_camaras.py
-─────────────────────────
-Mide la velocidad real de transmisión de datos entre la(s) cámara(s)
-Basler y la Raspberry Pi.
-
-• Sin modificar la configuración actual de la cámara.
-• Calcula FPS, MB/s y Mbps de carga útil.
-• Admite:  -c 0   (cámara 0, por defecto)
-           -c 1   (cámara 1)
-           -c both   (las dos simultáneas)
-           -n N  (número de frames, por defecto 100)
-
-Corrección 2025-06-26
-─────────────────────
-`TriggerMode` se pone en *Off* **antes** de llamar a `StartGrabbing`;
-si el nodo no es editable se ignora, evitando la excepción
-“Node is not writable”.
-
-Requisitos:
-    pip install pypylon
-"""
-
-import time, argparse, sys
-from pypylon import pylon
-
-
-# ───────── función de medición para una cámara ─────────
-def medir(cam, n_frames):
-    """Devuelve fps, MB/s y Mbps de `cam` capturando `n_frames`."""
-    cam.Open()
-
-    # Trigger a freerun SOLO si el nodo es editable
-    try:
-        if cam.TriggerMode.IsWritable():
-            cam.TriggerMode.SetValue("Off")
-    except AttributeError:
-        pass
-
-    cam.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
-
-    bytes_total = 0
-    t0 = time.perf_counter()
-    for _ in range(n_frames):
-        res = cam.RetrieveResult(5000, pylon.TimeoutHandling_ThrowException)
-        bytes_total += res.GetPayloadSize()
-        res.Release()
-    dt = time.perf_counter() - t0
-    cam.StopGrabbing()
-
-    fps  = n_frames / dt
-    mb_s = bytes_total / dt / (1024 * 1024)
-    return fps, mb_s, mb_s * 8
-
-
-# ───────── CLI y flujo principal ─────────
-def main():
-    ap = argparse.ArgumentParser(description="Test de ancho de banda Basler")
-    ap.add_argument("-c", "--cam", default="0",
-                    help="'0', '1' o 'both' (defecto 0)")
-    ap.add_argument("-n", "--frames", type=int, default=100,
-                    help="Frames a capturar (def 100)")
-    args = ap.parse_args()
-
-    tl  = pylon.TlFactory.GetInstance()
-    dev = tl.EnumerateDevices()
-    if not dev:
-        sys.exit("No se detectaron cámaras Basler")
-
-    def open_idx(i):
-        if i >= len(dev):
-            sys.exit(f"Índice {i} fuera de rango ({len(dev)} cámaras)")
-        return pylon.InstantCamera(tl.CreateDevice(dev[i]))
-
-    if args.cam == "both":
-        cams = [open_idx(0), open_idx(1)]
-    else:
-        cams = [open_idx(int(args.cam))]
-
-    # Informação básica
-    for i, cam in enumerate(cams):
-        cam.Open()
-        w, h = cam.Width.GetValue(), cam.Height.GetValue()
-        fmt  = cam.PixelFormat.GetValue()
-        print(f"CAM {i}: {w}×{h}  {fmt}")
-        cam.Close()
-
-    if len(cams) == 2:
-        # ─── Captura simultánea ───
-        for c in cams:
-            c.Open()
-            try:
-                if c.TriggerMode.IsWritable():
-                    c.TriggerMode.SetValue("Off")
-            except AttributeError:
-                pass
-            c.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
-
-        bytes_tot = [0, 0]
-        t0 = time.perf_counter()
-        for _ in range(args.frames):
-            for idx, c in enumerate(cams):
-                res = c.RetrieveResult(5000, pylon.TimeoutHandling_ThrowException)
-                bytes_tot[idx] += res.GetPayloadSize()
-                res.Release()
-        dt = time.perf_counter() - t0
-
-        for c in cams:
-            c.StopGrabbing(); c.Close()
-
-        for idx, bt in enumerate(bytes_tot):
-            fps  = args.frames / dt
-            mb_s = bt / dt / 1024 / 1024
-            print(f"CAM {idx} {fps:.2f} fps | {mb_s:.2f} MB/s | {mb_s*8:.2f} Mbps")
-    else:
-        cam = cams[0]
-        fps, mb_s, mbps = medir(cam, args.frames)
-        cam.Close()
-        print(f"Resultado  {fps:.2f} fps | {mb_s:.2f} MB/s | {mbps:.2f} Mbps")
-
-
-if __name__ == "__main__":
-    main()
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_bandwidth_camaras.py
+─────────────────────────
+Mide la velocidad real de transmisión de datos entre la(s) cámara(s)
+Basler y la Raspberry Pi.
+
+• Sin modificar la configuración actual de la cámara.
+• Calcula FPS, MB/s y Mbps de carga útil (MB = 10⁶ bytes, como el resto
+  de los benchmarks y la calculadora de vuelo).
+• Admite:  -c 0   (cámara 0, por defecto)
+           -c 1   (cámara 1)
+           -c both   (las dos simultáneas)
+           -n N  (número de frames, por defecto 100)
+           --barrido   (busca el mejor transporte GigE, ver abajo)
+
+Corrección 2025-06-26
+─────────────────────
+`TriggerMode` se pone en *Off* **antes** de llamar a `StartGrabbing`;
+si el nodo no es editable se ignora, evitando la excepción
+“Node is not writable”.
+
+Captura simultánea
+──────────────────
+Con `-c both` cada cámara tiene su propio hilo de `RetrieveResult`, así
+se mide lo que el enlace sostiene con las dos transmitiendo a la vez (y
+no la suma de dos capturas alternadas).  Se informan los buffers
+fallidos y las estadísticas del stream grabber (paquetes perdidos y
+reenviados) cuando la cámara las expone.
+
+Barrido de transporte
+─────────────────────
+`--barrido` prueba todas las combinaciones de GevSCPSPacketSize,
+GevSCPD (retardo entre paquetes) y MaxNumBuffer con las cámaras
+elegidas, y se queda con la de mayor throughput sin pérdidas entre las
+que todas las cámaras aceptaron igual (cada una redondea a su propio
+incremento; la tabla muestra "a/b" cuando difieren).  La escribe en
+SO Vultur/transporte.json, con lo aceptado por cada cámara como
+referencia, y la captura la aplica al arrancar.  Al terminar, las
+cámaras vuelven a sus valores originales.
+
+Requisitos:
+    pip install pypylon
+"""
+
+import time, argparse, sys, json, datetime, pathlib, threading
+from itertools import product
+from pypylon import pylon
+
+TRANSPORTE = pathlib.Path(__file__).resolve().parent.parent / "SO Vultur" / "transporte.json"
+NODOS_TRANSPORTE = ("GevSCPSPacketSize", "GevSCPD")
+ESTADISTICAS = ("Statistic_Failed_Buffer_Count", "Statistic_Buffer_Underrun_Count",
+                "Statistic_Failed_Packet_Count", "Statistic_Resend_Packet_Count")
+
+
+# ───────── función de medición para una cámara ─────────
+def medir(cam, n_frames):
+    """Devuelve fps, MB/s y Mbps de `cam` capturando `n_frames`."""
+    cam.Open()
+
+    # Trigger a freerun SOLO si el nodo es editable
+    try:
+        if cam.TriggerMode.IsWritable():
+            cam.TriggerMode.SetValue("Off")
+    except AttributeError:
+        pass
+
+    cam.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+
+    bytes_total = 0
+    t0 = time.perf_counter()
+    for _ in range(n_frames):
+        res = cam.RetrieveResult(5000, pylon.TimeoutHandling_ThrowException)
+        bytes_total += res.GetPayloadSize()
+        res.Release()
+    dt = time.perf_counter() - t0
+    cam.StopGrabbing()
+
+    fps  = n_frames / dt
+    mb_s = bytes_total / dt / 1e6
+    return fps, mb_s, mb_s * 8
+
+
+# ───────── captura simultánea, un hilo por cámara ─────────
+def estadisticas(cam):
+    """Contadores del stream grabber disponibles (GigE), o {} si no hay."""
+    try:
+        nm = cam.GetStreamGrabberNodeMap()
+    except Exception:
+        return {}
+    est = {}
+    for nombre in ESTADISTICAS:
+        try:
+            est[nombre] = int(nm.GetNode(nombre).GetValue())
+        except Exception:
+            pass
+    return est
+
+
+def medir_simultaneo(cams, n_frames, timeout_ms=5000):
+    """Captura `n_frames` por cámara con un hilo cada una.
+
+    Devuelve un dict con FPS y MB/s por cámara, MB/s agregados (bytes de
+    todas / tiempo hasta que termina la última) y las pérdidas.  Si el
+    hilo de una cámara falla, esa cámara trae "error" y queda fuera del
+    throughput (FPS y MB/s en None).
+    """
+    for c in cams:
+        c.Open()
+        try:
+            if c.TriggerMode.IsWritable():
+                c.TriggerMode.SetValue("Off")
+        except AttributeError:
+            pass
+    antes = [estadisticas(c) for c in cams]
+    res_cam = [{"bytes": 0, "frames": 0, "fallidos": 0, "timeouts": 0, "t_fin": None, "error": None}
+               for _ in cams]
+    largada = threading.Barrier(len(cams) + 1)
+
+    def grab(c, r):
+        largada.wait()
+        try:
+            for _ in range(n_frames):
+                res = c.RetrieveResult(timeout_ms, pylon.TimeoutHandling_Return)
+                if not res:
+                    r["timeouts"] += 1
+                    continue
+                if res.GrabSucceeded():
+                    r["bytes"] += res.GetPayloadSize()
+                    r["frames"] += 1
+                else:
+                    r["fallidos"] += 1
+                res.Release()
+        except Exception as e:
+            r["error"] = f"{type(e).__name__}: {e}"
+            return
+        r["t_fin"] = time.perf_counter()
+
+    # OneByOne: con la cola de buffers llena se ven los underruns y MaxNumBuffer cuenta
+    for c in cams:
+        c.StartGrabbing(pylon.GrabStrategy_OneByOne)
+    hilos = [threading.Thread(target=grab, args=(c, r), daemon=True) for c, r in zip(cams, res_cam)]
+    for h in hilos:
+        h.start()
+    largada.wait()
+    t0 = time.perf_counter()
+    for h in hilos:
+        h.join()
+    for c in cams:
+        c.StopGrabbing()
+
+    despues = [estadisticas(c) for c in cams]
+    salida = {"camaras": []}
+    perdidos = 0
+    for r, a, d in zip(res_cam, antes, despues):
+        delta = {k: d[k] - a.get(k, 0) for k in d}
+        perdidos += r["fallidos"] + r["timeouts"] + sum(v for k, v in delta.items()
+                                                        if k != "Statistic_Resend_Packet_Count")
+        cam = {"fps": None, "mb_s": None, "fallidos": r["fallidos"], "timeouts": r["timeouts"],
+               "estadisticas": delta, "error": r["error"]}
+        if r["error"] is None:
+            dt = r["t_fin"] - t0
+            cam.update(fps=r["frames"] / dt, mb_s=r["bytes"] / dt / 1e6)
+        salida["camaras"].append(cam)
+    ok = [r for r in res_cam if r["error"] is None]
+    salida["mb_s_total"] = (sum(r["bytes"] for r in ok) / (max(r["t_fin"] for r in ok) - t0) / 1e6
+                            if ok else None)
+    salida["perdidos"] = perdidos
+    salida["errores"] = len(res_cam) - len(ok)
+    return salida
+
+
+# ───────── barrido de transporte GigE ─────────
+def leer_transporte(cam):
+    vals = {}
+    for nodo in NODOS_TRANSPORTE:
+        try:
+            vals[nodo] = int(getattr(cam, nodo).GetValue())
+        except Exception:
+            pass
+    vals["MaxNumBuffer"] = int(cam.MaxNumBuffer.GetValue())
+    return vals
+
+
+def aplicar_transporte(cam, valores):
+    """Aplica los valores posibles y devuelve los que quedaron (la cámara redondea)."""
+    for nodo, v in valores.items():
+        try:
+            n = getattr(cam, nodo)
+            if n.IsWritable():
+                n.SetValue(min(int(v), n.GetMax()) if n.GetMax() is not None else int(v))
+        except Exception:
+            pass
+    return leer_transporte(cam)
+
+
+def _columna(aplicados, nodo, pedido):
+    """Valor aceptado por las cámaras; 'a/b' si cada una redondeó distinto."""
+    vals = [str(a.get(nodo, pedido)) for a in aplicados]
+    return vals[0] if len(set(vals)) == 1 else "/".join(vals)
+
+
+def barrido(cams, n_frames, paquetes, retardos, buffers):
+    """Mide cada combinación; devuelve (resultados, mejor sin pérdidas o None).
+
+    Cada resultado guarda lo que aceptó cada cámara.  La captura aplica
+    los mismos valores a las dos, así que solo compiten por el mejor las
+    combinaciones que todas las cámaras aceptaron igual.
+    """
+    for c in cams:
+        c.Open()
+    originales = [leer_transporte(c) for c in cams]
+    resultados = []
+    try:
+        print(f"{'paquete':>10}{'retardo':>11}{'buffers':>9}{'MB/s':>9}{'pérdidas':>10}")
+        for paq, ret, buf in product(paquetes, retardos, buffers):
+            pedido = {"GevSCPSPacketSize": paq, "GevSCPD": ret, "MaxNumBuffer": buf}
+            aplicados = [aplicar_transporte(c, pedido) for c in cams]
+            fila = (f"{_columna(aplicados, 'GevSCPSPacketSize', paq):>10}"
+                    f"{_columna(aplicados, 'GevSCPD', ret):>11}"
+                    f"{_columna(aplicados, 'MaxNumBuffer', buf):>9}")
+            try:
+                m = medir_simultaneo(cams, n_frames)
+            except Exception as e:
+                print(f"{fila}   error: {e}")
+                continue
+            if m["errores"]:
+                print(f"{fila}   error: " + "; ".join(c["error"] for c in m["camaras"] if c["error"]))
+                continue
+            iguales = all(a == aplicados[0] for a in aplicados)
+            r = {**aplicados[0], "por_camara": aplicados, "iguales": iguales,
+                 "mb_s_total": m["mb_s_total"], "perdidos": m["perdidos"]}
+            resultados.append(r)
+            print(f"{fila}{m['mb_s_total']:>9.2f}{m['perdidos']:>10}"
+                  + ("" if iguales else "   (distinto por cámara)"))
+    finally:
+        for c, o in zip(cams, originales):
+            aplicar_transporte(c, o)
+            c.Close()
+    candidatos = [r for r in resultados if r["perdidos"] == 0 and r["iguales"]]
+    return resultados, max(candidatos, key=lambda r: r["mb_s_total"], default=None)
+
+
+def guardar_transporte(mejor, cams, n_frames):
+    datos = {k: mejor[k] for k in (*NODOS_TRANSPORTE, "MaxNumBuffer") if k in mejor}
+    datos.update(MB_s=round(mejor["mb_s_total"], 2), Camaras=len(cams), Frames=n_frames,
+                 Fecha=datetime.datetime.now().isoformat(timespec="seconds"),
+                 Por_camara=[{"Serie": c.GetDeviceInfo().GetSerialNumber(), **a}
+                             for c, a in zip(cams, mejor["por_camara"])])
+    json.dump(datos, open(TRANSPORTE, "w"), indent=4)
+    return datos
+
+
+# ───────── CLI y flujo principal ─────────
+def main():
+    ap = argparse.ArgumentParser(description="Test de ancho de banda Basler")
+    ap.add_argument("-c", "--cam", default="0",
+                    help="'0', '1' o 'both' (defecto 0)")
+    ap.add_argument("-n", "--frames", type=int,
+                    help="Frames a capturar (def 100; 30 por combinación en --barrido)")
+    ap.add_argument("--barrido", action="store_true",
+                    help="Barrer paquete/retardo/buffers y guardar el mejor en transporte.json")
+    ap.add_argument("--paquetes", type=int, nargs="+", default=[1500, 4000, 8192, 9000],
+                    help="GevSCPSPacketSize a probar (bytes; >1500 requiere jumbo frames)")
+    ap.add_argument("--retardos", type=int, nargs="+", default=[0, 1000, 5000],
+                    help="GevSCPD a probar (ticks)")
+    ap.add_argument("--buffers", type=int, nargs="+", default=[5, 10, 20],
+                    help="MaxNumBuffer a probar")
+    ap.add_argument("--sin-guardar", action="store_true",
+                    help="No escribir transporte.json")
+    args = ap.parse_args()
+    n = args.frames or (30 if args.barrido else 100)
+
+    tl  = pylon.TlFactory.GetInstance()
+    dev = tl.EnumerateDevices()
+    if not dev:
+        sys.exit("No se detectaron cámaras Basler")
+
+    def open_idx(i):
+        if i >= len(dev):
+            sys.exit(f"Índice {i} fuera de rango ({len(dev)} cámaras)")
+        return pylon.InstantCamera(tl.CreateDevice(dev[i]))
+
+    if args.cam == "both":
+        cams = [open_idx(0), open_idx(1)]
+    else:
+        cams = [open_idx(int(args.cam))]
+
+    # Informação básica
+    for i, cam in enumerate(cams):
+        cam.Open()
+        w, h = cam.Width.GetValue(), cam.Height.GetValue()
+        fmt  = cam.PixelFormat.GetValue()
+        print(f"CAM {i}: {w}×{h}  {fmt}")
+        cam.Close()
+
+    if args.barrido:
+        _, mejor = barrido(cams, n, args.paquetes, args.retardos, args.buffers)
+        if mejor is None:
+            print("Ninguna combinación sin pérdidas aceptada igual por todas las cámaras.")
+        else:
+            print(f"\nMejor sin pérdidas: paquete {mejor.get('GevSCPSPacketSize')} | "
+                  f"retardo {mejor.get('GevSCPD')} | buffers {mejor['MaxNumBuffer']} | "
+                  f"{mejor['mb_s_total']:.2f} MB/s")
+            if not args.sin_guardar:
+                guardar_transporte(mejor, cams, n)
+                print(f"Guardado en {TRANSPORTE}")
+    elif len(cams) == 2:
+        # ─── Captura simultánea ───
+        m = medir_simultaneo(cams, n)
+        for c in cams:
+            c.Close()
+
+        for idx, r in enumerate(m["camaras"]):
+            if r["error"]:
+                print(f"CAM {idx} error: {r['error']}")
+                continue
+            print(f"CAM {idx} {r['fps']:.2f} fps | {r['mb_s']:.2f} MB/s | {r['mb_s']*8:.2f} Mbps"
+                  f" | fallidos {r['fallidos']}  timeouts {r['timeouts']}"
+                  + "".join(f"  {k[10:]} {v}" for k, v in r["estadisticas"].items()))
+        if m["mb_s_total"] is not None:
+            print(f"Total  {m['mb_s_total']:.2f} MB/s | {m['mb_s_total']*8:.2f} Mbps"
+                  f" | pérdidas {m['perdidos']}")
+    else:
+        cam = cams[0]
+        fps, mb_s, mbps = medir(cam, n)
+        cam.Close()
+        print(f"Resultado  {fps:.2f} fps | {mb_s:.2f} MB/s | {mbps:.2f} Mbps")
+
+
+if __name__ == "__main__":
+    main()
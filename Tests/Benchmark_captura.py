@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark_captura.py
+────────────────────
+Corre `SO Vultur/capturar_imagenes_gps.py` de punta a punta sin hardware
+y mide su rendimiento sostenido.
+
+• Cámaras : Basler simuladas en Python (Tests/simulacion/camara) o, con
+            --pylon-emu, la emulación de cámaras de pylon (PYLON_CAMEMU).
+• MAVLink : enlace local que repite un log_Campaña.csv (--telemetria) o
+            una trayectoria sintética.
+• GPIO    : sustituto sin efecto (Tests/simulacion/RPi).
+
+El script de captura corre sin modificaciones en una carpeta temporal con
+su propio config.json (copia del real con los cambios de la línea de
+comandos) y HOME apuntando a --dir, así la campaña se escribe en el disco
+que se quiere medir.  Al terminar informa FPS sostenido, MB/s escritos,
+pares descartados y las latencias por etapa de Latencias.json.
+
+Con --reales usa las cámaras conectadas (pypylon real); MAVLink y GPIO
+siguen simulados.  `correr()` devuelve los resultados como dict para
+Benchmark_suite.py.
+
+Uso:
+    python3 Benchmark_captura.py -t 30 --fps 4
+    python3 Benchmark_captura.py --ancho 1920 --alto 1080 --formato Mono12p \\
+        --set Escritura.Compresion=deflate --set Escritura.Hilos=3
+"""
+
+import argparse, json, os, pathlib, shutil, signal, subprocess, sys, tempfile, threading, time
+
+TESTS     = pathlib.Path(__file__).resolve().parent
+SO_VULTUR = TESTS.parent / "SO Vultur"
+SIM       = TESTS / "simulacion"
+
+
+def valor(txt):
+    try:
+        return json.loads(txt)
+    except ValueError:
+        return txt
+
+
+def preparar_config(args):
+    config = json.load(open(SO_VULTUR / "config.json"))
+    cam = config.setdefault("Camaras", {})
+    cam.update(FPS=args.fps, Width=args.ancho, Height=args.alto, PixelFormat=args.formato)
+    if args.disparo:
+        cam["Disparo"] = args.disparo
+    for item in args.set:
+        clave, _, v = item.partition("=")
+        seccion, _, campo = clave.partition(".")
+        config.setdefault(seccion, {})[campo] = valor(v)
+    return config
+
+
+def parser():
+    ap = argparse.ArgumentParser(description="Benchmark de captura sin hardware")
+    ap.add_argument("-t", "--duracion", type=float, default=20, help="Segundos de captura (def 20)")
+    ap.add_argument("--fps", type=float, default=2)
+    ap.add_argument("--ancho", type=int, default=3840)
+    ap.add_argument("--alto", type=int, default=2160)
+    ap.add_argument("--formato", default="Mono12", choices=["Mono12", "Mono12p"])
+    ap.add_argument("--disparo", choices=["secuencial", "concurrente"])
+    ap.add_argument("--set", action="append", default=[], metavar="Seccion.Clave=valor",
+                    help="Cambia cualquier valor del config.json (repetible)")
+    ap.add_argument("--dir", default=tempfile.gettempdir(),
+                    help="Disco donde se escribe la campaña (def: temporal)")
+    ap.add_argument("--telemetria", help="log_Campaña.csv a repetir como MAVLink")
+    ap.add_argument("--mbs", type=float, default=110, help="MB/s del enlace simulado por cámara")
+    ap.add_argument("--pylon-emu", action="store_true",
+                    help="Usar pypylon real con cámaras emuladas en vez del simulador")
+    ap.add_argument("--reales", action="store_true",
+                    help="Usar las cámaras conectadas en vez del simulador")
+    ap.add_argument("--mantener", action="store_true", help="No borrar la campaña generada")
+    return ap
+
+
+def correr(args, eco=print):
+    """Corre la captura y devuelve sus resultados, o None si no llegó a empezar."""
+    trabajo = pathlib.Path(tempfile.mkdtemp(prefix="vultur_bench_", dir=args.dir))
+    json.dump(preparar_config(args), open(trabajo / "config.json", "w"), indent=4)
+
+    rutas = [str(SIM)] + ([] if args.pylon_emu or args.reales else [str(SIM / "camara")])
+    env = dict(os.environ, HOME=str(trabajo), PYTHONUNBUFFERED="1",
+               PYTHONPATH=os.pathsep.join(rutas + [os.environ.get("PYTHONPATH", "")]),
+               VULTUR_SIM_MBS=str(args.mbs))
+    if args.pylon_emu:
+        env["PYLON_CAMEMU"] = "2"
+    if args.telemetria:
+        env["VULTUR_SIM_TELEMETRIA"] = str(pathlib.Path(args.telemetria).resolve())
+
+    eco(f"{args.ancho}×{args.alto} {args.formato} | {args.fps:g} FPS | {args.duracion:g} s | {trabajo}")
+    proc = subprocess.Popen([sys.executable, str(SO_VULTUR / "capturar_imagenes_gps.py")],
+                            cwd=trabajo, env=env, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True)
+    t = {}
+
+    def detener():
+        # Ctrl-C, igual que el botón "Stop" de la interfaz
+        t["fin_captura"] = time.monotonic()
+        if proc.poll() is None:
+            proc.send_signal(signal.SIGINT)
+
+    for linea in proc.stdout:
+        eco("  │ " + linea.rstrip())
+        if "ini" not in t and linea.startswith("Capturing"):
+            t["ini"] = time.monotonic()
+            threading.Timer(args.duracion, detener).start()
+    proc.wait()
+    t_fin = time.monotonic()
+
+    campañas = sorted(trabajo.glob("Campa*"))
+    if "ini" not in t or "fin_captura" not in t or not campañas:
+        shutil.rmtree(trabajo, ignore_errors=True)
+        return None
+    camp = campañas[0]
+    prm = json.load(open(camp / "Parametros.json"))
+    lat = json.load(open(camp / "Latencias.json"))["Etapas"]
+    esc = prm.get("Escritura", {})
+    bytes_escritos = sum(f.stat().st_size for d in ("CAM1", "CAM2")
+                         for f in (camp / d).iterdir())
+    dur_cap, dur_tot = t["fin_captura"] - t["ini"], t_fin - t["ini"]
+    if args.mantener:
+        eco(f"\nCampaña en {camp}")
+    else:
+        shutil.rmtree(trabajo, ignore_errors=True)
+    return {"Pares_escritos": esc.get("Pares_escritos"),
+            "Pares_descartados": esc.get("Pares_descartados"),
+            "FPS_objetivo": args.fps,
+            "FPS_sostenido": esc.get("Pares_escritos", 0) / dur_cap,
+            "MB_s_escritura": bytes_escritos / dur_tot / 1e6,
+            "MB_escritos": bytes_escritos / 1e6, "Duracion_s": dur_tot,
+            "Cola_max": esc.get("Cola_max"), "Cola_capacidad": esc.get("Cola_capacidad"),
+            "Tiempo_bloqueado_s": esc.get("Tiempo_bloqueado_s"),
+            "Latencias": lat}
+
+
+def main():
+    args = parser().parse_args()
+    r = correr(args)
+    if r is None:
+        print("\nLa captura no llegó a empezar.")
+        sys.exit(1)
+
+    print(f"\nPares escritos  : {r['Pares_escritos']}  "
+          f"(descartados {r['Pares_descartados']})")
+    print(f"FPS sostenido   : {r['FPS_sostenido']:.2f}  (objetivo {args.fps:g})")
+    print(f"Escritura       : {r['MB_s_escritura']:.1f} MB/s  "
+          f"({r['MB_escritos']:.0f} MB en {r['Duracion_s']:.1f} s)")
+    print(f"Cola máx        : {r['Cola_max']}/{r['Cola_capacidad']}  "
+          f"bloqueado {r['Tiempo_bloqueado_s']} s")
+    print(f"\n{'etapa':<14}{'n':>7}{'media':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}  ms")
+    for etapa, e in r["Latencias"].items():
+        print(f"{etapa:<14}{e['n']:>7}{e['media_ms']:>9.2f}{e['p50_ms']:>9.2f}"
+              f"{e['p95_ms']:>9.2f}{e['p99_ms']:>9.2f}{e['max_ms']:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark_compresion.py
+───────────────────────
+Mide, en la máquina actual y sobre el disco indicado (la SD en la Pi),
+cuántos frames por segundo y cuántos MB/s se escriben con cada códec de
+compresión sin pérdida disponible para la captura.
+
+• Usa el mismo `EscritorFrames` que `capturar_imagenes_gps.py` (mismos
+  hilos y cola que config.json → "Escritura").
+• Frames de producción: 3840×2160 Mono12 (o Mono12p con --formato).
+• Imagen de prueba: sintética (gradiente + ruido de 12 bits) o un TIFF
+  real de una campaña con --imagen, que es lo más representativo.
+• Al final de cada códec se hace `os.sync()` para que la caché del
+  sistema no esconda la velocidad real de la tarjeta.
+• Indica si cada códec alcanza los pares/s del FPS configurado.
+
+Uso:
+    python3 Benchmark_compresion.py -d /home/pi/bench -n 20
+    python3 Benchmark_compresion.py --codecs none deflate:1 zstd:3
+"""
+
+import argparse, json, os, pathlib, shutil, sys, time
+import numpy as np
+import tifffile
+
+SO_VULTUR = pathlib.Path(__file__).resolve().parent.parent / "SO Vultur"
+sys.path.insert(0, str(SO_VULTUR))
+from escritor_frames import EscritorFrames
+
+ANCHO, ALTO = 3840, 2160
+CODECS_DEF  = ["none", "deflate:1", "deflate:6", "zstd:1", "zstd:5", "lzw"]
+
+
+# ───────── imagen de prueba ─────────
+def imagen_sintetica(ancho=ANCHO, alto=ALTO):
+    y, x = np.mgrid[0:alto, 0:ancho]
+    base = 1500 + 800 * np.sin(x / 300.0) * np.cos(y / 200.0)
+    ruido = np.random.default_rng(0).normal(0, 20, (alto, ancho))
+    return (base + ruido).clip(0, 4095).astype(np.uint16)
+
+
+def empaquetar_mono12p(img):
+    p = img.reshape(-1, 2).astype(np.uint16)
+    b = np.empty((p.shape[0], 3), np.uint8)
+    b[:, 0] = p[:, 0] & 0xFF
+    b[:, 1] = (p[:, 0] >> 8) | ((p[:, 1] & 0x0F) << 4)
+    b[:, 2] = p[:, 1] >> 4
+    return b.reshape(img.shape[0], -1)
+
+
+# ───────── medición de un códec ─────────
+def medir(codec, nivel, datos, formato, carpeta, n, prm_esc, ancho=ANCHO, alto=ALTO):
+    destino = carpeta / f"{codec}_{nivel}"
+    destino.mkdir(parents=True, exist_ok=True)
+    esc = EscritorFrames(hilos=prm_esc.get("Hilos", 2), cola=prm_esc.get("Cola", 4),
+                         espera_max=3600, formato=formato, ancho=ancho, alto=alto,
+                         compresion=codec, nivel=nivel)
+    if codec != "none" and esc.compresion == "none":
+        return None                                   # códec no disponible
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        esc.encolar([(destino / f"cam1_{i:05d}.tiff", datos),
+                     (destino / f"cam2_{i:05d}.tiff", datos)])
+    esc.cerrar()
+    os.sync()
+    dt = time.perf_counter() - t0
+
+    escrito = sum(f.stat().st_size for f in destino.iterdir())
+    shutil.rmtree(destino)
+    frames = 2 * n
+    return {"Codec": codec, "Nivel": nivel,
+            "Frames_s": frames / dt, "Pares_s": n / dt,
+            "MB_s_disco": escrito / dt / 1e6,
+            "MB_s_datos": frames * datos.nbytes / dt / 1e6,
+            "Ratio": frames * datos.nbytes / escrito}
+
+
+# ───────── CLI y flujo principal ─────────
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark de compresión de frames")
+    ap.add_argument("-d", "--dir", default=str(pathlib.Path.home() / "bench_compresion"),
+                    help="Carpeta de prueba en el disco a medir")
+    ap.add_argument("-n", "--pares", type=int, default=20,
+                    help="Pares de frames por códec (def 20)")
+    ap.add_argument("--formato", default="Mono12", choices=["Mono12", "Mono12p"])
+    ap.add_argument("--imagen", help="TIFF Mono12 de una campaña para usar como frame")
+    ap.add_argument("--codecs", nargs="+", default=CODECS_DEF,
+                    help="Lista codec[:nivel] (def: %(default)s)")
+    args = ap.parse_args()
+
+    config  = json.load(open(SO_VULTUR / "config.json"))
+    fps_obj = float(config["Camaras"].get("FPS", 2))
+    prm_esc = config.get("Escritura", {})
+
+    img = tifffile.imread(args.imagen) if args.imagen else imagen_sintetica()
+    if img.shape != (ALTO, ANCHO):
+        sys.exit(f"La imagen debe ser {ANCHO}×{ALTO}, es {img.shape[1]}×{img.shape[0]}")
+    datos = empaquetar_mono12p(img) if args.formato == "Mono12p" else img
+
+    carpeta = pathlib.Path(args.dir)
+    print(f"{args.formato} {ANCHO}×{ALTO} | {args.pares} pares por códec | "
+          f"objetivo {fps_obj:g} pares/s | {carpeta}\n")
+    print(f"{'códec':<12}{'frames/s':>10}{'pares/s':>10}{'MB/s disco':>12}"
+          f"{'MB/s datos':>12}{'ratio':>8}  FPS")
+
+    for item in args.codecs:
+        codec, _, nivel = item.partition(":")
+        r = medir(codec, int(nivel) if nivel else None, datos, args.formato,
+                  carpeta, args.pares, prm_esc)
+        if r is None:
+            print(f"{item:<12}   no disponible (¿falta imagecodecs?)")
+            continue
+        ok = "OK" if r["Pares_s"] >= fps_obj else "NO"
+        print(f"{item:<12}{r['Frames_s']:>10.2f}{r['Pares_s']:>10.2f}"
+              f"{r['MB_s_disco']:>12.1f}{r['MB_s_datos']:>12.1f}{r['Ratio']:>8.2f}  {ok}")
+
+    try:
+        carpeta.rmdir()
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
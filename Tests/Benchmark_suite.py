@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark_suite.py
+──────────────────
+Suite de rendimiento con historial, con el formato de producción
+(config.json → "Camaras": 3840×2160 Mono12 salvo que diga otra cosa).
+
+• enlace    : MB/s y FPS de cada cámara hacia la Pi en modo libre, con
+              las dos transmitiendo a la vez (Bandwidth_test.medir_simultaneo),
+              más el FPS máximo del sensor.
+• disco     : pares/s y MB/s escritos con el `EscritorFrames` y el códec
+              de config.json → "Escritura" (Benchmark_compresion.medir).
+• combinado : captura + escritura de punta a punta (Benchmark_captura)
+              pidiendo más FPS de los que se pueden sostener; lo escrito
+              por segundo es el máximo real.
+
+Cada corrida agrega una línea a historial_benchmarks.jsonl con los
+resultados y la metadata del equipo, el software y la configuración, y
+se compara con la corrida anterior del mismo equipo y configuración:
+las métricas que caen más de --tolerancia % se marcan como regresión
+(código de salida 2).  Con hardware real además actualiza
+SO Vultur/limites_rendimiento.json, que usa la calculadora de vuelo.
+
+Uso:
+    python3 Benchmark_suite.py                        # las tres pruebas
+    python3 Benchmark_suite.py enlace disco -n 50 -d /home/pi/bench
+    python3 Benchmark_suite.py --sim                  # sin hardware
+"""
+
+import argparse, datetime, hashlib, json, os, pathlib, platform, subprocess, sys, tempfile
+
+TESTS     = pathlib.Path(__file__).resolve().parent
+SO_VULTUR = TESTS.parent / "SO Vultur"
+SIM       = TESTS / "simulacion"
+HISTORIAL = TESTS / "historial_benchmarks.jsonl"
+LIMITES   = SO_VULTUR / "limites_rendimiento.json"
+PRUEBAS   = ("enlace", "disco", "combinado")
+
+
+# ───────── pruebas ─────────
+def configurar_produccion(cam, prm_cam):
+    """Formato de producción en modo libre, sin límite de FPS."""
+    for nodo in ("OffsetX", "OffsetY"):
+        try: getattr(cam, nodo).Value = 0
+        except Exception: pass
+    cam.Width.Value  = min(int(prm_cam.get("Width", 3840)), cam.Width.Max)
+    cam.Height.Value = min(int(prm_cam.get("Height", 2160)), cam.Height.Max)
+    cam.PixelFormat.Value  = prm_cam.get("PixelFormat", "Mono12")
+    cam.ExposureTime.Value = float(prm_cam.get("ExposureTime", 1000))
+    cam.Gain.Value         = float(prm_cam.get("Gain", 0.0))
+    try:
+        cam.AcquisitionFrameRateEnable.Value = False
+    except Exception:
+        pass
+
+
+def prueba_enlace(config, n):
+    from pypylon import pylon
+    import Bandwidth_test
+
+    tl   = pylon.TlFactory.GetInstance()
+    devs = tl.EnumerateDevices()
+    if not devs:
+        raise RuntimeError("No se detectaron cámaras Basler")
+    cams, payload, fps_sensor = [], [], []
+    for d in devs[:2]:
+        cam = pylon.InstantCamera(tl.CreateDevice(d))
+        cam.Open()
+        configurar_produccion(cam, config.get("Camaras", {}))
+        payload.append(int(cam.PayloadSize.Value))
+        fps_sensor.append(float(cam.ResultingFrameRate.Value))
+        cams.append(cam)
+    # Las dos transmitiendo a la vez, como en vuelo: el total es lo que sostiene el enlace
+    m = Bandwidth_test.medir_simultaneo(cams, n)
+    for c in cams:
+        c.Close()
+    if m["errores"]:
+        raise RuntimeError("; ".join(f"CAM {i + 1}: {c['error']}"
+                                     for i, c in enumerate(m["camaras"]) if c["error"]))
+    r = {"Camaras": [], "Perdidos": m["perdidos"]}
+    for i, (d, mc) in enumerate(zip(devs, m["camaras"])):
+        fps = mc["fps"]
+        r["Camaras"].append({"Modelo": d.GetModelName(), "Serie": d.GetSerialNumber(),
+                             "FPS": fps, "MB_s": fps * payload[i] / 1e6,
+                             "FPS_sensor": fps_sensor[i], "Payload_MB": payload[i] / 1e6})
+        print(f"   CAM {i + 1}: {fps:.2f} FPS | {fps * payload[i] / 1e6:.1f} MB/s "
+              f"(sensor {fps_sensor[i]:.2f} FPS)")
+    r["MB_s_total"] = m["mb_s_total"]
+    if m["perdidos"]:
+        print(f"   {m['perdidos']} frames/paquetes perdidos")
+    r["FPS_sensor_max"] = min(c["FPS_sensor"] for c in r["Camaras"])
+    return r
+
+
+def prueba_disco(config, n, carpeta):
+    import Benchmark_compresion as bc
+
+    prm_cam, prm_esc = config.get("Camaras", {}), config.get("Escritura", {})
+    formato = prm_cam.get("PixelFormat", "Mono12")
+    # El tamaño de los frames de producción, no el 4K fijo de Benchmark_compresion
+    ancho, alto = int(prm_cam.get("Width", bc.ANCHO)), int(prm_cam.get("Height", bc.ALTO))
+    img = bc.imagen_sintetica(ancho, alto)
+    datos = bc.empaquetar_mono12p(img) if formato == "Mono12p" else img
+    codec = prm_esc.get("Compresion", "none")
+    r = bc.medir(codec, prm_esc.get("Nivel"), datos, formato, pathlib.Path(carpeta), n, prm_esc,
+                 ancho, alto)
+    if r is None:
+        raise RuntimeError(f"Códec {codec} no disponible")
+    print(f"   {codec}: {r['Pares_s']:.2f} pares/s | {r['MB_s_disco']:.1f} MB/s en disco")
+    return r
+
+
+def prueba_combinado(config, duracion, fps, carpeta, sim):
+    import Benchmark_captura as bcap
+
+    prm_cam = config.get("Camaras", {})
+    args = bcap.parser().parse_args(
+        ["-t", str(duracion), "--fps", str(fps), "--dir", str(carpeta),
+         "--ancho", str(prm_cam.get("Width", 3840)), "--alto", str(prm_cam.get("Height", 2160)),
+         "--formato", prm_cam.get("PixelFormat", "Mono12"), "--set", "FPS_adaptativo.Activo=false"]
+        + ([] if sim else ["--reales"]))
+    r = bcap.correr(args, eco=lambda _: None)
+    if r is None:
+        raise RuntimeError("La captura no llegó a empezar")
+    print(f"   {r['FPS_sostenido']:.2f} pares/s sostenidos pidiendo {fps:g} "
+          f"({r['Pares_descartados']} descartados) | {r['MB_s_escritura']:.1f} MB/s")
+    return r
+
+
+# ───────── historial ─────────
+def metadata(config, sim, carpeta):
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], cwd=TESTS, capture_output=True,
+                                  text=True, timeout=5).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+    try:
+        modelo = pathlib.Path("/proc/device-tree/model").read_text().strip("\x00\n")
+    except OSError:
+        modelo = platform.machine()
+    try:
+        ram_gb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1e9
+    except (ValueError, OSError, AttributeError):
+        ram_gb = None
+    try:
+        import pypylon
+        v_pylon = getattr(pypylon, "__version__", None)
+    except ImportError:
+        v_pylon = None
+    produccion = {k: config.get(k, {}) for k in ("Camaras", "Escritura")}
+    return {"Equipo": {"Host": platform.node(), "Modelo": modelo, "SO": platform.platform(),
+                       "CPUs": os.cpu_count(), "RAM_GB": ram_gb and round(ram_gb, 1)},
+            "Software": {"Python": platform.python_version(), "pypylon": v_pylon,
+                         "Commit": git("rev-parse", "--short", "HEAD"),
+                         "Cambios_locales": bool(git("status", "--porcelain"))},
+            "Disco": str(pathlib.Path(carpeta).resolve()),
+            "Simulado": sim,
+            "Config": produccion}
+
+
+def clave(meta):
+    """Corridas comparables: mismo equipo, disco, configuración y modo."""
+    base = {"Host": meta["Equipo"]["Host"], "Disco": meta["Disco"],
+            "Config": meta["Config"], "Simulado": meta["Simulado"]}
+    return hashlib.sha1(json.dumps(base, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def metricas(res):
+    """Métricas planas, todas con 'más es mejor'."""
+    m = {}
+    if "enlace" in res:
+        for i, c in enumerate(res["enlace"]["Camaras"]):
+            m[f"enlace.CAM{i + 1}_MB_s"] = c["MB_s"]
+        m["enlace.MB_s_total"] = res["enlace"]["MB_s_total"]
+    if "disco" in res:
+        m["disco.Pares_s"] = res["disco"]["Pares_s"]
+        m["disco.MB_s"] = res["disco"]["MB_s_disco"]
+    if "combinado" in res:
+        m["combinado.FPS_sostenido"] = res["combinado"]["FPS_sostenido"]
+        m["combinado.MB_s"] = res["combinado"]["MB_s_escritura"]
+    return m
+
+
+def anterior(k):
+    """Último registro del historial con la misma clave, o None."""
+    ultimo = None
+    if HISTORIAL.exists():
+        for linea in HISTORIAL.read_text().splitlines():
+            try:
+                reg = json.loads(linea)
+            except ValueError:
+                continue                       # línea a medias de una corrida cortada
+            if reg.get("Clave") == k:
+                ultimo = reg
+    return ultimo
+
+
+def comparar(actual, previo, tolerancia):
+    """Imprime la comparación y devuelve las métricas en regresión."""
+    regresiones = []
+    print(f"\n{'métrica':<26}{'antes':>10}{'ahora':>10}{'Δ %':>8}")
+    for nombre, v in actual.items():
+        a = previo.get(nombre)
+        if not a:
+            print(f"{nombre:<26}{'—':>10}{v:>10.2f}")
+            continue
+        d = (v - a) / a * 100
+        marca = "  REGRESIÓN" if d < -tolerancia else ""
+        if marca:
+            regresiones.append(nombre)
+        print(f"{nombre:<26}{a:>10.2f}{v:>10.2f}{d:>+8.1f}{marca}")
+    return regresiones
+
+
+def escribir_limites(res, config):
+    """Actualiza limites_rendimiento.json con lo medido en esta corrida."""
+    try:
+        lim = json.load(open(LIMITES))
+    except (OSError, ValueError):
+        lim = {}
+    prm_cam = config.get("Camaras", {})
+    lim["Frame"] = {"Ancho": int(prm_cam.get("Width", 3840)), "Alto": int(prm_cam.get("Height", 2160)),
+                    "PixelFormat": prm_cam.get("PixelFormat", "Mono12")}
+    if "enlace" in res:
+        lim["Enlace_MBps"] = round(res["enlace"]["MB_s_total"], 1)
+        lim["Sensor_FPS_max"] = round(res["enlace"]["FPS_sensor_max"], 2)
+    if "disco" in res:
+        lim["Disco_MBps"] = round(res["disco"]["MB_s_disco"], 1)
+    if "combinado" in res:
+        lim["Combinado_FPS"] = round(res["combinado"]["FPS_sostenido"], 2)
+    lim["Fecha"] = datetime.datetime.now().isoformat(timespec="seconds")
+    tmp = LIMITES.with_suffix(".tmp")
+    json.dump(lim, open(tmp, "w"), indent=4)
+    os.replace(tmp, LIMITES)
+
+
+# ───────── CLI y flujo principal ─────────
+def main():
+    ap = argparse.ArgumentParser(description="Suite de rendimiento con historial")
+    ap.add_argument("pruebas", nargs="*", metavar="prueba",
+                    help=f"Pruebas a correr: {', '.join(PRUEBAS)} (def: todas)")
+    ap.add_argument("-n", "--frames", type=int, default=50,
+                    help="Frames por cámara en 'enlace' y pares en 'disco' (def 50)")
+    ap.add_argument("-t", "--duracion", type=float, default=30,
+                    help="Segundos de captura en 'combinado' (def 30)")
+    ap.add_argument("--fps-combinado", type=float,
+                    help="FPS pedidos en 'combinado' (def: FPS del sensor o 15)")
+    ap.add_argument("-d", "--dir", default=tempfile.gettempdir(),
+                    help="Carpeta en el disco a medir (def: temporal)")
+    ap.add_argument("--tolerancia", type=float, default=10,
+                    help="Caída en %% respecto de la corrida anterior que cuenta como regresión")
+    ap.add_argument("--sim", action="store_true",
+                    help="Cámaras simuladas (Tests/simulacion); no toca limites_rendimiento.json")
+    args = ap.parse_args()
+    desconocidas = set(args.pruebas) - set(PRUEBAS)
+    if desconocidas:
+        ap.error(f"pruebas desconocidas: {', '.join(sorted(desconocidas))}")
+    pruebas = [p for p in PRUEBAS if p in (args.pruebas or PRUEBAS)]
+
+    sys.path.insert(0, str(TESTS))
+    sys.path.insert(0, str(SO_VULTUR))
+    if args.sim:
+        sys.path[:0] = [str(SIM / "camara"), str(SIM)]
+    config = json.load(open(SO_VULTUR / "config.json"))
+    os.makedirs(args.dir, exist_ok=True)
+
+    res, errores = {}, {}
+    for p in pruebas:
+        print(f"▶ {p}")
+        try:
+            if p == "enlace":
+                res[p] = prueba_enlace(config, args.frames)
+            elif p == "disco":
+                res[p] = prueba_disco(config, args.frames, pathlib.Path(args.dir) / "bench_suite")
+            else:
+                fps = args.fps_combinado or res.get("enlace", {}).get("FPS_sensor_max", 15)
+                res[p] = prueba_combinado(config, args.duracion, fps, args.dir, args.sim)
+        except Exception as e:
+            errores[p] = str(e)
+            print(f"   error: {e}")
+
+    meta = metadata(config, args.sim, args.dir)
+    reg = {"Fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+           "Clave": clave(meta), **meta, "Pruebas": pruebas,
+           "Resultados": res, "Errores": errores, "Metricas": metricas(res)}
+    previo = anterior(reg["Clave"])
+    with open(HISTORIAL, "a") as f:
+        f.write(json.dumps(reg, ensure_ascii=False, default=float) + "\n")
+
+    regresiones = []
+    if previo:
+        print(f"\nComparación con la corrida del {previo['Fecha']}")
+        regresiones = comparar(reg["Metricas"], previo.get("Metricas", {}), args.tolerancia)
+    else:
+        print("\nPrimera corrida con este equipo y configuración: queda como referencia.")
+    if res and not args.sim:
+        escribir_limites(res, config)
+        print(f"Límites actualizados en {LIMITES}")
+    print(f"Historial: {HISTORIAL}")
+    if regresiones:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
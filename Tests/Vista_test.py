@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vista_test.py
+─────────────
+Comprueba sin cámaras que la vista previa en memoria compartida
+(SO Vultur/vista_compartida.py) publica exactamente 1 de cada `reduccion`
+píxeles por eje, en 8 bits, para Mono12 y Mono12p y reducciones pares e
+impares.  Publica con PublicadorVista, lee con LectorVista y compara con
+el frame de 12 bits reducido a mano.
+
+    python Vista_test.py          (o pytest Vista_test.py)
+"""
+
+import os, pathlib, sys
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "SO Vultur"))
+from vista_compartida import PublicadorVista, LectorVista, ruta_latido
+
+ANCHO, ALTO = 640, 360
+
+
+def frame12(ancho=ANCHO, alto=ALTO, semilla=0):
+    return np.random.default_rng(semilla).integers(0, 4096, (alto, ancho), dtype=np.uint16)
+
+
+def empaquetar(img):
+    """Mono12p como lo entrega la cámara: 2 píxeles en 3 bytes."""
+    p = img.reshape(-1, 2)
+    b = np.empty((p.shape[0], 3), np.uint8)
+    b[:, 0] = p[:, 0] & 0xFF
+    b[:, 1] = (p[:, 0] >> 8) | ((p[:, 1] & 0x0F) << 4)
+    b[:, 2] = p[:, 1] >> 4
+    return b.reshape(img.shape[0], -1)
+
+
+def publicar_y_leer(datos, r, empaquetado):
+    nombre = f"vultur_vista_test_{os.getpid()}"
+    pub = PublicadorVista(ANCHO, ALTO, camaras=1, reduccion=r, hz=1000, nombre=nombre)
+    latido = ruta_latido(nombre)
+    try:
+        latido.touch()                                  # simula un visor vivo
+        assert pub.publicar(0, datos, "test", None, empaquetado)
+        lector = LectorVista(nombre)
+        img = lector.leer(0)[0]
+        lector.cerrar()
+        assert img.shape == (pub.alto, pub.ancho), (img.shape, (pub.alto, pub.ancho))
+        return img
+    finally:
+        pub.cerrar()
+        latido.unlink(missing_ok=True)
+
+
+def test_mono12():
+    img = frame12()
+    for r in (1, 2, 3, 4, 5):
+        esperado = (img[::r, ::r] >> 4).astype(np.uint8)
+        assert np.array_equal(publicar_y_leer(img, r, False), esperado), f"Mono12 r={r}"
+
+
+def test_mono12p():
+    img = frame12(semilla=1)
+    datos = empaquetar(img)
+    for r in (1, 2, 3, 4, 5):
+        esperado = (img[::r, ::r] >> 4).astype(np.uint8)
+        assert np.array_equal(publicar_y_leer(datos, r, True), esperado), f"Mono12p r={r}"
+
+
+if __name__ == "__main__":
+    for prueba in (test_mono12, test_mono12p):
+        prueba()
+        print(f"{prueba.__name__}: OK")
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Sustituto sin efecto de RPi.GPIO para correr los scripts fuera de la Pi."""
+
+BCM, BOARD = 11, 10
+IN, OUT = 1, 0
+LOW, HIGH = 0, 1
+PUD_UP, PUD_DOWN, PUD_OFF = 22, 21, 20
+RISING, FALLING, BOTH = 31, 32, 33
+
+_salidas = {}
+
+
+def setmode(modo): pass
+def setwarnings(flag): pass
+def setup(pin, modo, pull_up_down=None, initial=LOW):
+    if modo == OUT:
+        _salidas[pin] = initial
+def output(pin, valor): _salidas[pin] = valor
+def input(pin): return _salidas.get(pin, HIGH)      # pulsadores con pull-up: sin pulsar
+def add_event_detect(pin, flanco, callback=None, bouncetime=None): pass
+def remove_event_detect(pin): pass
+def cleanup(*_): _salidas.clear()
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Cámara Basler simulada en Python puro (sustituto de pypylon.pylon).
+
+Cubre lo que usan los scripts de captura: enumeración, nodos GenICam con
+`.Value`, disparo por software o modo libre, `MaxNumBuffer` como pool
+real de buffers y grab results con GetArray / GetArrayZeroCopy /
+GetBuffer.  La imagen sale de un patrón sintético de 12 bits generado una
+vez por cámara; el tiempo de exposición y el de transferencia por GigE se
+respetan con esperas:
+
+• VULTUR_SIM_CAMARAS : número de cámaras (def 2)
+• VULTUR_SIM_MBS     : MB/s del enlace por cámara (def 110)
+• VULTUR_SIM_FPS_MAX : FPS máximos del sensor en modo libre (def 13)
+"""
+
+import os, sys, threading, time
+from contextlib import contextmanager
+import numpy as np
+
+TimeoutHandling_Return, TimeoutHandling_ThrowException = 0, 1
+GrabStrategy_OneByOne, GrabStrategy_LatestImageOnly = 0, 1
+
+
+class TimeoutException(Exception):
+    pass
+
+
+class RuntimeException(Exception):
+    pass
+
+
+# ───────── nodos GenICam ─────────
+class _Nodo:
+    def __init__(self, valor=0, minimo=None, maximo=None):
+        self._v, self.Min, self.Max = valor, minimo, maximo
+
+    @property
+    def Value(self):
+        return self._v() if callable(self._v) else self._v
+
+    @Value.setter
+    def Value(self, v):
+        if self.Max is not None and isinstance(v, (int, float)) and v > self.Max:
+            v = self.Max
+        self._v = v
+
+    def GetValue(self): return self.Value
+    def SetValue(self, v): self.Value = v
+    def GetMax(self): return self.Max
+    def GetMin(self): return self.Min
+    def IsWritable(self): return not callable(self._v)
+    def IsReadable(self): return True
+    def Execute(self): pass
+
+
+class _Dispositivo:
+    def __init__(self, i):
+        self.i = i
+
+    def GetFriendlyName(self): return f"Basler a2A3840-13gmPRO (SIM{self.i:04d})"
+    def GetModelName(self): return "a2A3840-13gmPRO"
+    def GetSerialNumber(self): return f"SIM{self.i:04d}"
+
+
+class TlFactory:
+    _instancia = None
+
+    @classmethod
+    def GetInstance(cls):
+        cls._instancia = cls._instancia or cls()
+        return cls._instancia
+
+    def EnumerateDevices(self):
+        return [_Dispositivo(i) for i in range(int(os.environ.get("VULTUR_SIM_CAMARAS", 2)))]
+
+    def CreateDevice(self, dev):
+        return dev
+
+
+# ───────── grab results ─────────
+class GrabResult:
+    def __init__(self, cam, datos, t):
+        self._cam, self._datos, self.TimeStamp = cam, datos, int(t * 1e9)
+        self._liberado = False
+
+    def GrabSucceeded(self): return True
+    def GetPayloadSize(self): return self._datos.nbytes
+    def GetArray(self): return self._datos.copy()
+    Array = property(GetArray)
+    def GetBuffer(self): return self._datos.tobytes()
+
+    @contextmanager
+    def GetArrayZeroCopy(self):
+        a = self._datos.view()
+        a.flags.writeable = False
+        yield a
+        # Como pypylon: al salir solo quedan la referencia del generador y la de getrefcount
+        if sys.getrefcount(a) != 2:
+            raise RuntimeError("Please remove any references to the array before leaving context manager scope!!!")
+
+    def Release(self):
+        if not self._liberado:
+            self._liberado = True
+            self._cam._devolver()
+
+    def __bool__(self):
+        return True
+
+
+# ───────── cámara ─────────
+class InstantCamera:
+    def __init__(self, dev):
+        self.dev = dev
+        self._abierta = self._grabando = False
+        self._cond = threading.Condition()
+        self._disparos, self._en_uso = [], 0
+        n = {"Width": _Nodo(3840, 16, 3840), "Height": _Nodo(2160, 16, 2160),
+             "PixelFormat": _Nodo("Mono8"), "ExposureTime": _Nodo(500.0),
+             "Gain": _Nodo(0.0), "TriggerSelector": _Nodo("FrameStart"),
+             "TriggerMode": _Nodo("Off"), "TriggerSource": _Nodo("Software"),
+             "MaxNumBuffer": _Nodo(10), "AcquisitionFrameRateEnable": _Nodo(False),
+             "AcquisitionFrameRate": _Nodo(1000.0),
+             "BinningHorizontal": _Nodo(1, 1, 4), "BinningVertical": _Nodo(1, 1, 4)}
+        n["PayloadSize"] = _Nodo(self._payload)
+        n["ResultingFrameRate"] = _Nodo(lambda: float(os.environ.get("VULTUR_SIM_FPS_MAX", 13)))
+        self._nodos = n
+
+    def __getattr__(self, nombre):
+        # Nodos que el simulador no modela (UserSet*, Gev*, ...) se aceptan sin efecto
+        nodos = self.__dict__.get("_nodos")
+        if nodos is None or nombre.startswith("_"):
+            raise AttributeError(nombre)
+        return nodos.setdefault(nombre, _Nodo(0))
+
+    def _payload(self):
+        w, h = self._nodos["Width"].Value, self._nodos["Height"].Value
+        w //= self._nodos["BinningHorizontal"].Value
+        h //= self._nodos["BinningVertical"].Value
+        fmt = self._nodos["PixelFormat"].Value
+        if fmt == "Mono8":
+            return w * h
+        return w * h * 3 // 2 if fmt == "Mono12p" else w * h * 2
+
+    def GetDeviceInfo(self): return self.dev
+    def Open(self): self._abierta = True
+    def Close(self): self._abierta = False
+    def IsOpen(self): return self._abierta
+    def IsGrabbing(self): return self._grabando
+
+    def _imagen(self):
+        w = self._nodos["Width"].Value // self._nodos["BinningHorizontal"].Value
+        h = self._nodos["Height"].Value // self._nodos["BinningVertical"].Value
+        fmt = self._nodos["PixelFormat"].Value
+        rng = np.random.default_rng(self.dev.i)
+        y, x = np.ogrid[0:h, 0:w]
+        img = (1500 + 800 * np.sin(x / 300.0) * np.cos(y / 200.0)
+               + rng.normal(0, 20, (h, w))).clip(0, 4095).astype(np.uint16)
+        if fmt == "Mono8":
+            return (img >> 4).astype(np.uint8)
+        if fmt == "Mono12p":
+            p = img.reshape(-1, 2)
+            b = np.empty((p.shape[0], 3), np.uint8)
+            b[:, 0] = p[:, 0] & 0xFF
+            b[:, 1] = (p[:, 0] >> 8) | ((p[:, 1] & 0x0F) << 4)
+            b[:, 2] = p[:, 1] >> 4
+            return b.reshape(h, -1)
+        return img
+
+    def StartGrabbing(self, estrategia=GrabStrategy_OneByOne):
+        self._datos = self._imagen()
+        self._t_libre = time.monotonic()
+        self._grabando = True
+
+    def StopGrabbing(self):
+        self._grabando = False
+        with self._cond:
+            self._cond.notify_all()
+
+    def ExecuteSoftwareTrigger(self):
+        with self._cond:
+            self._disparos.append(time.monotonic())
+            self._cond.notify_all()
+
+    def _devolver(self):
+        with self._cond:
+            self._en_uso -= 1
+            self._cond.notify_all()
+
+    def RetrieveResult(self, timeout_ms, manejo=TimeoutHandling_ThrowException):
+        limite = time.monotonic() + timeout_ms / 1000
+        disparo = self._nodos["TriggerMode"].Value == "On"
+        with self._cond:
+            # Sin buffer libre o sin disparo pendiente no hay imagen que entregar
+            while self._grabando and (self._en_uso >= self._nodos["MaxNumBuffer"].Value
+                                      or (disparo and not self._disparos)):
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                self._cond.wait(restante)
+            if (not self._grabando or self._en_uso >= self._nodos["MaxNumBuffer"].Value
+                    or (disparo and not self._disparos)):
+                if manejo == TimeoutHandling_ThrowException:
+                    raise TimeoutException(f"Grab timeout ({timeout_ms} ms)")
+                return None
+            self._en_uso += 1
+            t_disp = self._disparos.pop(0) if disparo else time.monotonic()
+
+        # exposición + transferencia GigE
+        mbs = float(os.environ.get("VULTUR_SIM_MBS", 110))
+        listo = (t_disp + self._nodos["ExposureTime"].Value / 1e6
+                 + self._datos.nbytes / (mbs * 1e6))
+        if not disparo:
+            self._t_libre = max(self._t_libre + 1 / self._nodos["ResultingFrameRate"].Value, listo)
+            listo = self._t_libre
+        time.sleep(max(0.0, listo - time.monotonic()))
+        return GrabResult(self, self._datos, listo)
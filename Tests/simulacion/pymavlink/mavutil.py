@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Sustituto local de pymavlink.mavutil para los benchmarks sin hardware.
+
+`mavlink_connection()` devuelve un enlace que entrega GLOBAL_POSITION_INT,
+GPS_RAW_INT, ATTITUDE y VFR_HUD en tiempo real:
+
+• VULTUR_SIM_TELEMETRIA=<log_Campaña.csv> : repite la telemetría de una
+  campaña real con su cadencia original (en bucle).
+• sin variable : trayectoria sintética en "cortacésped" a 5 m/s, 60 m.
+"""
+
+import bisect, csv, datetime, heapq, math, os, time
+
+TASAS_HZ = {"GLOBAL_POSITION_INT": 5, "ATTITUDE": 10, "VFR_HUD": 4, "GPS_RAW_INT": 2}
+
+
+class _Mensaje:
+    def __init__(self, tipo, **campos):
+        self._tipo = tipo
+        self.__dict__.update(campos)
+
+    def get_type(self):
+        return self._tipo
+
+
+def _num(x):
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _cargar_log(ruta):
+    """Muestras (t relativo, lat, lon, alt, yaw, pitch, roll, gs, climb) del CSV."""
+    muestras, t0 = [], None
+    with open(ruta, encoding="latin1", newline="") as f:
+        for fila in csv.DictReader(f):
+            try:
+                t = datetime.datetime.fromisoformat(fila["Hora_RTC"]).timestamp()
+            except (KeyError, ValueError):
+                continue
+            t0 = t if t0 is None else t0
+            muestras.append((t - t0,) + tuple(_num(fila.get(c)) for c in
+                            ("Lat", "Lon", "Alt", "Yaw_deg", "Pitch_deg", "Roll_deg", "gs", "climb")))
+    if len(muestras) < 2:
+        raise ValueError(f"Log sin telemetría suficiente: {ruta}")
+    return muestras
+
+
+def _sintetica(t, lat0=-33.4489, lon0=-70.6693, alt=60.0, v=5.0, largo=200.0, paso=30.0):
+    """Pasadas de ida y vuelta de `largo` m separadas `paso` m."""
+    d = v * t
+    pasada, x = divmod(d, largo + paso)
+    ida = int(pasada) % 2 == 0
+    if x < largo:
+        norte = x if ida else largo - x
+        este = pasada * paso
+        yaw = 0.0 if ida else 180.0
+    else:
+        norte = largo if ida else 0.0
+        este = pasada * paso + (x - largo)
+        yaw = 90.0
+    lat = lat0 + norte / 6371000.0 * 180 / math.pi
+    lon = lon0 + este / (6371000.0 * math.cos(math.radians(lat0))) * 180 / math.pi
+    return lat, lon, alt, yaw, 2.0 * math.sin(t), 1.5 * math.cos(0.7 * t), v, 0.0
+
+
+class _Enlace:
+    def __init__(self):
+        ruta = os.environ.get("VULTUR_SIM_TELEMETRIA")
+        self.log = _cargar_log(ruta) if ruta else None
+        self._tiempos = [m[0] for m in self.log] if self.log else None
+        self.t0 = time.monotonic()
+        self._agenda = [(self.t0, tipo) for tipo in TASAS_HZ]
+        heapq.heapify(self._agenda)
+
+    def _estado(self, t):
+        if self.log is None:
+            return _sintetica(t)
+        dur = self._tiempos[-1]
+        t = t % dur if dur > 0 else 0.0
+        i = min(max(bisect.bisect_right(self._tiempos, t), 1), len(self.log) - 1)
+        a, b = self.log[i - 1], self.log[i]
+        w = (t - a[0]) / (b[0] - a[0]) if b[0] > a[0] else 0.0
+        return tuple(x + w * (y - x) for x, y in zip(a[1:], b[1:]))
+
+    def _mensaje(self, tipo, t):
+        lat, lon, alt, yaw, pitch, roll, gs, climb = self._estado(t)
+        if tipo in ("GLOBAL_POSITION_INT", "GPS_RAW_INT"):
+            if math.isnan(lat) or math.isnan(lon):
+                return None
+            return _Mensaje(tipo, lat=int(lat * 1e7), lon=int(lon * 1e7),
+                            alt=int((0 if math.isnan(alt) else alt) * 1000),
+                            fix_type=3, time_boot_ms=int(t * 1000))
+        if tipo == "ATTITUDE":
+            if math.isnan(yaw):
+                return None
+            return _Mensaje(tipo, yaw=math.radians(yaw), pitch=math.radians(pitch),
+                            roll=math.radians(roll), time_boot_ms=int(t * 1000))
+        return _Mensaje(tipo, groundspeed=0.0 if math.isnan(gs) else gs,
+                        climb=0.0 if math.isnan(climb) else climb)
+
+    def wait_heartbeat(self, timeout=None, blocking=True):
+        return _Mensaje("HEARTBEAT")
+
+    def recv_match(self, type=None, blocking=False, timeout=None):
+        tipos = [type] if isinstance(type, str) else type
+        limite = time.monotonic() + (timeout if timeout is not None else 1e9)
+        while True:
+            t_msg, tipo = self._agenda[0]
+            ahora = time.monotonic()
+            if t_msg > ahora:
+                if not blocking or t_msg > limite:
+                    time.sleep(max(0.0, min(t_msg, limite) - ahora) if blocking else 0)
+                    return None
+                time.sleep(t_msg - ahora)
+            heapq.heapreplace(self._agenda, (t_msg + 1.0 / TASAS_HZ[tipo], tipo))
+            if tipos and tipo not in tipos:
+                continue
+            msg = self._mensaje(tipo, t_msg - self.t0)
+            if msg is not None:
+                return msg
+
+    def close(self):
+        pass
+
+
+def mavlink_connection(dispositivo, baud=57600, **_):
+    return _Enlace()